@@ -102,6 +102,13 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Trigram similarity thresholds of the fuzzy post search and the author
+# name filter, set on every database connection
+POST_SEARCH_SIMILARITY_THRESHOLD = float(
+    os.environ.get('POST_SEARCH_SIMILARITY_THRESHOLD', 0.1))
+POST_AUTHOR_SIMILARITY_THRESHOLD = float(
+    os.environ.get('POST_AUTHOR_SIMILARITY_THRESHOLD', 0.6))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -109,6 +116,14 @@ DATABASES = {
         'NAME': os.environ.get('DB_NAME', 'BlogDB'),
         'USER': os.environ.get('DB_USER', 'bloguser'),
         'PASSWORD': os.environ.get('DB_PASS', 'verystrongpass2'),
+        'OPTIONS': {
+            'options': (
+                '-c pg_trgm.similarity_threshold='
+                f'{POST_SEARCH_SIMILARITY_THRESHOLD} '
+                '-c pg_trgm.word_similarity_threshold='
+                f'{POST_AUTHOR_SIMILARITY_THRESHOLD}'
+            ),
+        },
     }
 }
 
@@ -159,6 +174,68 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# use a shared backend (e.g. memcached or redis) when running several workers
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# Post view counts are buffered and written to the database in batches
+POST_VIEW_COUNT_SINK = os.environ.get(
+    'POST_VIEW_COUNT_SINK', 'post.view_counter.MemoryViewCountSink')
+# number of buffered views that triggers a flush
+POST_VIEW_COUNT_FLUSH_THRESHOLD = int(
+    os.environ.get('POST_VIEW_COUNT_FLUSH_THRESHOLD', 100))
+# maximum number of seconds between two flushes
+POST_VIEW_COUNT_FLUSH_INTERVAL = int(
+    os.environ.get('POST_VIEW_COUNT_FLUSH_INTERVAL', 30))
+
+# Seconds the exact counts of the paginated post feed are cached for
+POST_FEED_COUNT_TIMEOUT = int(os.environ.get('POST_FEED_COUNT_TIMEOUT', 60))
+# above this many rows, the planner estimate is used instead of a count
+POST_FEED_COUNT_ESTIMATE_THRESHOLD = int(
+    os.environ.get('POST_FEED_COUNT_ESTIMATE_THRESHOLD', 10000))
+
+# Seconds the user independent part of the post details is cached for
+POST_DETAIL_CACHE_TIMEOUT = int(
+    os.environ.get('POST_DETAIL_CACHE_TIMEOUT', 300))
+
+# Seconds the feed pages of anonymous readers are fresh for, and then
+# served while they are rebuilt
+POST_FEED_CACHE_TIMEOUT = int(os.environ.get('POST_FEED_CACHE_TIMEOUT', 30))
+POST_FEED_CACHE_STALE_TIMEOUT = int(
+    os.environ.get('POST_FEED_CACHE_STALE_TIMEOUT', 300))
+# number of view, share, rate and comment changes refreshing the feed
+POST_FEED_COUNTER_CHANGE_THRESHOLD = int(
+    os.environ.get('POST_FEED_COUNTER_CHANGE_THRESHOLD', 1000))
+
+# Seconds a process keeps its pool of high rated post ids before
+# reloading it
+POST_RECOMMENDATION_POOL_TIMEOUT = int(
+    os.environ.get('POST_RECOMMENDATION_POOL_TIMEOUT', 300))
+
+# Seconds a process keeps its snapshot of the post categories at most,
+# the changes made through other processes are only seen through a
+# shared cache backend before
+POST_CATEGORY_SNAPSHOT_TIMEOUT = int(
+    os.environ.get('POST_CATEGORY_SNAPSHOT_TIMEOUT', 60))
+# Seconds a process keeps its index of the tag names at most, likewise
+POST_TAG_INDEX_TIMEOUT = int(os.environ.get('POST_TAG_INDEX_TIMEOUT', 60))
+
+# Text search configuration used by the post search vectors
+POST_SEARCH_CONFIG = os.environ.get('POST_SEARCH_CONFIG', 'english')
+
+# Number of replies loaded with every thread of the threaded comments
+COMMENT_THREAD_REPLY_LIMIT = int(
+    os.environ.get('COMMENT_THREAD_REPLY_LIMIT', 3))
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.0/howto/static-files/
 
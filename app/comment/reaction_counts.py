@@ -0,0 +1,55 @@
+"""
+Like and dislike counts of comments.
+
+A reaction write applies its signed delta to the counters of its comment
+with one UPDATE, instead of counting all the reactions of the comment.
+``rebuild_reaction_counts`` repairs the counters from the reactions.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from core.models import Comment, CommentReaction
+
+# comment counter of every reaction
+REACTION_COUNT_FIELDS = {
+    'like': 'likeCount',
+    'disLike': 'disLikeCount',
+}
+
+
+def apply_reaction_change(comment_id, removed=None, added=None):
+    """
+    Move one reaction of the comment from ``removed`` to ``added``.
+
+    Either of them may be None, for a new or a deleted reaction.
+    """
+    deltas = {}
+    if removed in REACTION_COUNT_FIELDS:
+        deltas[REACTION_COUNT_FIELDS[removed]] = -1
+    if added in REACTION_COUNT_FIELDS:
+        field = REACTION_COUNT_FIELDS[added]
+        deltas[field] = deltas.get(field, 0) + 1
+    updates = {
+        field: F(field) + delta for field, delta in deltas.items() if delta
+    }
+    if not updates:
+        return 0
+    return Comment.objects.filter(pk=comment_id).update(**updates)
+
+
+def _reaction_count_subquery(reaction):
+    reactions = CommentReaction.objects.filter(
+        comment=OuterRef('pk'), reaction=reaction
+    ).order_by().values('comment').annotate(
+        count=Count('id')).values('count')
+    return Coalesce(Subquery(reactions, output_field=IntegerField()), 0)
+
+
+def rebuild_reaction_counts(queryset=None):
+    """Recount the reactions of the comments in one statement."""
+    if queryset is None:
+        queryset = Comment.objects.all()
+    return queryset.update(**{
+        field: _reaction_count_subquery(reaction)
+        for reaction, field in REACTION_COUNT_FIELDS.items()
+    })
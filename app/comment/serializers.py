@@ -73,9 +73,14 @@ class CommentSerializer(serializers.ModelSerializer):
     def get_currentUserReaction(self, obj):
         user = self.context['request'].user
         if user.is_authenticated and obj:
-            reaction = CommentReaction.objects.filter(
-                user=user, comment=obj
-                ).first()
+            if hasattr(obj, 'currentUserReactions'):
+                # prefetched by the view
+                reactions = obj.currentUserReactions
+                reaction = reactions[0] if reactions else None
+            else:
+                reaction = CommentReaction.objects.filter(
+                    user=user, comment=obj
+                    ).first()
             if reaction:
                 return CommentReactionSerializer(reaction).data
         return None
@@ -84,7 +89,8 @@ class CommentSerializer(serializers.ModelSerializer):
     def get_createdByCurrentUser(self, obj):
         user = self.context['request'].user
         if user.is_authenticated and obj:
-            return obj.user == user
+            # compare the ids, the user does not have to be loaded
+            return obj.user_id == user.id
         return False
 
     def create(self, validated_data):
@@ -97,3 +103,31 @@ class CommentSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         instance.save()
         return instance
+
+
+class CommentReplySerializer(CommentSerializer):
+    """Serializer for a reply of a comment thread"""
+
+    depth = serializers.IntegerField(read_only=True)
+    replies = serializers.SerializerMethodField()
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ['depth', 'replies']
+
+    @extend_schema_field(serializers.ListField(child=serializers.DictField()))
+    def get_replies(self, obj):
+        return CommentReplySerializer(
+            getattr(obj, 'replies', []), many=True, context=self.context
+        ).data
+
+
+class CommentThreadSerializer(CommentReplySerializer):
+    """Serializer for a top-level comment and its first replies"""
+
+    replyCount = serializers.IntegerField(read_only=True)
+    nextRepliesCursor = serializers.CharField(read_only=True,
+                                              allow_null=True)
+
+    class Meta(CommentReplySerializer.Meta):
+        fields = CommentReplySerializer.Meta.fields + [
+            'replyCount', 'nextRepliesCursor']
@@ -1,20 +1,66 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
-from core.models import CommentReaction
+from core.models import Comment, CommentReaction, Post
+from comment.reaction_counts import (
+    apply_reaction_change,
+    rebuild_reaction_counts
+)
 
 
-@receiver([post_save, post_delete], sender=CommentReaction)
+@receiver(post_init, sender=CommentReaction)
+def remember_reaction(sender, instance, **kwargs):
+    instance._original_reaction = instance.__dict__.get('reaction')
+    instance._original_comment_id = instance.__dict__.get('comment_id')
+
+
+@receiver(post_save, sender=CommentReaction)
 def update_comment_reaction_counts_on_save(sender,
                                            instance,
                                            created=False,
+                                           update_fields=None,
                                            **kwargs):
-    comment = instance.comment
-    comment.likeCount = CommentReaction.objects.filter(
-        comment=comment,
-        reaction='like'
-        ).count()
-    comment.disLikeCount = CommentReaction.objects.filter(
-        comment=comment,
-        reaction='disLike'
-        ).count()
-    comment.save()
+    original_comment_id = instance._original_comment_id
+    moved = (original_comment_id not in (None, instance.comment_id)
+             and (update_fields is None or 'comment' in update_fields))
+    if created:
+        apply_reaction_change(instance.comment_id, added=instance.reaction)
+    elif instance._original_reaction is None:
+        # the reaction was deferred, its previous value is unknown
+        comment_ids = [instance.comment_id]
+        if moved:
+            comment_ids.append(original_comment_id)
+        rebuild_reaction_counts(
+            Comment.objects.filter(pk__in=comment_ids))
+    elif moved:
+        # the reaction was moved to another comment
+        reaction = instance._original_reaction
+        if update_fields is None or 'reaction' in update_fields:
+            reaction = instance.reaction
+        apply_reaction_change(original_comment_id,
+                              removed=instance._original_reaction)
+        apply_reaction_change(instance.comment_id, added=reaction)
+    elif instance._original_reaction != instance.reaction:
+        # e.g. a like switched to a dislike
+        apply_reaction_change(instance.comment_id,
+                              removed=instance._original_reaction,
+                              added=instance.reaction)
+    instance._original_reaction = instance.reaction
+    instance._original_comment_id = instance.comment_id
+
+
+@receiver(post_delete, sender=CommentReaction)
+def update_comment_reaction_counts_on_delete(sender,
+                                             instance,
+                                             origin=None,
+                                             **kwargs):
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if model in (Comment, Post):
+        # the comment is deleted with its reactions
+        return
+    if instance._original_reaction is None:
+        rebuild_reaction_counts(
+            Comment.objects.filter(pk=instance.comment_id))
+    else:
+        apply_reaction_change(instance.comment_id,
+                              removed=instance._original_reaction)
@@ -1,3 +1,249 @@
+"""
+Tests for the comment APIs.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from comment.reaction_counts import rebuild_reaction_counts
+from core.models import Comment, CommentReaction, Post, PostCategory
+
+
+COMMENTS_URL = reverse('comment:comment-list')
+THREADS_URL = reverse('comment:comment-threads')
+
+
+def replies_url(comment_id):
+    """Create and return the replies URL of a comment."""
+    return reverse('comment:comment-replies', args=[comment_id])
+
+
+def create_user(email='test@example.com'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email, name='Test User', password='testpass')
+
+
+def create_post(user):
+    """Create and return a post."""
+    category = PostCategory.objects.create(
+        title='Sample category',
+        createdBy=user,
+        updatedBy=user)
+    return Post.objects.create(
+        title='Sample post title',
+        content='<p>Sample content</p>',
+        excerpt='Sample excerpt',
+        readTime=5,
+        postCategoryId=category,
+        createdBy=user,
+        updatedBy=user)
+
+
+class CommentReactionCountTests(TestCase):
+    """Test the like and dislike counts of comments."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.post = create_post(self.user)
+        self.comment = Comment.objects.create(
+            post=self.post, user=self.user, comment='Sample comment')
+
+    def react(self, reaction, email='other@example.com'):
+        return CommentReaction.objects.create(
+            comment=self.comment, user=create_user(email), reaction=reaction)
+
+    def assertCounts(self, likeCount, disLikeCount):
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.likeCount, likeCount)
+        self.assertEqual(self.comment.disLikeCount, disLikeCount)
+
+    def test_create_reaction_single_update(self):
+        """Test a new reaction updates the counts in one statement."""
+        user = create_user('other@example.com')
+
+        with self.assertNumQueries(2):
+            CommentReaction.objects.create(
+                comment=self.comment, user=user, reaction='like')
+
+        self.assertCounts(1, 0)
+
+    def test_switch_reaction(self):
+        """Test switching a like to a dislike moves the count."""
+        self.react('like', 'a@example.com')
+        reaction = self.react('like', 'b@example.com')
+
+        reaction.reaction = 'disLike'
+        reaction.save()
+
+        self.assertCounts(1, 1)
+
+    def test_move_reaction_to_other_comment(self):
+        """Test moving a reaction moves its count to the other comment."""
+        other = Comment.objects.create(
+            post=self.post, user=self.user, comment='Other comment')
+        self.react('like', 'a@example.com')
+        reaction = CommentReaction.objects.get(
+            pk=self.react('like', 'b@example.com').pk)
+
+        reaction.comment = other
+        reaction.reaction = 'disLike'
+        reaction.save()
+
+        self.assertCounts(1, 0)
+        other.refresh_from_db()
+        self.assertEqual((other.likeCount, other.disLikeCount), (0, 1))
+
+    def test_delete_reaction(self):
+        """Test deleting a reaction decrements its count."""
+        reaction = self.react('disLike')
+
+        reaction.delete()
+
+        self.assertCounts(0, 0)
+
+    def test_delete_comment_with_reactions(self):
+        """Test deleting a comment does not update its counts."""
+        self.react('like')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.comment.delete()
+
+        self.assertFalse(CommentReaction.objects.exists())
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "core_comment"')
+        ])
+
+    def test_rebuild_reaction_counts(self):
+        """Test the counts are rebuilt from the reactions."""
+        self.react('like', 'a@example.com')
+        self.react('disLike', 'b@example.com')
+        Comment.objects.update(likeCount=9, disLikeCount=0)
+
+        rebuild_reaction_counts()
+
+        self.assertCounts(1, 1)
+
+
+class CommentThreadAPITests(TestCase):
+    """Test the threaded comments API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.post = create_post(self.user)
+
+    def comment(self, parentComment=None, likeCount=0):
+        return Comment.objects.create(
+            post=self.post, user=self.user, parentComment=parentComment,
+            comment='Sample comment', likeCount=likeCount)
+
+    def test_threads_nest_first_replies(self):
+        """Test threads are ordered by popularity with nested replies."""
+        quiet = self.comment()
+        popular = self.comment(likeCount=5)
+        reply = self.comment(parentComment=popular)
+        nested = self.comment(parentComment=reply)
+        self.comment(parentComment=popular)
+
+        res = self.client.get(THREADS_URL,
+                              {'post': self.post.id, 'replyLimit': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        threads = res.data['results']
+        self.assertEqual([thread['id'] for thread in threads],
+                         [popular.id, quiet.id])
+        self.assertEqual(threads[0]['replyCount'], 3)
+        self.assertEqual(threads[0]['replies'][0]['id'], reply.id)
+        self.assertEqual(threads[0]['replies'][0]['replies'][0]['id'],
+                         nested.id)
+        self.assertEqual(len(threads[0]['replies']), 1)
+        self.assertIsNotNone(threads[0]['nextRepliesCursor'])
+        self.assertEqual(threads[1]['replyCount'], 0)
+        self.assertIsNone(threads[1]['nextRepliesCursor'])
+
+    def test_threads_query_count(self):
+        """Test the replies of all the threads are loaded together."""
+        for _ in range(3):
+            root = self.comment()
+            self.comment(parentComment=self.comment(parentComment=root))
+
+        # comments, pagination count, threads, users
+        with self.assertNumQueries(5):
+            res = self.client.get(THREADS_URL, {'post': self.post.id})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_replies_follow_cursor(self):
+        """Test the rest of a thread is loaded with the cursor."""
+        root = self.comment()
+        replies = [self.comment(parentComment=root) for _ in range(3)]
+        nested = self.comment(parentComment=replies[0])
+
+        res = self.client.get(THREADS_URL,
+                              {'post': self.post.id, 'replyLimit': 1})
+        cursor = res.data['results'][0]['nextRepliesCursor']
+
+        res = self.client.get(replies_url(root.id),
+                              {'cursor': cursor, 'replyLimit': 2})
+        self.assertEqual([reply['id'] for reply in res.data['results']],
+                         [nested.id, replies[1].id])
+        self.assertEqual(res.data['results'][0]['depth'], 2)
+
+        res = self.client.get(
+            replies_url(root.id),
+            {'cursor': res.data['nextRepliesCursor'], 'replyLimit': 2})
+        self.assertEqual([reply['id'] for reply in res.data['results']],
+                         [replies[2].id])
+        self.assertIsNone(res.data['nextRepliesCursor'])
+
+    def test_threads_require_post(self):
+        """Test the post parameter is required."""
+        res = self.client.get(THREADS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CommentListQueryCountTests(TestCase):
+    """Test the queries of the comment list."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        self.post = create_post(self.user)
+
+    def create_comments(self, count):
+        for index in range(count):
+            author = create_user(f'author{index}-{count}@example.com')
+            comment = Comment.objects.create(
+                post=self.post, user=author, comment='Sample comment')
+            CommentReaction.objects.create(
+                comment=comment, user=self.user, reaction='like')
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(COMMENTS_URL, {'post': self.post.id})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len(queries), res.data
+
+    def test_list_queries_independent_of_comment_count(self):
+        """Test authors and reactions are not loaded per comment."""
+        self.create_comments(2)
+        few_queries, _ = self.count_queries()
+
+        self.create_comments(8)
+        many_queries, comments = self.count_queries()
+
+        self.assertEqual(few_queries, many_queries)
+        self.assertEqual(len(comments), 10)
+        for comment in comments:
+            self.assertEqual(comment['currentUserReaction']['reaction'],
+                             'like')
+            self.assertFalse(comment['createdByCurrentUser'])
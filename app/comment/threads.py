@@ -0,0 +1,129 @@
+"""
+Threaded comments.
+
+The replies of a set of top-level comments are loaded with one recursive
+query. Every comment of a thread gets its ``path``, the ids from the top
+level comment down to it, and the replies are ordered depth first by
+path, so a thread is a prefix of that order: every loaded reply has its
+parent loaded too. Only the first replies of every thread are loaded, the
+path of the last one is the cursor to load more.
+"""
+from django.db.models import Prefetch, prefetch_related_objects
+
+from core.models import Comment, CommentReaction
+
+THREADS_SQL = """
+    WITH RECURSIVE tree (id, root_id, depth, path) AS (
+        SELECT id, id, 0, ARRAY[id::bigint]
+        FROM core_comment WHERE id = ANY(%(root_ids)s::bigint[])
+        UNION ALL
+        SELECT reply.id, tree.root_id, tree.depth + 1,
+            tree.path || reply.id::bigint
+        FROM core_comment AS reply
+        JOIN tree ON reply."parentComment_id" = tree.id
+    ), ranked AS (
+        SELECT *,
+            row_number() OVER (PARTITION BY root_id ORDER BY path) - 1
+                AS position,
+            count(*) OVER (PARTITION BY root_id) - 1 AS thread_size
+        FROM tree
+        WHERE path > %(after)s::bigint[]
+    )
+    SELECT comment.*, ranked.root_id, ranked.depth, ranked.path,
+        ranked.position, ranked.thread_size
+    FROM ranked
+    JOIN core_comment AS comment ON comment.id = ranked.id
+    WHERE ranked.position <= %(limit)s
+    ORDER BY ranked.root_id, ranked.path
+"""
+
+
+def encode_replies_cursor(path):
+    """Return the cursor of the replies following the path."""
+    return '.'.join(str(comment_id) for comment_id in path)
+
+
+def decode_replies_cursor(cursor):
+    """Return the path of the cursor, or raise ValueError."""
+    if not cursor:
+        return []
+    return [int(comment_id) for comment_id in cursor.split('.')]
+
+
+def _load_related(comments, user):
+    prefetch = ['user']
+    if user.is_authenticated:
+        prefetch.append(Prefetch(
+            'commentreaction_set',
+            queryset=CommentReaction.objects.filter(user=user),
+            to_attr='currentUserReactions'))
+    prefetch_related_objects(comments, *prefetch)
+
+
+def load_threads(roots, reply_limit, user):
+    """
+    Attach the first ``reply_limit`` replies of every thread to the
+    top-level comments.
+
+    Every comment gets its nested ``replies``. The top-level comments
+    also get their ``replyCount``, the size of the whole thread, and
+    a ``nextRepliesCursor`` when replies are left to load. The replies
+    are loaded with their user and the reactions of ``user``, like the
+    top-level comments of the comment list.
+    """
+    roots = list(roots)
+    by_id = {root.id: root for root in roots}
+    for root in roots:
+        root.depth = 0
+        root.replies = []
+        root.replyCount = 0
+        root.nextRepliesCursor = None
+    if not roots:
+        return roots
+
+    comments = list(Comment.objects.raw(THREADS_SQL, {
+        'root_ids': list(by_id),
+        'after': [0],
+        'limit': reply_limit,
+    }))
+    replies = [comment for comment in comments if comment.depth > 0]
+    for comment in comments:
+        if comment.depth == 0:
+            by_id[comment.id].replyCount = comment.thread_size
+
+    _load_related(replies, user)
+    by_id.update((reply.id, reply) for reply in replies)
+    last_replies = {}
+    for reply in replies:
+        reply.replies = []
+        by_id[reply.parentComment_id].replies.append(reply)
+        last_replies[reply.root_id] = reply
+
+    for root in roots:
+        last = last_replies.get(root.id)
+        loaded_count = last.position if last else 0
+        if root.replyCount > loaded_count:
+            root.nextRepliesCursor = encode_replies_cursor(
+                last.path[1:] if last else [])
+    return roots
+
+
+def load_replies(root, after, limit, user):
+    """
+    Return the replies of the comment following the path ``after``,
+    depth first, and the cursor of the next replies or None.
+    """
+    comments = list(Comment.objects.raw(THREADS_SQL, {
+        'root_ids': [root.id],
+        'after': [root.id, *after],
+        'limit': limit,
+    }))
+    # the comment itself is not after its path, only replies are left
+    replies = comments
+    has_more = len(replies) > limit
+    replies = replies[:limit]
+    _load_related(replies, user)
+    cursor = None
+    if has_more:
+        cursor = encode_replies_cursor(replies[-1].path[1:])
+    return replies, cursor
@@ -14,11 +14,23 @@ from drf_spectacular.utils import (
     OpenApiParameter,
     OpenApiTypes
 )
+from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError, PermissionDenied
-from django.db.models import F
+from rest_framework.settings import api_settings
+from django.conf import settings
+from django.db.models import F, Prefetch
 from django.shortcuts import get_object_or_404
 from core.models import Post
+from comment.threads import (
+    decode_replies_cursor,
+    load_replies,
+    load_threads
+)
+
+# maximum number of replies loaded per request
+MAX_REPLY_LIMIT = 50
 
 
 @extend_schema_view(
@@ -33,7 +45,45 @@ from core.models import Post
                 required=True
             ),
         ]
-    )
+    ),
+    threads=extend_schema(
+        description="""
+        Retrieve the top-level comments of the post, most popular first,
+        with their first replies nested depth first.
+        Follow nextRepliesCursor with the replies endpoint to load the
+        rest of a thread.
+        """,
+        parameters=[
+            OpenApiParameter(
+                'post',
+                OpenApiTypes.INT,
+                required=True
+            ),
+            OpenApiParameter(
+                'replyLimit',
+                OpenApiTypes.INT,
+                description='Number of replies loaded per thread'
+            ),
+        ]
+    ),
+    replies=extend_schema(
+        description="""
+        Retrieve the replies of a comment depth first, following the
+        cursor of the previous replies.
+        """,
+        parameters=[
+            OpenApiParameter(
+                'cursor',
+                OpenApiTypes.STR,
+                description='nextRepliesCursor of the previous replies'
+            ),
+            OpenApiParameter(
+                'replyLimit',
+                OpenApiTypes.INT,
+                description='Number of replies loaded'
+            ),
+        ]
+    ),
 )
 class CommentViewSet(mixins.DestroyModelMixin,
                      mixins.ListModelMixin,
@@ -59,8 +109,71 @@ class CommentViewSet(mixins.DestroyModelMixin,
             queryset = queryset.annotate(
                 popularity=F('likeCount') + F('disLikeCount')
             ).order_by('-popularity', '-id')
+        if self.action in ('list', 'threads'):
+            queryset = self._prefetch_current_user_reaction(
+                queryset.select_related('user'))
         return queryset.distinct()
 
+    def _prefetch_current_user_reaction(self, queryset):
+        """
+        Load the reactions of the current user to all the comments in one
+        query, instead of one query per comment in the serializer.
+        """
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset
+        return queryset.prefetch_related(
+            Prefetch(
+                'commentreaction_set',
+                queryset=CommentReaction.objects.filter(user=user),
+                to_attr='currentUserReactions'))
+
+    def _reply_limit(self, default):
+        try:
+            limit = int(self.request.query_params.get('replyLimit', default))
+        except ValueError:
+            raise ValidationError({'replyLimit': 'Must be an integer.'})
+        return max(0, min(limit, MAX_REPLY_LIMIT))
+
+    @action(detail=False, methods=['get'],
+            serializer_class=serializers.CommentThreadSerializer,
+            pagination_class=PageNumberPagination)
+    def threads(self, request):
+        """Top-level comments of a post with their first replies."""
+        if not request.query_params.get('post'):
+            raise ValidationError({'post': 'This parameter is required.'})
+        queryset = self.get_queryset().filter(parentComment__isnull=True)
+        page = self.paginate_queryset(queryset)
+        threads = load_threads(
+            page,
+            self._reply_limit(settings.COMMENT_THREAD_REPLY_LIMIT),
+            request.user)
+        serializer = self.get_serializer(threads, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'],
+            serializer_class=serializers.CommentReplySerializer)
+    def replies(self, request, pk=None):
+        """Replies of a comment following the cursor."""
+        comment = self.get_object()
+        try:
+            after = decode_replies_cursor(
+                request.query_params.get('cursor', ''))
+        except ValueError:
+            raise ValidationError({'cursor': 'Invalid cursor.'})
+
+        replies, cursor = [], None
+        if comment.post.commentsEnabled:
+            replies, cursor = load_replies(
+                comment, after,
+                self._reply_limit(api_settings.PAGE_SIZE),
+                request.user)
+        serializer = self.get_serializer(replies, many=True)
+        return Response({
+            'nextRepliesCursor': cursor,
+            'results': serializer.data,
+        })
+
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         self.perform_destroy(instance)
@@ -330,12 +330,12 @@ class PostInformationAdmin(admin.ModelAdmin):
             _('Post Analytics'),
             {'fields': (
                 'post', 'viewCount', 'socialShareCount', 'ratingCount',
-                'averageRating', 'commentCount'
+                'ratingSum', 'averageRating', 'commentCount'
                 )}
         ),
     )
     readonly_fields = ['post', 'viewCount', 'socialShareCount', 'ratingCount',
-                       'averageRating', 'commentCount']
+                       'ratingSum', 'averageRating', 'commentCount']
 
     def has_delete_permission(self, request, obj=None):
         return False
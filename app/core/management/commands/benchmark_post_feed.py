@@ -0,0 +1,64 @@
+"""Django command to benchmark the orderings of the post feed.
+"""
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.http import QueryDict
+
+from core.models import FeedEntry, Post, PostInformation
+from post.benchmark import (
+    analyze,
+    get_benchmark_authors,
+    percentile,
+    seed_posts,
+    time_queryset,
+    uses_index
+)
+from post.feed import build_feed
+from post.pagination import CREATED_DATE_SORT_KEY, POST_SORT_KEYS
+
+
+class Command(BaseCommand):
+    """Django command to measure post feed latency"""
+    help = ('Seed synthetic posts and report the latency of the first '
+            'page of the feed for every sort. '
+            'Run it against a disposable database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000,
+                            help='Number of benchmark posts to seed.')
+        parser.add_argument('--runs', type=int, default=20,
+                            help='Number of runs of every query.')
+
+    def _feed(self, params, user, sort_key):
+        queryset = Post.objects.select_related(
+            'postInformation').defer('searchVector')
+        return lambda: build_feed(
+            queryset, QueryDict(params), user, sort_key)
+
+    def _cases(self):
+        author = get_benchmark_authors()[0]
+        for sort, sort_key in POST_SORT_KEYS.items():
+            yield (f'sort={sort} ({sort_key.name})',
+                   self._feed(f'sort={sort}', AnonymousUser(), sort_key))
+        yield ('sort=0 authenticated',
+               self._feed('sort=0', author, POST_SORT_KEYS[0]))
+        yield ('currentUserPosts=1',
+               self._feed('currentUserPosts=1', author,
+                          CREATED_DATE_SORT_KEY))
+
+    def handle(self, *args, **options):
+        """Entry Point for command"""
+        seed_posts(options['posts'], stdout=self.stdout)
+        analyze(Post, PostInformation, FeedEntry)
+
+        self.stdout.write(
+            f"{'query':<36}{'p50 ms':>10}{'p99 ms':>10}  index")
+        for label, build_queryset in self._cases():
+            latencies = time_queryset(build_queryset, options['runs'])
+            # the plan of the first page, a LIMIT favours the indexes
+            page = build_queryset()[:10]
+            self.stdout.write(
+                f'{label:<36}'
+                f'{percentile(latencies, 50):>10.2f}'
+                f'{percentile(latencies, 99):>10.2f}  '
+                f"{'yes' if uses_index(page) else 'no'}")
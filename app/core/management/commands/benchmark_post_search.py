@@ -0,0 +1,51 @@
+"""Django command to benchmark the post search and author filters.
+"""
+from django.core.management.base import BaseCommand
+
+from core.models import Post
+from post.benchmark import (
+    percentile,
+    seed_posts,
+    time_queryset,
+    uses_index
+)
+from post.search import SEARCH_MODES
+
+
+class Command(BaseCommand):
+    """Django command to measure post search latency"""
+    help = ('Seed synthetic posts and report the latency of post searches. '
+            'Run it against a disposable database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100000,
+                            help='Number of benchmark posts to seed.')
+        parser.add_argument('--runs', type=int, default=20,
+                            help='Number of runs of every query.')
+
+    def _cases(self):
+        published = Post.objects.published_and_accepted
+        for mode, search_posts in SEARCH_MODES.items():
+            for text in ['postgres', 'djang serializer', 'cahce']:
+                yield (f'{mode} "{text}"',
+                       lambda search_posts=search_posts, text=text:
+                       search_posts(published(), text).order_by(
+                           '-search_rank'))
+        for name in ['Majid', 'Noorni']:
+            yield (f'authorName "{name}"',
+                   lambda name=name: published().filter(
+                       createdBy__name__trigram_word_similar=name))
+
+    def handle(self, *args, **options):
+        """Entry Point for command"""
+        seed_posts(options['posts'], stdout=self.stdout)
+
+        self.stdout.write(
+            f"{'query':<36}{'p50 ms':>10}{'p99 ms':>10}  index")
+        for label, build_queryset in self._cases():
+            latencies = time_queryset(build_queryset, options['runs'])
+            self.stdout.write(
+                f'{label:<36}'
+                f'{percentile(latencies, 50):>10.2f}'
+                f'{percentile(latencies, 99):>10.2f}  '
+                f"{'yes' if uses_index(build_queryset()) else 'no'}")
@@ -0,0 +1,40 @@
+"""Django command to check the comment counts of the posts.
+"""
+from django.core.management.base import BaseCommand
+
+from post.comment_counts import (
+    find_comment_count_mismatches,
+    rebuild_comment_counts
+)
+
+
+class Command(BaseCommand):
+    """Django command to compare the comment counts with the comments"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Rewrite the comment counts of all the posts.',
+        )
+
+    def handle(self, *args, **options):
+        """Entry Point for command"""
+        mismatches = list(find_comment_count_mismatches())
+        for information in mismatches:
+            self.stdout.write(
+                f"Post {information.post_id}: commentCount is "
+                f"{information.commentCount}, "
+                f"{information.actualCommentCount} comments found.")
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS(
+                "All comment counts are consistent."))
+        elif options['fix']:
+            rebuild_comment_counts()
+            self.stdout.write(self.style.SUCCESS(
+                f"{len(mismatches)} comment counts fixed."))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"{len(mismatches)} inconsistent comment counts, "
+                "run with --fix to rebuild them."))
@@ -0,0 +1,26 @@
+"""Django command to compute the related post recommendations.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from post.related_posts import compute_related_posts
+
+
+class Command(BaseCommand):
+    """Django command to store the most related posts of every post"""
+    help = ('Score the published posts by their shared tags, SEO keywords, '
+            'category and text and store the best ones of every post.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=5,
+                            help='Number of related posts of every post.')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of posts scored at a time.')
+
+    def handle(self, *args, **options):
+        """Entry Point for command"""
+        if options['top'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--top and --batch-size must be positive.')
+        changed = compute_related_posts(options['top'],
+                                        options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Related posts of {changed} posts updated."))
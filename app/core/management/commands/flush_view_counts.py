@@ -0,0 +1,23 @@
+"""Django command to write buffered post view counts to the database.
+"""
+from django.core.management.base import BaseCommand
+
+from post.view_counter import CacheViewCountSink, get_view_count_sink
+
+
+class Command(BaseCommand):
+    """Django command to flush buffered view counts"""
+
+    def handle(self, *args, **kwargs):
+        """Entry Point for command"""
+        sink = get_view_count_sink()
+        if isinstance(sink, CacheViewCountSink):
+            flushed = sink.flush_all()
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"{type(sink).__name__} buffers views per worker, only "
+                "the views of this process can be flushed."))
+            flushed = sink.flush()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{flushed} buffered views written."))
@@ -0,0 +1,15 @@
+"""Django command to rebuild the feed entries of the posts.
+"""
+from django.core.management.base import BaseCommand
+
+from post.feed_entries import refresh_feed_entries
+
+
+class Command(BaseCommand):
+    """Django command to copy the posts and their counters to the feed"""
+
+    def handle(self, *args, **kwargs):
+        """Entry Point for command"""
+        refreshed = refresh_feed_entries()
+        self.stdout.write(self.style.SUCCESS(
+            f"Feed entries of {refreshed} posts rebuilt."))
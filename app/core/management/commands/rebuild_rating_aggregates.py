@@ -0,0 +1,15 @@
+"""Django command to rebuild the rating aggregates of the posts.
+"""
+from django.core.management.base import BaseCommand
+
+from post.ratings import rebuild_rating_aggregates
+
+
+class Command(BaseCommand):
+    """Django command to recompute the post ratings from the rates"""
+
+    def handle(self, *args, **kwargs):
+        """Entry Point for command"""
+        updated = rebuild_rating_aggregates()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rating aggregates of {updated} posts rebuilt."))
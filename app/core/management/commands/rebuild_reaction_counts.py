@@ -0,0 +1,15 @@
+"""Django command to rebuild the reaction counts of the comments.
+"""
+from django.core.management.base import BaseCommand
+
+from comment.reaction_counts import rebuild_reaction_counts
+
+
+class Command(BaseCommand):
+    """Django command to recount the likes and dislikes of comments"""
+
+    def handle(self, *args, **kwargs):
+        """Entry Point for command"""
+        updated = rebuild_reaction_counts()
+        self.stdout.write(self.style.SUCCESS(
+            f"Reaction counts of {updated} comments rebuilt."))
@@ -0,0 +1,15 @@
+"""Django command to rebuild the published post counts of the tags.
+"""
+from django.core.management.base import BaseCommand
+
+from post.tag_counts import rebuild_tag_counts
+
+
+class Command(BaseCommand):
+    """Django command to recount the published posts of every tag"""
+
+    def handle(self, *args, **kwargs):
+        """Entry Point for command"""
+        corrected = rebuild_tag_counts()
+        self.stdout.write(self.style.SUCCESS(
+            f"Published post counts of {corrected} tags corrected."))
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_alter_postinformation_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='searchVector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='\n        Weighted full-text search vector of the title, excerpt and content,\n        kept up to date when the post is saved.\n        ', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['searchVector'], name='post_search_vector_idx'),
+        ),
+        migrations.RunSQL(
+            sql="""
+            UPDATE core_post SET "searchVector" =
+                setweight(to_tsvector('english', coalesce(title, '')), 'A')
+                || setweight(to_tsvector('english', coalesce(excerpt, '')), 'B')
+                || setweight(to_tsvector('english', regexp_replace(
+                    coalesce(content, ''), '<[^>]*>', ' ', 'g')), 'C');
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
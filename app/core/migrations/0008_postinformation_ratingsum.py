@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postinformation',
+            name='ratingSum',
+            field=models.PositiveIntegerField(default=0, help_text='\n        Sum of the user ratings, kept with ratingCount to update the\n        average rating without aggregating all the ratings.\n        '),
+        ),
+        migrations.RunSQL(
+            sql="""
+            UPDATE core_postinformation SET
+                "ratingSum" = coalesce(rates.total, 0),
+                "ratingCount" = coalesce(rates.count, 0),
+                "averageRating" = coalesce(
+                    round(rates.total::numeric / rates.count, 2), 0.0)
+            FROM core_postinformation AS info
+            LEFT JOIN (
+                SELECT post_id, sum(rate) AS total, count(*) AS count
+                FROM core_postrate GROUP BY post_id
+            ) AS rates ON rates.post_id = info.post_id
+            WHERE info.id = core_postinformation.id;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
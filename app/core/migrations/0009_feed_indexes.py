@@ -0,0 +1,44 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:53
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # the indexes are built without locking the tables against writes
+    atomic = False
+
+    dependencies = [
+        ('core', '0008_postinformation_ratingsum'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='post',
+            index=models.Index(models.OrderBy(models.F('reviewResponseDate'), descending=True, nulls_last=True), models.OrderBy(models.F('id'), descending=True), condition=models.Q(('postStatus__in', ['publish', 'draft'])), name='post_feed_review_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='post',
+            index=models.Index(condition=models.Q(('postStatus__in', ['publish', 'draft'])), fields=['readTime', 'id'], name='post_feed_read_time_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='post',
+            index=models.Index(fields=['createdBy', 'postStatus', '-createdDate'], name='post_author_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='postinformation',
+            index=models.Index(models.OrderBy(models.F('viewCount'), descending=True, nulls_last=True), models.OrderBy(models.F('post_id'), descending=True), name='postinfo_viewcount_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='postinformation',
+            index=models.Index(models.OrderBy(models.F('socialShareCount'), descending=True, nulls_last=True), models.OrderBy(models.F('post_id'), descending=True), name='postinfo_socialsharecount_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='postinformation',
+            index=models.Index(models.OrderBy(models.F('ratingCount'), descending=True, nulls_last=True), models.OrderBy(models.F('post_id'), descending=True), name='postinfo_ratingcount_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='postinformation',
+            index=models.Index(models.OrderBy(models.F('averageRating'), descending=True, nulls_last=True), models.OrderBy(models.F('post_id'), descending=True), name='postinfo_averagerating_idx'),
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BACKFILL_SQL = """
+    INSERT INTO core_feedentry (
+        post_id, "postStatus", "reviewStatus", "postCategoryId_id",
+        "createdBy_id", "createdDate", "reviewResponseDate", "readTime",
+        "viewCount", "socialShareCount", "ratingCount", "averageRating",
+        "commentCount"
+    )
+    SELECT post.id, post."postStatus", post."reviewStatus",
+        post."postCategoryId_id", post."createdBy_id", post."createdDate",
+        post."reviewResponseDate", post."readTime",
+        information."viewCount", information."socialShareCount",
+        information."ratingCount", information."averageRating",
+        information."commentCount"
+    FROM core_post AS post
+    LEFT JOIN core_postinformation AS information
+        ON information.post_id = post.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feedEntry', serialize=False, to='core.post')),
+                ('postStatus', models.CharField(max_length=10)),
+                ('reviewStatus', models.CharField(max_length=10)),
+                ('createdDate', models.DateTimeField()),
+                ('reviewResponseDate', models.DateTimeField(null=True)),
+                ('readTime', models.IntegerField()),
+                ('viewCount', models.PositiveIntegerField(default=0, null=True)),
+                ('socialShareCount', models.PositiveIntegerField(default=0, null=True)),
+                ('ratingCount', models.PositiveIntegerField(default=0, null=True)),
+                ('averageRating', models.FloatField(null=True)),
+                ('commentCount', models.IntegerField(default=0, null=True)),
+                ('createdBy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('postCategoryId', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.postcategory')),
+            ],
+            options={
+                'verbose_name': 'Feed Entry',
+                'verbose_name_plural': 'Feed Entries',
+            },
+        ),
+        # fill the entries before building their indexes
+        migrations.RunSQL(
+            sql=BACKFILL_SQL,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(models.OrderBy(models.F('reviewResponseDate'), descending=True, nulls_last=True), models.OrderBy(models.F('post_id'), descending=True), condition=models.Q(('postStatus__in', ['publish', 'draft'])), name='feed_review_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(condition=models.Q(('postStatus__in', ['publish', 'draft'])), fields=['readTime', 'post'], name='feed_read_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(models.OrderBy(models.F('viewCount'), descending=True, nulls_last=True), models.OrderBy(models.F('post_id'), descending=True), condition=models.Q(('postStatus__in', ['publish', 'draft'])), name='feed_viewcount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(models.OrderBy(models.F('socialShareCount'), descending=True, nulls_last=True), models.OrderBy(models.F('post_id'), descending=True), condition=models.Q(('postStatus__in', ['publish', 'draft'])), name='feed_socialsharecount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(models.OrderBy(models.F('ratingCount'), descending=True, nulls_last=True), models.OrderBy(models.F('post_id'), descending=True), condition=models.Q(('postStatus__in', ['publish', 'draft'])), name='feed_ratingcount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(models.OrderBy(models.F('averageRating'), descending=True, nulls_last=True), models.OrderBy(models.F('post_id'), descending=True), condition=models.Q(('postStatus__in', ['publish', 'draft'])), name='feed_averagerating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['createdBy', 'postStatus', '-createdDate'], name='feed_author_status_idx'),
+        ),
+        # the feed reads the indexes of the entries instead
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_feed_review_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_feed_read_time_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_author_status_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='postinformation',
+            name='postinfo_viewcount_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='postinformation',
+            name='postinfo_socialsharecount_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='postinformation',
+            name='postinfo_ratingcount_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='postinformation',
+            name='postinfo_averagerating_idx',
+        ),
+    ]
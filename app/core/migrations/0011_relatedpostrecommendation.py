@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_feedentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedPostRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='core.post')),
+                ('recommendedPost', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.post')),
+            ],
+            options={
+                'verbose_name': 'Related Post Recommendation',
+                'verbose_name_plural': 'Related Post Recommendations',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='relatedpostrecommendation',
+            constraint=models.UniqueConstraint(fields=('post', 'rank'), name='unique_recommendation_rank'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:09
+
+from django.db import migrations, models
+
+BACKFILL_PATHS_SQL = """
+    WITH RECURSIVE tree(id, path) AS (
+        SELECT id, '/' || id || '/'
+        FROM core_postcategory
+        WHERE "parentPostCategoryId_id" IS NULL
+        UNION ALL
+        SELECT category.id, tree.path || category.id || '/'
+        FROM core_postcategory AS category
+        JOIN tree ON category."parentPostCategoryId_id" = tree.id
+    )
+    UPDATE core_postcategory SET path = tree.path
+    FROM tree
+    WHERE core_postcategory.id = tree.id
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_relatedpostrecommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postcategory',
+            name='path',
+            field=models.CharField(default='', editable=False, help_text='\n        Materialized path of the category, the ids of its ancestors and\n        its own id, like /1/5/12/. The paths of the descendants of a\n        category start with its path.\n        ', max_length=255),
+        ),
+        migrations.RunSQL(BACKFILL_PATHS_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='postcategory',
+            index=models.Index(fields=['path'], name='category_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
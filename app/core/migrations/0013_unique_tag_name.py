@@ -0,0 +1,52 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:14
+
+from django.db import migrations, models
+
+# the tag kept for every name, preferably a tag which is not deleted
+KEPT_TAGS = """
+    SELECT DISTINCT ON (name) id, name
+    FROM core_tag
+    ORDER BY name, "isDeleted", id
+"""
+
+# move the posts of the duplicated tags to the kept tag of their name
+MERGE_DUPLICATE_TAGS_SQL = [
+    f"""
+    INSERT INTO core_post_tags (post_id, tag_id)
+    SELECT post_tags.post_id, kept.id
+    FROM core_post_tags AS post_tags
+    JOIN core_tag AS tag ON tag.id = post_tags.tag_id
+    JOIN ({KEPT_TAGS}) AS kept ON kept.name = tag.name
+    WHERE tag.id <> kept.id
+    ON CONFLICT DO NOTHING
+    """,
+    f"""
+    DELETE FROM core_post_tags AS post_tags
+    USING core_tag AS tag, ({KEPT_TAGS}) AS kept
+    WHERE post_tags.tag_id = tag.id
+        AND kept.name = tag.name
+        AND tag.id <> kept.id
+    """,
+    f"""
+    DELETE FROM core_tag AS tag
+    USING ({KEPT_TAGS}) AS kept
+    WHERE kept.name = tag.name AND tag.id <> kept.id
+    """,
+    # check the deferred foreign keys before altering the table
+    'SET CONSTRAINTS ALL IMMEDIATE',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_postcategory_path'),
+    ]
+
+    operations = [
+        migrations.RunSQL(MERGE_DUPLICATE_TAGS_SQL, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(fields=('name',), name='unique_tag_name'),
+        ),
+    ]
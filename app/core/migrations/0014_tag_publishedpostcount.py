@@ -0,0 +1,35 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:18
+
+from django.db import migrations, models
+
+BACKFILL_SQL = """
+    UPDATE core_tag AS tag SET "publishedPostCount" = counts.count
+    FROM (
+        SELECT post_tags.tag_id, COUNT(*) AS count
+        FROM core_post_tags AS post_tags
+        JOIN core_post AS post ON post.id = post_tags.post_id
+        WHERE post."postStatus" = 'publish'
+            AND post."reviewStatus" = 'accept'
+        GROUP BY post_tags.tag_id
+    ) AS counts
+    WHERE counts.tag_id = tag.id
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_unique_tag_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='publishedPostCount',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='\n        Number of published and accepted posts having the tag, kept up\n        to date by the post.tag_counts signals.\n        ', verbose_name='Published Post Count'),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(models.OrderBy(models.F('publishedPostCount'), descending=True), models.F('name'), name='tag_popularity_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.utils import timezone
 import os
+import random
 import uuid
 # from djrichtextfield.models import RichTextField
 from django_ckeditor_5.fields import CKEditor5Field
@@ -10,6 +11,20 @@ from ._base_models import AuditModel
 from django.conf import settings
 from django.core.validators import MaxValueValidator
 from django.core.exceptions import ValidationError
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat, Substr
+
+
+# the condition of the partial indexes of the feed orderings, implied by
+# the feed and by the feed including the drafts of the current user
+FEED_INDEX_CONDITION = Q(postStatus__in=['publish', 'draft'])
+# average rating of the posts recommended as high rated
+HIGH_RATED_MIN_RATING = 4
+# counters of the post information the feed is sorted by
+FEED_COUNTER_FIELDS = ['viewCount', 'socialShareCount', 'ratingCount',
+                       'averageRating']
 
 
 def blog_category_image_file_path(instance, filename):
@@ -52,10 +67,52 @@ class PostCategory(AuditModel):
         default='Active',
         help_text='Indicates the status of the category'
     )
+    path = models.CharField(
+        max_length=255,
+        default='',
+        editable=False,
+        help_text="""
+        Materialized path of the category, the ids of its ancestors and
+        its own id, like /1/5/12/. The paths of the descendants of a
+        category start with its path.
+        """
+    )
 
     class Meta:
         verbose_name = "Post Category"
         verbose_name_plural = "Post Categories"
+        indexes = [
+            # serves the path prefix matches of the descendants
+            models.Index(fields=['path'],
+                         name='category_path_idx',
+                         opclasses=['varchar_pattern_ops']),
+        ]
+
+    def _build_path(self):
+        parent = self.parentPostCategoryId
+        return f'{parent.path if parent else "/"}{self.pk}/'
+
+    def clean(self):
+        super().clean()
+        parent = self.parentPostCategoryId
+        if parent and self.path and parent.path.startswith(self.path):
+            raise ValidationError(
+                "A category cannot be moved under itself or its subcategories.")  # noqa
+
+    def save(self, *args, **kwargs):
+        self.clean()
+        super().save(*args, **kwargs)
+        path = self._build_path()
+        if path == self.path:
+            return
+        old_path, self.path = self.path, path
+        PostCategory.objects.filter(pk=self.pk).update(path=path)
+        if old_path:
+            # move the subtree along
+            PostCategory.objects.filter(
+                path__startswith=old_path
+            ).exclude(pk=self.pk).update(
+                path=Concat(Value(path), Substr('path', len(old_path) + 1)))
 
     def __str__(self):
         return self.title
@@ -63,9 +120,9 @@ class PostCategory(AuditModel):
 
 class PostQuerySet(models.QuerySet):
     def high_rated(self):
-        return self.annotate(
-            avg_rating=Avg(
-                'postInformation__averageRating')).filter(avg_rating__gte=4)
+        # one information per post, nothing to aggregate
+        return self.filter(
+            postInformation__averageRating__gte=HIGH_RATED_MIN_RATING)
 
     def accepted(self):
         return self.filter(reviewStatus='accept')
@@ -73,6 +130,7 @@ class PostQuerySet(models.QuerySet):
     def published(self):
         return self.filter(postStatus='publish')
 
+
 class PostManager(models.Manager):
     def get_queryset(self):
         return PostQuerySet(self.model, using=self._db)
@@ -81,12 +139,17 @@ class PostManager(models.Manager):
         return self.get_queryset().published().accepted()
 
     def get_random_high_rated_posts(self, count):
-        high_rated_posts = self.get_queryset().published().high_rated().accepted()
+        """
+        Return up to ``count`` random published high rated posts.
 
-        # Ensure the count does not exceed the number of available posts
-        if count > high_rated_posts.count():
-            count = high_rated_posts.count()
-        return random.sample(list(high_rated_posts), count)
+        Only the ids are loaded to draw the sample, the API serves the
+        sample from a pool of ids instead, see post.recommendations.
+        """
+        post_ids = list(self.published_and_accepted().high_rated(
+        ).order_by().values_list('pk', flat=True))
+        sample = random.sample(post_ids, min(count, len(post_ids)))
+        posts = self.get_queryset().in_bulk(sample)
+        return [posts[pk] for pk in sample]
 
 
 class Post(AuditModel):
@@ -194,12 +257,30 @@ class Post(AuditModel):
         'self',
         blank=True
         )
+    searchVector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="""
+        Weighted full-text search vector of the title, excerpt and content,
+        kept up to date when the post is saved.
+        """
+        )
 
     objects = PostManager()
-    
+
     class Meta:
         verbose_name = "Post"
         verbose_name_plural = "Posts"
+        indexes = [
+            GinIndex(fields=['searchVector'],
+                     name='post_search_vector_idx'),
+            GinIndex(fields=['title'],
+                     name='post_title_trgm_idx',
+                     opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['excerpt'],
+                     name='post_excerpt_trgm_idx',
+                     opclasses=['gin_trgm_ops']),
+        ]
 
     def _can_change_postStatus(self, new_status):
         if self.postStatus == 'draft' and new_status in ['draft',
@@ -272,10 +353,29 @@ class Tag(AuditModel):
         default=False,
         verbose_name="Is Deleted"
     )
+    publishedPostCount = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Published Post Count",
+        help_text="""
+        Number of published and accepted posts having the tag, kept up
+        to date by the post.tag_counts signals.
+        """
+    )
 
     class Meta:
         verbose_name = "Tag"
         verbose_name_plural = "Tags"
+        constraints = [
+            # tags are resolved by name
+            models.UniqueConstraint(fields=['name'],
+                                    name='unique_tag_name'),
+        ]
+        indexes = [
+            # the popular tags
+            models.Index(F('publishedPostCount').desc(), F('name'),
+                         name='tag_popularity_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -325,6 +425,13 @@ class PostInformation(models.Model):
         blank=True,
         default=0
     )
+    ratingSum = models.PositiveIntegerField(
+        help_text="""
+        Sum of the user ratings, kept with ratingCount to update the
+        average rating without aggregating all the ratings.
+        """,
+        default=0
+    )
     averageRating = models.FloatField(
         help_text="""
         Calculates the average rating score based on user ratings,
@@ -359,6 +466,91 @@ class PostInformation(models.Model):
         verbose_name_plural = 'Posts Information'
 
 
+class FeedEntry(models.Model):
+    """
+    Read optimized copy of the columns the feed filters and sorts posts
+    by, from the post and its information.
+
+    The feed reads a page from one index of this table instead of joining
+    the posts to their information, see post.feed_entries.
+    """
+    post = models.OneToOneField(
+        'Post',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='feedEntry'
+    )
+    postStatus = models.CharField(max_length=10)
+    reviewStatus = models.CharField(max_length=10)
+    postCategoryId = models.ForeignKey(
+        PostCategory,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    createdBy = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    createdDate = models.DateTimeField()
+    reviewResponseDate = models.DateTimeField(null=True)
+    readTime = models.IntegerField()
+    viewCount = models.PositiveIntegerField(null=True, default=0)
+    socialShareCount = models.PositiveIntegerField(null=True, default=0)
+    ratingCount = models.PositiveIntegerField(null=True, default=0)
+    averageRating = models.FloatField(null=True)
+    commentCount = models.IntegerField(null=True, default=0)
+
+    class Meta:
+        verbose_name = 'Feed Entry'
+        verbose_name_plural = 'Feed Entries'
+        # orderings of the feed, see post.pagination.POST_SORT_KEYS
+        indexes = [
+            models.Index(F('reviewResponseDate').desc(nulls_last=True),
+                         F('post_id').desc(),
+                         name='feed_review_date_idx',
+                         condition=FEED_INDEX_CONDITION),
+            models.Index(fields=['readTime', 'post'],
+                         name='feed_read_time_idx',
+                         condition=FEED_INDEX_CONDITION),
+            *[models.Index(F(field).desc(nulls_last=True),
+                           F('post_id').desc(),
+                           name=f'feed_{field.lower()}_idx',
+                           condition=FEED_INDEX_CONDITION)
+              for field in FEED_COUNTER_FIELDS],
+            # the posts of the current user and their drafts
+            models.Index(fields=['createdBy', 'postStatus', '-createdDate'],
+                         name='feed_author_status_idx'),
+        ]
+
+
+class RelatedPostRecommendation(models.Model):
+    """
+    Post recommended next to another one, computed offline from their
+    shared tags, SEO keywords, category and text, see post.related_posts.
+    """
+    post = models.ForeignKey(
+        'Post',
+        on_delete=models.CASCADE,
+        related_name='recommendations'
+    )
+    recommendedPost = models.ForeignKey(
+        'Post',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        verbose_name = 'Related Post Recommendation'
+        verbose_name_plural = 'Related Post Recommendations'
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'rank'],
+                                    name='unique_recommendation_rank'),
+        ]
+
+
 class PostRate(models.Model):
     """Rating For Posts"""
     post = models.ForeignKey(
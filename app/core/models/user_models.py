@@ -5,6 +5,7 @@ from django.contrib.auth.models import (
     AbstractBaseUser,
     PermissionsMixin
 )
+from django.contrib.postgres.indexes import GinIndex
 import os
 import uuid
 
@@ -67,3 +68,10 @@ class User(AbstractBaseUser, PermissionsMixin):
     objects = UserManager()
 
     USERNAME_FIELD = 'email'  # The field that is used for authentication
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['name'],
+                     name='user_name_trgm_idx',
+                     opclasses=['gin_trgm_ops']),
+        ]
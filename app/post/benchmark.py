@@ -0,0 +1,150 @@
+"""
+Helpers to seed synthetic posts and time queries for the benchmark
+management commands.
+
+Seeded posts belong to ``benchmark-*@example.com`` users, so they can be
+told apart from real content.
+"""
+import math
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import Post, PostCategory, PostInformation
+from post.feed_entries import refresh_feed_entries
+from post.search import update_search_vectors
+
+WORDS = [
+    'django', 'python', 'postgres', 'index', 'query', 'cache', 'search',
+    'design', 'pattern', 'testing', 'deploy', 'docker', 'scaling', 'rest',
+    'framework', 'model', 'serializer', 'migration', 'performance', 'async',
+    'security', 'token', 'admin', 'template', 'signal', 'middleware',
+    'pagination', 'cursor', 'trigram', 'vector', 'ranking', 'feed',
+]
+FIRST_NAMES = ['Majid', 'Sara', 'Reza', 'Nika', 'Omid', 'Lena', 'Arash',
+               'Mina', 'Kian', 'Dana']
+LAST_NAMES = ['Noorani', 'Rahimi', 'Karimi', 'Ahmadi', 'Moradi', 'Tehrani',
+              'Jafari', 'Hosseini']
+
+
+def _sentence(words):
+    return ' '.join(random.choice(WORDS) for _ in range(words))
+
+
+def get_benchmark_authors(count=20):
+    """Return the benchmark users, creating them when needed."""
+    User = get_user_model()
+    authors = []
+    for index in range(count):
+        email = f'benchmark-{index}@example.com'
+        author = User.objects.filter(email=email).first()
+        if author is None:
+            author = User.objects.create_user(
+                email=email,
+                name=(f'{random.choice(FIRST_NAMES)} '
+                      f'{random.choice(LAST_NAMES)}'),
+            )
+        authors.append(author)
+    return authors
+
+
+def _post_information(post):
+    ratingCount = random.randint(0, 500)
+    ratingSum = random.randint(ratingCount, 5 * ratingCount)
+    return PostInformation(
+        post=post,
+        viewCount=random.randint(0, 10 ** 5),
+        socialShareCount=random.randint(0, 10 ** 3),
+        ratingCount=ratingCount,
+        ratingSum=ratingSum,
+        averageRating=(round(ratingSum / ratingCount, 2)
+                       if ratingCount else 0.0),
+        commentCount=random.randint(0, 200),
+    )
+
+
+def seed_posts(count, batch_size=5000, stdout=None):
+    """
+    Create synthetic posts until ``count`` benchmark posts exist.
+
+    Around 80% of the posts are published and accepted, the rest are
+    drafts or pending review. Returns the number of created posts.
+    """
+    authors = get_benchmark_authors()
+    category, _ = PostCategory.objects.get_or_create(
+        title='Benchmark',
+        defaults={'createdBy': authors[0], 'updatedBy': authors[0]})
+    existing = Post.objects.filter(
+        createdBy__email__startswith='benchmark-').count()
+    now = timezone.now()
+
+    created = 0
+    while existing + created < count:
+        size = min(batch_size, count - existing - created)
+        posts = []
+        for _ in range(size):
+            author = random.choice(authors)
+            published = random.random() < 0.8
+            posts.append(Post(
+                title=_sentence(5).capitalize(),
+                excerpt=_sentence(20),
+                content=f'<p>{_sentence(150)}</p>',
+                readTime=random.randint(1, 30),
+                postCategoryId=category,
+                postStatus='publish' if published else 'draft',
+                reviewStatus='accept' if published else 'pending',
+                reviewResponseDate=(
+                    now - timedelta(minutes=random.randint(0, 10 ** 6))
+                    if published else None),
+                createdBy=author,
+                updatedBy=author,
+            ))
+        with transaction.atomic():
+            posts = Post.objects.bulk_create(posts)
+            PostInformation.objects.bulk_create([
+                _post_information(post) for post in posts])
+            post_ids = [post.pk for post in posts]
+            update_search_vectors(Post.objects.filter(pk__in=post_ids))
+            refresh_feed_entries(post_ids)
+        created += size
+        if stdout:
+            stdout.write(f'seeded {existing + created}/{count} posts')
+    return created
+
+
+def analyze(*models):
+    """Refresh the planner statistics of the tables of the models."""
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(
+                f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+
+def time_queryset(build_queryset, runs, page_size=10):
+    """
+    Evaluate the first page of the queryset ``runs`` times and return
+    the latencies in milliseconds.
+    """
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        list(build_queryset()[:page_size])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def percentile(values, pct):
+    """Return the ``pct`` percentile of the values (nearest rank)."""
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def uses_index(queryset):
+    """Tell if the query plan reads an index instead of scanning."""
+    plan = queryset.explain()
+    return 'Index' in plan
@@ -0,0 +1,378 @@
+"""
+Cache versions of the post feed and the post details.
+
+Cached data is keyed by a version number stored in the Django cache.
+Bumping a version makes the entries of the previous version unreachable,
+so they simply expire:
+
+- the feed generation is bumped when the set of visible posts changes
+  (a post is created, published, accepted, archived or deleted).
+- the version of a post is bumped when the post, its author or its tags,
+  SEO keywords or related posts change, it keys the cached detail and
+  list data of the post.
+- the category version is bumped when a category changes, it keys the
+  cached category tree together with the feed generation, which changes
+  with the published post counts of the tree.
+- the tag version is bumped when a tag is created, renamed or deleted,
+  it reloads the tag name index of the autocomplete.
+
+When a version is evicted from the cache it restarts from the current
+time in milliseconds, above any version handed out before.
+
+Small, read-mostly data is kept in every process by a
+``ProcessLocalSnapshot``, reloaded when its version changes. Every
+snapshot is also reloaded after a timeout, as a process local cache
+backend does not share the versions with the other processes.
+
+The feed pages of anonymous readers are cached with stale while
+revalidate: an expired page, or a page of an older generation, keeps
+being served while a single request rebuilds it, so an expiry never
+sends every reader to the database at once.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import QueryDict
+
+FEED_GENERATION_KEY = 'post:feed:generation'
+POST_VERSION_KEY = 'post:version:{post_id}'
+POST_DETAIL_KEY = 'post:detail:{post_id}:{version}'
+POST_SUMMARY_KEY = 'post:summary:{post_id}:{version}'
+FEED_PAGE_KEY = 'post:feed:page:{digest}'
+CATEGORY_VERSION_KEY = 'post:category:version'
+CATEGORY_TREE_KEY = 'post:category:tree:{version}:{generation}'
+TAG_VERSION_KEY = 'post:tag:version'
+FEED_COUNTER_CHANGES_KEY = 'post:feed:counter-changes'
+# seconds a single request may take to rebuild a stale feed page
+FEED_REBUILD_LOCK_TIMEOUT = 10
+# query parameters selecting a page of the anonymous feed
+FEED_PAGE_PARAMS = (
+    'tags', 'postCategoryId', 'includeSubcategories', 'authorName', 'sort',
+    'search', 'searchMode', 'reviewResponseDate', 'page', 'pagination',
+    'cursor', 'includeCount', 'currentUserPosts',
+)
+# parameters holding comma separated ids, in any order
+FEED_ID_LIST_PARAMS = ('tags', 'postCategoryId')
+# counters of the post detail cache
+POST_DETAIL_HITS_KEY = 'post:detail:hits'
+POST_DETAIL_MISSES_KEY = 'post:detail:misses'
+# counters of the feed page cache
+FEED_PAGE_HITS_KEY = 'post:feed:hits'
+FEED_PAGE_STALE_HITS_KEY = 'post:feed:stale-hits'
+FEED_PAGE_MISSES_KEY = 'post:feed:misses'
+
+
+def _new_version():
+    return time.time_ns() // 10 ** 6
+
+
+def get_version(key):
+    """Return the version stored at the key."""
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    """Invalidate the data cached with the version stored at the key."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # the version was evicted
+        cache.add(key, _new_version(), timeout=None)
+        return cache.get(key)
+
+
+def get_feed_generation():
+    """Return the current generation of the post feed."""
+    return get_version(FEED_GENERATION_KEY)
+
+
+def bump_feed_generation():
+    """Invalidate the cached feed data."""
+    return bump_version(FEED_GENERATION_KEY)
+
+
+def note_counter_change(amount=1):
+    """
+    Record changes of the post counters sorting the feed.
+
+    Counters change all the time, so the feed generation is only bumped
+    once ``POST_FEED_COUNTER_CHANGE_THRESHOLD`` changes added up.
+    """
+    if amount <= 0:
+        return
+    try:
+        changes = cache.incr(FEED_COUNTER_CHANGES_KEY, amount)
+    except ValueError:
+        cache.add(FEED_COUNTER_CHANGES_KEY, 0, timeout=None)
+        changes = cache.incr(FEED_COUNTER_CHANGES_KEY, amount)
+    if changes >= settings.POST_FEED_COUNTER_CHANGE_THRESHOLD:
+        cache.set(FEED_COUNTER_CHANGES_KEY, 0, timeout=None)
+        bump_feed_generation()
+
+
+def get_post_version(post_id):
+    """Return the version of the cached detail of the post."""
+    return get_version(POST_VERSION_KEY.format(post_id=post_id))
+
+
+def bump_post_versions(post_ids):
+    """Invalidate the cached details of the posts."""
+    for post_id in post_ids:
+        bump_version(POST_VERSION_KEY.format(post_id=post_id))
+
+
+def get_category_version():
+    """Return the version of the cached category data."""
+    return get_version(CATEGORY_VERSION_KEY)
+
+
+def bump_category_version():
+    """Invalidate the cached category data."""
+    return bump_version(CATEGORY_VERSION_KEY)
+
+
+def get_tag_version():
+    """Return the version of the tag names."""
+    return get_version(TAG_VERSION_KEY)
+
+
+def bump_tag_version():
+    """Invalidate the tag names loaded in the processes."""
+    return bump_version(TAG_VERSION_KEY)
+
+
+def increment_counter(key):
+    """Add one to a counter of the cache."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_cached_post_detail(post_id, build):
+    """
+    Return the cached detail data of the post.
+
+    On a miss, the data is built by calling ``build`` and cached for
+    ``POST_DETAIL_CACHE_TIMEOUT`` seconds.
+    """
+    version = get_post_version(post_id)
+    key = POST_DETAIL_KEY.format(post_id=post_id, version=version)
+    data = cache.get(key)
+    if data is not None:
+        increment_counter(POST_DETAIL_HITS_KEY)
+        return data
+
+    increment_counter(POST_DETAIL_MISSES_KEY)
+    data = build()
+    cache.set(key, data, settings.POST_DETAIL_CACHE_TIMEOUT)
+    return data
+
+
+def get_cached_post_summaries(post_ids, build):
+    """
+    Return the cached list data of the posts, a mapping of post ids to
+    data.
+
+    The missing posts are built together by calling ``build`` with their
+    ids, it returns the data of the ones still listed, and cached like
+    the post details.
+    """
+    version_keys = {
+        post_id: POST_VERSION_KEY.format(post_id=post_id)
+        for post_id in post_ids
+    }
+    versions = cache.get_many(version_keys.values())
+    keys = {
+        post_id: POST_SUMMARY_KEY.format(
+            post_id=post_id,
+            version=versions.get(key) or get_version(key))
+        for post_id, key in version_keys.items()
+    }
+    cached = cache.get_many(keys.values())
+    summaries = {
+        post_id: cached[key] for post_id, key in keys.items()
+        if key in cached
+    }
+
+    missing = [post_id for post_id in post_ids if post_id not in summaries]
+    if missing:
+        built = build(missing)
+        cache.set_many({
+            keys[post_id]: data for post_id, data in built.items()
+        }, settings.POST_DETAIL_CACHE_TIMEOUT)
+        summaries.update(built)
+    return summaries
+
+
+def get_cached_category_tree(build):
+    """
+    Return the cached category tree, built by calling ``build`` on a miss
+    and cached for ``POST_DETAIL_CACHE_TIMEOUT`` seconds.
+    """
+    key = CATEGORY_TREE_KEY.format(version=get_category_version(),
+                                   generation=get_feed_generation())
+    tree = cache.get(key)
+    if tree is None:
+        tree = build()
+        cache.set(key, tree, settings.POST_DETAIL_CACHE_TIMEOUT)
+    return tree
+
+
+def normalize_feed_params(params):
+    """
+    Return a query dict of the non empty params selecting a feed page,
+    with the ids of the id lists sorted.
+    """
+    normalized = QueryDict(mutable=True)
+    for name in FEED_PAGE_PARAMS:
+        value = params.get(name, '').strip()
+        if name in FEED_ID_LIST_PARAMS and value:
+            value = ','.join(sorted(set(
+                item.strip() for item in value.split(','))))
+        if value:
+            normalized[name] = value
+    normalized._mutable = False
+    return normalized
+
+
+def feed_page_key(params, origin):
+    """
+    Return the cache key of the feed page selected by the params.
+
+    ``origin`` is the scheme and host of the request, the links to the
+    next and previous pages are absolute.
+    """
+    query = normalize_feed_params(params).urlencode()
+    digest = hashlib.sha1(f'{origin}\n{query}'.encode()).hexdigest()
+    return FEED_PAGE_KEY.format(digest=digest)
+
+
+def get_cached_feed_page(params, origin, build):
+    """
+    Return the cached data of an anonymous feed page and the time it was
+    built at.
+
+    A page is fresh for ``POST_FEED_CACHE_TIMEOUT`` seconds and in the
+    current feed generation. Otherwise it is stale: the first request
+    takes the rebuild lock and rebuilds it with ``build``, while the
+    others keep getting the stale page, for at most
+    ``POST_FEED_CACHE_STALE_TIMEOUT`` seconds.
+    """
+    key = feed_page_key(params, origin)
+    lock_key = f'{key}:lock'
+    generation = get_feed_generation()
+    entry = cache.get(key)
+    if (entry is not None and entry['generation'] == generation
+            and entry['expires'] > time.time()):
+        increment_counter(FEED_PAGE_HITS_KEY)
+        return entry['data'], entry['built']
+
+    locked = cache.add(lock_key, 1, FEED_REBUILD_LOCK_TIMEOUT)
+    if entry is not None and not locked:
+        # another request is rebuilding the page
+        increment_counter(FEED_PAGE_STALE_HITS_KEY)
+        return entry['data'], entry['built']
+
+    increment_counter(FEED_PAGE_MISSES_KEY)
+    try:
+        data = build()
+        built = time.time()
+        entry = {
+            'generation': generation,
+            'built': built,
+            'expires': built + settings.POST_FEED_CACHE_TIMEOUT,
+            'data': data,
+        }
+        cache.set(key, entry, settings.POST_FEED_CACHE_TIMEOUT
+                  + settings.POST_FEED_CACHE_STALE_TIMEOUT)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return data, built
+
+
+def _cache_stats(counter_keys):
+    counters = cache.get_many(counter_keys.values())
+    stats = {
+        name: counters.get(key, 0) for name, key in counter_keys.items()
+    }
+    total = sum(stats.values())
+    misses = stats['misses']
+    stats['hitRatio'] = round((total - misses) / total, 4) if total else None
+    return stats
+
+
+class ProcessLocalSnapshot:
+    """
+    Data loaded by calling ``load`` and kept in the process.
+
+    It is reloaded when the version returned by ``get_version`` changes,
+    when given, and when it gets older than the number of seconds of the
+    ``timeout_setting``.
+    """
+
+    def __init__(self, load, timeout_setting, get_version=None):
+        self._load = load
+        self._timeout_setting = timeout_setting
+        self._get_version = get_version
+        self._data = None
+        self._version = None
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _is_stale(self, version):
+        return (self._loaded_at is None
+                or version != self._version
+                or time.monotonic() - self._loaded_at
+                > getattr(settings, self._timeout_setting))
+
+    def _get(self):
+        version = self._get_version() if self._get_version else None
+        if self._is_stale(version):
+            with self._lock:
+                # another thread may have reloaded it meanwhile
+                if self._is_stale(version):
+                    # read before loading, a change made meanwhile
+                    # reloads it again
+                    self._data = self._load()
+                    self._version = version
+                    self._loaded_at = time.monotonic()
+        return self._data
+
+    def version(self):
+        """
+        Return the version of the snapshot, it changes whenever the
+        snapshot is reloaded.
+        """
+        self._get()
+        return self._version, self._loaded_at
+
+    def clear(self):
+        """Reload the snapshot on its next use."""
+        self._loaded_at = None
+
+
+def get_post_detail_cache_stats():
+    """Return the hits, misses and hit ratio of the post detail cache."""
+    return _cache_stats({
+        'hits': POST_DETAIL_HITS_KEY,
+        'misses': POST_DETAIL_MISSES_KEY,
+    })
+
+
+def get_feed_page_cache_stats():
+    """Return the hits, stale hits, misses and hit ratio of the feed."""
+    return _cache_stats({
+        'hits': FEED_PAGE_HITS_KEY,
+        'staleHits': FEED_PAGE_STALE_HITS_KEY,
+        'misses': FEED_PAGE_MISSES_KEY,
+    })
@@ -0,0 +1,100 @@
+"""
+Tree of the post categories.
+
+Every category keeps its materialized path, the ids of its ancestors and
+its own, see ``PostCategory.path``, so the subcategories of a category
+at any depth are the categories whose path starts with its path, found
+with one query instead of walking the children level by level.
+
+The category table is small and read-mostly, so every process keeps a
+snapshot of it, see ``CategorySnapshot``, to answer the category list
+and details without querying the database.
+"""
+from django.db.models import Count, Exists, F, OuterRef
+from django.db.models.lookups import StartsWith
+
+from core.models import FeedEntry, PostCategory
+from post.caching import ProcessLocalSnapshot, get_category_version
+
+
+def descendant_categories(category_ids):
+    """Return the categories and all their subcategories."""
+    ancestors = PostCategory.objects.filter(
+        StartsWith(OuterRef('path'), F('path')),
+        pk__in=category_ids)
+    return PostCategory.objects.filter(Exists(ancestors))
+
+
+def build_category_tree():
+    """
+    Return the nested categories, every one with the number of published
+    posts of the category and of its whole subtree.
+    """
+    categories = list(PostCategory.objects.order_by('title').values_list(
+        'id', 'title', 'parentPostCategoryId', 'path'))
+    post_counts = dict(FeedEntry.objects.filter(
+        reviewStatus='accept',
+        postStatus='publish'
+    ).order_by().values_list('postCategoryId').annotate(Count('pk')))
+
+    nodes = {}
+    for category_id, title, _, _ in categories:
+        post_count = post_counts.get(category_id, 0)
+        nodes[category_id] = {
+            'id': category_id,
+            'title': title,
+            'postCount': post_count,
+            'totalPostCount': post_count,
+            'children': [],
+        }
+
+    tree = []
+    for category_id, _, parent_id, _ in categories:
+        siblings = nodes[parent_id]['children'] if parent_id else tree
+        siblings.append(nodes[category_id])
+
+    # the deepest categories first, so the children are counted before
+    # their parent adds them up
+    by_depth = sorted(categories,
+                      key=lambda category: -category[3].count('/'))
+    for category_id, _, parent_id, _ in by_depth:
+        if parent_id:
+            nodes[parent_id]['totalPostCount'] += (
+                nodes[category_id]['totalPostCount'])
+    return tree
+
+
+class CategorySnapshot(ProcessLocalSnapshot):
+    """
+    Process local copy of the post categories, ordered by title, with
+    their parents set from the copy. It is reloaded when the category
+    version changes, see ``bump_category_version``.
+    """
+
+    def __init__(self):
+        super().__init__(self._load_categories,
+                         'POST_CATEGORY_SNAPSHOT_TIMEOUT',
+                         get_category_version)
+
+    def _load_categories(self):
+        categories = list(PostCategory.objects.order_by('title'))
+        by_id = {category.pk: category for category in categories}
+        for category in categories:
+            # instead of lazy loading the parent of every category
+            category.parentPostCategoryId = by_id.get(
+                category.parentPostCategoryId_id)
+        return categories, by_id
+
+    def all(self):
+        """Return the categories, ordered by title."""
+        return self._get()[0]
+
+    def get(self, category_id):
+        """Return the category of the id, or None."""
+        try:
+            return self._get()[1].get(int(category_id))
+        except (TypeError, ValueError):
+            return None
+
+
+category_snapshot = CategorySnapshot()
@@ -0,0 +1,81 @@
+"""
+Comment counts of posts.
+
+``PostInformation.commentCount`` is kept with atomic increments when a
+comment is created and decrements when comments are deleted. Deleting a
+comment cascades to its replies, so the whole subtree is counted with one
+recursive query and every post is decremented once.
+"""
+from django.db import connection
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from core.models import Comment, PostInformation
+from post.caching import note_counter_change
+from post.feed_entries import update_post_counters
+
+SUBTREE_COUNTS_SQL = """
+    WITH RECURSIVE subtree (id, post_id) AS (
+        SELECT id, post_id FROM core_comment WHERE id = ANY(%s)
+        UNION
+        SELECT reply.id, reply.post_id
+        FROM core_comment AS reply
+        JOIN subtree ON reply."parentComment_id" = subtree.id
+    )
+    SELECT post_id, count(*) FROM subtree GROUP BY post_id
+"""
+
+
+def add_comment_counts(counts):
+    """Add the counts, a mapping of post ids to deltas, to the posts."""
+    changed = [post_id for post_id, delta in counts.items() if delta]
+    for post_id in changed:
+        PostInformation.objects.filter(post_id=post_id).update(
+            commentCount=F('commentCount') + counts[post_id])
+    if changed:
+        update_post_counters(changed)
+    note_counter_change(sum(abs(delta) for delta in counts.values()))
+
+
+def comment_subtree_counts(comment_ids):
+    """
+    Return the number of comments per post of the comments and all their
+    replies.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(SUBTREE_COUNTS_SQL, [list(comment_ids)])
+        return dict(cursor.fetchall())
+
+
+def _comment_count_subquery():
+    comments = Comment.objects.filter(
+        post=OuterRef('post_id')
+    ).order_by().values('post').annotate(count=Count('id')).values('count')
+    return Coalesce(Subquery(comments, output_field=IntegerField()), 0)
+
+
+def find_comment_count_mismatches():
+    """
+    Return the post information whose comment count differs from the
+    comments, annotated with the ``actualCommentCount``.
+    """
+    return PostInformation.objects.annotate(
+        actualCommentCount=_comment_count_subquery()
+    ).exclude(
+        commentCount=F('actualCommentCount')
+    ).order_by('post_id')
+
+
+def rebuild_comment_counts(queryset=None):
+    """
+    Recount the comments of the posts in one statement and copy the
+    counts to their feed entries.
+    """
+    post_ids = None
+    if queryset is None:
+        queryset = PostInformation.objects.all()
+    else:
+        post_ids = list(queryset.values_list('post_id', flat=True))
+    updated = queryset.update(commentCount=_comment_count_subquery())
+    update_post_counters(post_ids)
+    return updated
@@ -0,0 +1,100 @@
+"""
+Conditional GET for the read endpoints.
+
+Responses carry an ``ETag`` and a ``Last-Modified`` header computed from
+a cheap query, the ``updatedDate`` of the object or the latest
+``updatedDate`` and the number of objects of a list. A request repeating
+them in ``If-None-Match`` or ``If-Modified-Since`` gets a 304 without the
+response being rendered.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import (
+    get_conditional_response,
+    patch_vary_headers,
+    quote_etag
+)
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """Return a quoted ETag hashing the parts."""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+class ConditionalGetMixin:
+    """
+    Answer GET requests with a 304 when the client already has the
+    current data.
+
+    Views describe their data with ``get_list_validators`` and
+    ``get_object_validators``, returning the parts of the ETag and the
+    last modified datetime. Use ``ConditionalListMixin`` and
+    ``ConditionalRetrieveMixin`` to apply them to ``list`` and
+    ``retrieve``.
+    """
+    # the data depends on the authenticated user
+    conditional_vary_headers = ('Authorization',)
+
+    def get_list_validators(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        summary = queryset.order_by().aggregate(
+            lastModified=Max('updatedDate'), count=Count('pk'))
+        return ((summary['lastModified'], summary['count']),
+                summary['lastModified'])
+
+    def get_object_validators(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        updated = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        ).values_list('updatedDate', flat=True).first()
+        if updated is None:
+            return None, None
+        return (updated,), updated
+
+    def conditional_response(self, request, get_validators, render):
+        """
+        Return a 304 if the validators match the request, otherwise the
+        response of ``render`` with the validators added to it.
+        """
+        parts, last_modified = get_validators()
+        if parts is None:
+            # missing object, the response tells why
+            return render()
+        user_id = request.user.pk if request.user.is_authenticated else None
+        etag = make_etag(user_id, *parts)
+        last_modified = (
+            int(last_modified.timestamp()) if last_modified else None)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = render()
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            patch_vary_headers(response, self.conditional_vary_headers)
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    """Conditional GET of the list action."""
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, self.get_list_validators,
+            lambda: super(ConditionalListMixin, self).list(
+                request, *args, **kwargs))
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    """Conditional GET of the retrieve action."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, self.get_object_validators,
+            lambda: super(ConditionalRetrieveMixin, self).retrieve(
+                request, *args, **kwargs))
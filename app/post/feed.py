@@ -0,0 +1,127 @@
+"""
+Query of the post feed.
+
+The feed is built by a pipeline of filters, every one adding its
+conditions to the single WHERE clause of the posts query:
+
+- the visibility: the published and accepted posts, and the drafts of
+  the current user, as one OR condition instead of a union of querysets.
+- the tag filter is an EXISTS subquery, joining the tags would repeat
+  the posts having several of them and need a DISTINCT.
+- the category, author and review date filters. With
+  ``includeSubcategories=1`` the category filter also keeps the posts of
+  the subcategories, read from the category paths in a subquery.
+
+The status, category, review date and ordering keys are read from the
+``FeedEntry`` of the posts, so the planner can walk the partial index of
+the sort column, see ``FeedEntry.Meta.indexes``, filter on the same rows
+and stop at the end of the page.
+"""
+from django.db.models import Exists, OuterRef, Q
+from rest_framework.exceptions import PermissionDenied, ValidationError
+
+from core.models import Post
+from post.categories import descendant_categories
+from post.search import SEARCH_MODES
+
+
+def _param_ids(params, name):
+    """Return the comma separated ids of the query parameter."""
+    try:
+        return [int(item) for item in params[name].split(',')]
+    except ValueError:
+        raise ValidationError({name: 'Invalid ids.'})
+
+
+def filter_visibility(queryset, params, user):
+    """
+    Keep the published and accepted posts and the drafts of the user, or
+    only the posts of the user with ``currentUserPosts=1``.
+    """
+    if params.get('currentUserPosts', '0') not in ('', '0'):
+        if not user.is_authenticated:
+            raise PermissionDenied('User is not authenticated')
+        return queryset.filter(
+            feedEntry__createdBy=user,
+            feedEntry__postStatus__in=['publish', 'draft'])
+
+    visible = Q(feedEntry__reviewStatus='accept',
+                feedEntry__postStatus='publish')
+    if user.is_authenticated:
+        # the drafts of the user are returned whatever their review
+        visible |= Q(feedEntry__createdBy=user,
+                     feedEntry__postStatus='draft')
+    return queryset.filter(visible)
+
+
+def filter_search(queryset, params, user):
+    """Keep the posts matching ``search``, annotated with their rank."""
+    search = params.get('search')
+    if not search:
+        return queryset
+    search_posts = SEARCH_MODES.get(
+        params.get('searchMode'), SEARCH_MODES['fulltext'])
+    return search_posts(queryset, search)
+
+
+def filter_tags(queryset, params, user):
+    """Keep the posts having any of the ``tags``."""
+    if not params.get('tags'):
+        return queryset
+    tagged = Post.tags.through.objects.filter(
+        post_id=OuterRef('pk'), tag_id__in=_param_ids(params, 'tags'))
+    return queryset.filter(Exists(tagged))
+
+
+def filter_categories(queryset, params, user):
+    """
+    Keep the posts of any of the ``postCategoryId`` categories, and of
+    their subcategories with ``includeSubcategories=1``.
+    """
+    if not params.get('postCategoryId'):
+        return queryset
+    category_ids = _param_ids(params, 'postCategoryId')
+    if params.get('includeSubcategories', '0') not in ('', '0'):
+        category_ids = descendant_categories(category_ids).values('pk')
+    return queryset.filter(feedEntry__postCategoryId__in=category_ids)
+
+
+def filter_author(queryset, params, user):
+    """Keep the posts of the authors whose name is like ``authorName``."""
+    author_name = params.get('authorName')
+    if not author_name:
+        return queryset
+    # uses the trigram index of the user names
+    return queryset.filter(createdBy__name__trigram_word_similar=author_name)
+
+
+def filter_review_response_date(queryset, params, user):
+    """Keep the posts reviewed in the ``reviewResponseDate`` range."""
+    date_range = params.get('reviewResponseDate')
+    if not date_range:
+        return queryset
+    return queryset.filter(
+        feedEntry__reviewResponseDate__range=date_range.split(','))
+
+
+FEED_FILTERS = (
+    filter_visibility,
+    filter_search,
+    filter_tags,
+    filter_categories,
+    filter_author,
+    filter_review_response_date,
+)
+
+
+def filter_feed(queryset, params, user):
+    """Apply the ``FEED_FILTERS`` of the query parameters."""
+    for feed_filter in FEED_FILTERS:
+        queryset = feed_filter(queryset, params, user)
+    return queryset
+
+
+def build_feed(queryset, params, user, sort_key):
+    """Return the posts of the feed, ordered by the sort key."""
+    queryset = filter_feed(queryset, params, user)
+    return queryset.order_by(*sort_key.ordering())
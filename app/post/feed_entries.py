@@ -0,0 +1,79 @@
+"""
+Feed entries of the posts.
+
+``FeedEntry`` holds the status, category, author, ordering keys and
+counters of a post, so the feed filters and sorts a single table. The
+entry is upserted from the post and its information whenever the post
+is saved, and its counters are copied again after every update of the
+counters of the post information, with one statement for a batch of
+posts.
+"""
+from django.db import connection
+
+REFRESH_FEED_ENTRIES_SQL = """
+    INSERT INTO core_feedentry (
+        post_id, "postStatus", "reviewStatus", "postCategoryId_id",
+        "createdBy_id", "createdDate", "reviewResponseDate", "readTime",
+        "viewCount", "socialShareCount", "ratingCount", "averageRating",
+        "commentCount"
+    )
+    SELECT post.id, post."postStatus", post."reviewStatus",
+        post."postCategoryId_id", post."createdBy_id", post."createdDate",
+        post."reviewResponseDate", post."readTime",
+        information."viewCount", information."socialShareCount",
+        information."ratingCount", information."averageRating",
+        information."commentCount"
+    FROM core_post AS post
+    LEFT JOIN core_postinformation AS information
+        ON information.post_id = post.id
+    {where}
+    ON CONFLICT (post_id) DO UPDATE SET
+        "postStatus" = EXCLUDED."postStatus",
+        "reviewStatus" = EXCLUDED."reviewStatus",
+        "postCategoryId_id" = EXCLUDED."postCategoryId_id",
+        "createdBy_id" = EXCLUDED."createdBy_id",
+        "createdDate" = EXCLUDED."createdDate",
+        "reviewResponseDate" = EXCLUDED."reviewResponseDate",
+        "readTime" = EXCLUDED."readTime",
+        "viewCount" = EXCLUDED."viewCount",
+        "socialShareCount" = EXCLUDED."socialShareCount",
+        "ratingCount" = EXCLUDED."ratingCount",
+        "averageRating" = EXCLUDED."averageRating",
+        "commentCount" = EXCLUDED."commentCount"
+"""
+
+UPDATE_POST_COUNTERS_SQL = """
+    UPDATE core_feedentry AS entry SET
+        "viewCount" = information."viewCount",
+        "socialShareCount" = information."socialShareCount",
+        "ratingCount" = information."ratingCount",
+        "averageRating" = information."averageRating",
+        "commentCount" = information."commentCount"
+    FROM core_postinformation AS information
+    WHERE information.post_id = entry.post_id {condition}
+"""
+
+
+def _execute(sql, post_ids):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [list(post_ids)] if post_ids is not None else [])
+        return cursor.rowcount
+
+
+def refresh_feed_entries(post_ids=None):
+    """
+    Insert or update the feed entries of the posts, of all the posts when
+    ``post_ids`` is None. Returns the number of entries written.
+    """
+    where = 'WHERE post.id = ANY(%s)' if post_ids is not None else ''
+    return _execute(REFRESH_FEED_ENTRIES_SQL.format(where=where), post_ids)
+
+
+def update_post_counters(post_ids=None):
+    """
+    Copy the counters of the post information to the feed entries of the
+    posts, of all the posts when ``post_ids`` is None.
+    """
+    condition = 'AND entry.post_id = ANY(%s)' if post_ids is not None else ''
+    return _execute(UPDATE_POST_COUNTERS_SQL.format(condition=condition),
+                    post_ids)
@@ -1,7 +1,7 @@
 # middleware.py
 
 from django.utils.deprecation import MiddlewareMixin
-from core.models import PostInformation
+from post.view_counter import get_view_count_sink
 
 
 class PostViewCountMiddleware(MiddlewareMixin):
@@ -13,8 +13,8 @@ class PostViewCountMiddleware(MiddlewareMixin):
                 post_id = view_kwargs.get('pk')
                 if post_id:
                     try:
-                        post_info = PostInformation.objects.get(
-                            post_id=post_id)
-                        post_info.increment_view_count()
-                    except PostInformation.DoesNotExist:
-                        pass
+                        post_id = int(post_id)
+                    except ValueError:
+                        return None
+                    # views are buffered and written to the db in batches
+                    get_view_count_sink().add(post_id)
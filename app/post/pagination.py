@@ -0,0 +1,361 @@
+"""
+Pagination classes of the post feed and the tags.
+"""
+import base64
+import hashlib
+import json
+import math
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from post.caching import get_feed_generation
+
+
+def query_cache_key(queryset):
+    """Return a cache key identifying the SQL of the queryset."""
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.sha1(repr((sql, params)).encode()).hexdigest()
+    return f'post:count:{get_feed_generation()}:{digest}'
+
+
+def estimate_count(queryset):
+    """Return the number of rows the PostgreSQL planner expects."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator caching the exact count of the query.
+
+    Counts are keyed by the SQL of the query, so every filter set has its
+    own count, and by the feed generation, so publishing or accepting a
+    post invalidates them. ``POST_FEED_COUNT_TIMEOUT`` bounds how stale
+    a count can get for the changes not bumping the generation.
+    """
+    count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        key = query_cache_key(self.object_list)
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, settings.POST_FEED_COUNT_TIMEOUT)
+        return count
+
+
+class EstimatedPage(Page):
+    """Page of an estimated count, telling if more objects follow."""
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class EstimatedCountPaginator(CachedCountPaginator):
+    """
+    Paginator using the planner estimate for large result sets.
+
+    Counting millions of rows exactly costs a full scan, while the
+    estimate of ``EXPLAIN`` is free. Below
+    ``POST_FEED_COUNT_ESTIMATE_THRESHOLD`` rows the exact count is used
+    and cached. As the estimate can be off, pages are not bound to it:
+    one extra row is fetched to tell if a next page exists.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate >= settings.POST_FEED_COUNT_ESTIMATE_THRESHOLD:
+            self.count_is_estimate = True
+            return estimate
+        return super().count
+
+    def validate_number(self, number):
+        if not self.count_is_estimate:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return super().validate_number(number)
+        if number < 1:
+            raise EmptyPage(self.error_messages['less_than_one'])
+        return number
+
+    def page(self, number):
+        # the count decides if the pages are bound to it
+        self.count
+        if not self.count_is_estimate:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(
+            self.object_list[bottom:bottom + self.per_page + 1])
+        if not object_list and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        return EstimatedPage(object_list[:self.per_page], number, self,
+                             has_more=len(object_list) > self.per_page)
+
+
+class ExactCountPaginator(Paginator):
+    """Paginator counting the query on every request."""
+    count_is_estimate = False
+
+
+COUNT_PAGINATORS = {
+    'exact': ExactCountPaginator,
+    'cached': CachedCountPaginator,
+    'estimated': EstimatedCountPaginator,
+}
+
+
+class CustomPageNumberPagination(PageNumberPagination):
+    """
+    Page numbered pagination returning the total number of pages.
+
+    The total is computed with the ``count_strategy`` of the view, one of
+    ``COUNT_PAGINATORS``: ``exact`` counts on every request, ``cached``
+    caches the exact count and ``estimated`` uses the planner estimate
+    for large result sets.
+    """
+    count_strategy = 'exact'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        strategy = getattr(view, 'count_strategy', self.count_strategy)
+        self.django_paginator_class = COUNT_PAGINATORS[strategy]
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        # Calculate total number of pages
+        total_pages = math.ceil(self.page.paginator.count / self.page_size)
+        is_estimate = self.page.paginator.count_is_estimate
+        if is_estimate:
+            # the estimate may be below the pages actually reached
+            total_pages = max(total_pages,
+                              self.page.number + self.page.has_next())
+        return Response({
+            'total_pages': total_pages,
+            'total_pages_is_estimate': is_estimate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'current_page_number': int(self.get_page_number(
+                self.request,
+                self.page.paginator)),
+            'results': data
+        })
+
+
+class TagPageNumberPagination(PageNumberPagination):
+    """Page numbered pagination of the tags, sized by ``pageSize``."""
+    page_size_query_param = 'pageSize'
+    max_page_size = 100
+
+
+class SortKey(NamedTuple):
+    """
+    Ordering of a feed, used as the position of a keyset cursor.
+
+    Posts are ordered by ``field`` and then by id in the same direction,
+    so every post has a unique position. Null values are ordered last.
+    """
+    name: str
+    field: str
+    descending: bool = True
+    nullable: bool = False
+    is_datetime: bool = False
+
+    def ordering(self, reverse=False):
+        """Return the order_by expressions, reversed for previous pages."""
+        descending = self.descending != reverse
+        if self.nullable:
+            # nulls are last in the feed order, first when reversed
+            key = (F(self.field).desc(nulls_last=not reverse) if descending
+                   else F(self.field).asc(nulls_first=reverse))
+        else:
+            key = F(self.field).desc() if descending else F(self.field).asc()
+        return [key, F('id').desc() if descending else F('id').asc()]
+
+    def after(self, value, pk, reverse=False):
+        """Return the filter of the posts ordered after the position."""
+        descending = self.descending != reverse
+        nulls_last = not reverse
+        lookup = 'lt' if descending else 'gt'
+        is_null = Q(**{f'{self.field}__isnull': True})
+        id_after = Q(**{f'id__{lookup}': pk})
+
+        if value is None:
+            if nulls_last:
+                return is_null & id_after
+            return ~is_null | (is_null & id_after)
+
+        after = (Q(**{f'{self.field}__{lookup}': value})
+                 | (Q(**{self.field: value}) & id_after))
+        if self.nullable and nulls_last:
+            after |= is_null
+        return after
+
+    def value_of(self, post):
+        """Return the value of the ordering field of the post."""
+        value = post
+        for attribute in self.field.split('__'):
+            value = getattr(value, attribute, None)
+            if value is None:
+                break
+        return value
+
+
+# orderings of the ``sort`` query parameter of the post list, by the
+# columns of the feed entries of the posts
+POST_SORT_KEYS = {
+    0: SortKey('reviewResponseDate', 'feedEntry__reviewResponseDate',
+               nullable=True, is_datetime=True),
+    1: SortKey('readTime', 'feedEntry__readTime', descending=False),
+    2: SortKey('-readTime', 'feedEntry__readTime'),
+    3: SortKey('viewCount', 'feedEntry__viewCount', nullable=True),
+    4: SortKey('socialShareCount', 'feedEntry__socialShareCount',
+               nullable=True),
+    5: SortKey('ratingCount', 'feedEntry__ratingCount', nullable=True),
+    6: SortKey('averageRating', 'feedEntry__averageRating', nullable=True),
+}
+CREATED_DATE_SORT_KEY = SortKey('createdDate', 'feedEntry__createdDate',
+                                is_datetime=True)
+SEARCH_RANK_SORT_KEY = SortKey('searchRank', 'search_rank')
+
+
+class Cursor(NamedTuple):
+    sort: str
+    value: object
+    pk: int
+    reverse: bool
+
+
+class PostCursorPagination(BasePagination):
+    """
+    Keyset pagination of the post feed.
+
+    Pages are fetched with ``WHERE (key, id) < (last key, last id)``
+    instead of an OFFSET, so deep pages cost the same as the first one.
+    The ordering comes from ``view.get_sort_key()``. The total count is
+    only computed when ``includeCount=1`` is given.
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'includeCount'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.sort_key = view.get_sort_key()
+        cursor = self.decode_cursor(request)
+        reverse = cursor.reverse if cursor else False
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) == '1':
+            self.count = queryset.count()
+
+        queryset = queryset.order_by(*self.sort_key.ordering(reverse))
+        if cursor:
+            queryset = queryset.filter(
+                self.sort_key.after(cursor.value, cursor.pk, reverse))
+
+        posts = list(queryset[:self.page_size + 1])
+        has_more = len(posts) > self.page_size
+        posts = posts[:self.page_size]
+        if reverse:
+            posts.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+        self.page = posts
+        return posts
+
+    def get_paginated_response(self, data):
+        response = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            response['count'] = self.count
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True,
+                         'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True,
+                             'format': 'uri'},
+                'count': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # stepped past the last post, go back to the first page
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, post, reverse):
+        """Return the url of the page starting after the post."""
+        value = self.sort_key.value_of(post)
+        if value is not None and self.sort_key.is_datetime:
+            # keep the microseconds, the position must be exact
+            value = value.isoformat()
+        data = json.dumps(
+            [self.sort_key.name, value, post.pk, int(reverse)])
+        encoded = base64.urlsafe_b64encode(data.encode()).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        """Return the cursor of the request, or None on the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            sort, value, pk, reverse = json.loads(
+                base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if value is not None and self.sort_key.is_datetime:
+                value = parse_datetime(value)
+            cursor = Cursor(sort, value, int(pk), bool(reverse))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if cursor.sort != self.sort_key.name:
+            # the cursor belongs to another ordering
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
@@ -0,0 +1,80 @@
+"""
+Running rating aggregates of posts.
+
+``PostInformation`` keeps the sum and the number of the rates of its post,
+so a rate write only adds its delta to them with one UPDATE instead of
+aggregating every rate of the post. ``rebuild_rating_aggregates`` repairs
+the aggregates from the ``PostRate`` rows.
+"""
+from django.db.models import (
+    Count,
+    DecimalField,
+    F,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value
+)
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+
+from core.models import PostInformation, PostRate
+from post.caching import note_counter_change
+from post.feed_entries import update_post_counters
+
+
+def average_rating(rating_sum, rating_count):
+    """
+    Return the expression of the average rating, rounded to 2 decimals.
+
+    Posts without rates have an average of 0.
+    """
+    rating_sum = Cast(
+        rating_sum, DecimalField(max_digits=12, decimal_places=2))
+    average = rating_sum / NullIf(rating_count, 0)
+    return Coalesce(
+        Cast(Round(average, 2), FloatField()), Value(0.0))
+
+
+def apply_rating_change(post_id, count_delta, sum_delta):
+    """Add the deltas to the rating aggregates of the post."""
+    # the right hand side of an UPDATE reads the values before the update
+    rating_sum = F('ratingSum') + sum_delta
+    rating_count = F('ratingCount') + count_delta
+    updated = PostInformation.objects.filter(post_id=post_id).update(
+        ratingSum=rating_sum,
+        ratingCount=rating_count,
+        averageRating=average_rating(rating_sum, rating_count),
+    )
+    update_post_counters([post_id])
+    note_counter_change()
+    return updated
+
+
+def _rate_aggregate(aggregate):
+    rates = PostRate.objects.filter(
+        post=OuterRef('post_id')
+    ).order_by().values('post').annotate(value=aggregate).values('value')
+    return Coalesce(Subquery(rates, output_field=IntegerField()), 0)
+
+
+def rebuild_rating_aggregates(queryset=None):
+    """
+    Recompute the rating aggregates from the rates, in bulk.
+
+    Returns the number of updated ``PostInformation`` rows.
+    """
+    post_ids = None
+    if queryset is None:
+        queryset = PostInformation.objects.all()
+    else:
+        post_ids = list(queryset.values_list('post_id', flat=True))
+    updated = queryset.update(
+        ratingSum=_rate_aggregate(Sum('rate')),
+        ratingCount=_rate_aggregate(Count('id')),
+    )
+    queryset.update(
+        averageRating=average_rating(F('ratingSum'), F('ratingCount')))
+    update_post_counters(post_ids)
+    return updated
@@ -0,0 +1,50 @@
+"""
+Random high rated post recommendations.
+
+Drawing random posts with ``ORDER BY random()`` or by loading all the
+eligible posts reads every one of them on each call. Instead every
+process keeps the ids of the published and accepted posts rated
+``HIGH_RATED_MIN_RATING`` or more in a compact array, reloaded every
+``POST_RECOMMENDATION_POOL_TIMEOUT`` seconds, and samples it in
+O(count). The list data of the sampled posts is cached per post, see
+``get_cached_post_summaries``, so a warm call does not query the posts.
+"""
+import random
+from array import array
+
+from core.models import HIGH_RATED_MIN_RATING, FeedEntry
+from post.caching import ProcessLocalSnapshot
+
+
+def high_rated_post_ids():
+    """Return the ids of the published and accepted high rated posts."""
+    # read from the rating index of the feed entries
+    return FeedEntry.objects.filter(
+        reviewStatus='accept',
+        postStatus='publish',
+        averageRating__gte=HIGH_RATED_MIN_RATING,
+    ).order_by().values_list('post_id', flat=True)
+
+
+class PostIdPool(ProcessLocalSnapshot):
+    """
+    Process local pool of post ids, reloaded when it gets older than
+    ``POST_RECOMMENDATION_POOL_TIMEOUT`` seconds.
+    """
+
+    def __init__(self, load_ids):
+        super().__init__(lambda: array('q', load_ids()),
+                         'POST_RECOMMENDATION_POOL_TIMEOUT')
+
+    def ids(self):
+        """Return the array of the ids, reloading it if stale."""
+        return self._get()
+
+    def sample(self, count):
+        """Return up to ``count`` distinct random ids of the pool."""
+        ids = self.ids()
+        positions = random.sample(range(len(ids)), min(count, len(ids)))
+        return [ids[position] for position in positions]
+
+
+high_rated_pool = PostIdPool(high_rated_post_ids)
@@ -0,0 +1,198 @@
+"""
+Related post recommendations computed offline.
+
+Every published and accepted post is described by a sparse row of
+features: its tags, its SEO keywords and the words of its title and
+excerpt. Each group of features is TF-IDF weighted, so rare shared
+features count more than common ones, and L2 normalized, then scaled by
+the square root of its weight. The dot product of two rows is thus the
+weighted sum of the cosine similarities of the groups.
+
+The similarities are computed with one sparse matrix product per block
+of ``batch_size`` posts, only the posts sharing at least one feature
+with a post are its candidates. Candidates of the same category get a
+bonus, and the ``top`` best ones are stored as
+``RelatedPostRecommendation`` rows. Only the posts whose recommendations
+changed are rewritten, and their cached details invalidated.
+"""
+import re
+from collections import defaultdict
+
+import numpy as np
+from scipy import sparse
+
+from django.db import transaction
+
+from core.models import Post, RelatedPostRecommendation
+from post.caching import bump_post_versions
+
+TAG_WEIGHT = 0.4
+SEO_KEYWORD_WEIGHT = 0.2
+TEXT_WEIGHT = 0.4
+# added to the score of the candidates in the same category
+SAME_CATEGORY_BONUS = 0.1
+# features on a larger share of the posts tell nothing about them
+MAX_FEATURE_SHARE = 0.5
+WORD_PATTERN = re.compile(r'\w{3,}')
+
+
+def _feature_matrix(rows, columns, post_count, weight):
+    """
+    Return the TF-IDF weighted, L2 normalized and ``weight`` scaled
+    sparse matrix of the (post position, feature) pairs.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    columns = np.asarray(columns, dtype=np.int64)
+    column_count = int(columns.max()) + 1 if len(columns) else 0
+    counts = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, columns)),
+        shape=(post_count, column_count))
+    counts.sum_duplicates()
+
+    # features of a single post are never shared
+    document_frequency = np.bincount(counts.indices, minlength=column_count)
+    kept = ((document_frequency > 1)
+            & (document_frequency <= MAX_FEATURE_SHARE * post_count))
+    counts = counts[:, np.flatnonzero(kept)]
+    idf = np.log(post_count / document_frequency[kept])
+    matrix = sparse.csr_matrix(counts @ sparse.diags(idf))
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(np.sqrt(weight) / norms) @ matrix
+
+
+def _relation_pairs(through, column, positions, **filters):
+    """Return the post positions and feature ids of an m2m table."""
+    rows, columns = [], []
+    pairs = through.objects.filter(
+        post_id__in=Post.objects.published_and_accepted().values('id'),
+        **filters,
+    ).values_list('post_id', column)
+    for post_id, feature_id in pairs.iterator():
+        rows.append(positions[post_id])
+        columns.append(feature_id)
+    return rows, columns
+
+
+def load_post_features():
+    """
+    Return the ids and categories of the published and accepted posts
+    and the sparse matrix of their features, one row per post.
+    """
+    posts = list(Post.objects.published_and_accepted().order_by(
+        'id').values_list('id', 'postCategoryId_id', 'title', 'excerpt'))
+    post_ids = np.array([post[0] for post in posts], dtype=np.int64)
+    categories = np.array([post[1] for post in posts], dtype=np.int64)
+    positions = {post_id: position
+                 for position, post_id in enumerate(post_ids.tolist())}
+
+    vocabulary = defaultdict(lambda: len(vocabulary))
+    word_rows, word_columns = [], []
+    for position, (_, _, title, excerpt) in enumerate(posts):
+        for word in WORD_PATTERN.findall(f'{title} {excerpt}'.lower()):
+            word_rows.append(position)
+            word_columns.append(vocabulary[word])
+
+    matrix = sparse.hstack([
+        _feature_matrix(*_relation_pairs(Post.tags.through, 'tag_id',
+                                         positions, tag__isDeleted=False),
+                        len(posts), TAG_WEIGHT),
+        _feature_matrix(*_relation_pairs(Post.seoKeywords.through,
+                                         'seokeywords_id', positions),
+                        len(posts), SEO_KEYWORD_WEIGHT),
+        _feature_matrix(word_rows, word_columns, len(posts), TEXT_WEIGHT),
+    ], format='csr')
+    return post_ids, categories, matrix
+
+
+def score_related_posts(post_ids, categories, matrix, top, batch_size):
+    """
+    Yield the ids of the posts with the ids and scores of their ``top``
+    related posts, best first, computing a block of ``batch_size``
+    posts at a time.
+    """
+    transposed = matrix.T.tocsc()
+    for start in range(0, len(post_ids), batch_size):
+        similarities = (matrix[start:start + batch_size] @ transposed).tocsr()
+        for offset in range(similarities.shape[0]):
+            position = start + offset
+            row = slice(similarities.indptr[offset],
+                        similarities.indptr[offset + 1])
+            candidates = similarities.indices[row]
+            scores = similarities.data[row].copy()
+            scores[categories[candidates] == categories[position]] += (
+                SAME_CATEGORY_BONUS)
+
+            others = candidates != position
+            candidates, scores = candidates[others], scores[others]
+            if len(candidates) > top:
+                best = np.argpartition(-scores, top - 1)[:top]
+                candidates, scores = candidates[best], scores[best]
+            # highest score first, the oldest post on a tie
+            order = np.lexsort((candidates, -scores))
+            yield int(post_ids[position]), [
+                (int(post_ids[candidate]), float(score))
+                for candidate, score in zip(candidates[order], scores[order])
+            ]
+
+
+def _write_recommendations(recommendations):
+    """
+    Replace the recommendations of the posts which changed, return their
+    ids.
+    """
+    current = defaultdict(list)
+    rows = RelatedPostRecommendation.objects.filter(
+        post_id__in=recommendations,
+    ).order_by('post_id', 'rank').values_list('post_id', 'recommendedPost_id')
+    for post_id, related_id in rows:
+        current[post_id].append(related_id)
+    changed = [
+        post_id for post_id, related in recommendations.items()
+        if current[post_id] != [related_id for related_id, _ in related]
+    ]
+    if not changed:
+        return changed
+
+    with transaction.atomic():
+        RelatedPostRecommendation.objects.filter(
+            post_id__in=changed).delete()
+        RelatedPostRecommendation.objects.bulk_create([
+            RelatedPostRecommendation(post_id=post_id,
+                                      recommendedPost_id=related_id,
+                                      rank=rank,
+                                      score=score)
+            for post_id in changed
+            for rank, (related_id, score) in enumerate(
+                recommendations[post_id], start=1)
+        ])
+    bump_post_versions(changed)
+    return changed
+
+
+def compute_related_posts(top=5, batch_size=500):
+    """
+    Compute and store the ``top`` related posts of every published and
+    accepted post. Returns the number of posts whose recommendations
+    changed.
+    """
+    post_ids, categories, matrix = load_post_features()
+
+    # posts no longer published keep no recommendations
+    stale = set(RelatedPostRecommendation.objects.exclude(
+        post__in=Post.objects.published_and_accepted(),
+    ).values_list('post_id', flat=True).distinct())
+    RelatedPostRecommendation.objects.filter(post_id__in=stale).delete()
+    bump_post_versions(stale)
+
+    changed = len(stale)
+    batch = {}
+    for post_id, related in score_related_posts(
+            post_ids, categories, matrix, top, batch_size):
+        batch[post_id] = related
+        if len(batch) == batch_size:
+            changed += len(_write_recommendations(batch))
+            batch = {}
+    changed += len(_write_recommendations(batch))
+    return changed
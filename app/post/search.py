@@ -0,0 +1,119 @@
+"""
+Full-text and fuzzy search over posts.
+
+Every post stores a weighted search vector built from its title (A),
+excerpt (B) and content without HTML tags (C). The vector is refreshed
+whenever one of these fields is saved and is GIN indexed, so searching
+does not scan the posts table.
+
+The fuzzy search matches titles and excerpts by trigram similarity with
+the ``%`` operator, which uses their ``gin_trgm_ops`` indexes. Its
+threshold is the ``pg_trgm.similarity_threshold`` of the connection, see
+``POST_SEARCH_SIMILARITY_THRESHOLD``.
+"""
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity
+)
+from django.db.models import F, Func, Q, TextField, Value
+from django.db.models.functions import Greatest
+
+# fields the search vector is built from
+SEARCH_FIELDS = {'title', 'excerpt', 'content'}
+
+
+class StripHTML(Func):
+    """Replace the HTML tags of a text expression with spaces."""
+    function = 'regexp_replace'
+    output_field = TextField()
+
+    def __init__(self, expression, **extra):
+        super().__init__(
+            expression, Value('<[^>]*>'), Value(' '), Value('g'), **extra)
+
+
+def post_search_vector():
+    """Return the expression computing the search vector of a post."""
+    config = settings.POST_SEARCH_CONFIG
+    return (
+        SearchVector('title', weight='A', config=config)
+        + SearchVector('excerpt', weight='B', config=config)
+        + SearchVector(StripHTML('content'), weight='C', config=config)
+    )
+
+
+def update_search_vectors(queryset):
+    """Recompute the search vector of the given posts in one statement."""
+    return queryset.update(searchVector=post_search_vector())
+
+
+def build_search_query(text):
+    """
+    Build a prefix matching query from the search text.
+
+    Every word of the text must match the beginning of a word of the
+    post, e.g. ``djan rest`` matches "Django REST framework".
+    Returns None if the text has no searchable words.
+    """
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return None
+    raw_query = ' & '.join(f'{term}:*' for term in terms)
+    return SearchQuery(raw_query,
+                       search_type='raw',
+                       config=settings.POST_SEARCH_CONFIG)
+
+
+def search_posts(queryset, text):
+    """
+    Filter posts matching the search text.
+
+    Matching posts are annotated with ``search_rank`` and a
+    ``search_headline`` snippet of the content with the matched words
+    wrapped in ``<mark>`` tags.
+    """
+    query = build_search_query(text)
+    if query is None:
+        return queryset.none()
+    return queryset.filter(
+        searchVector=query
+    ).annotate(
+        search_rank=SearchRank(F('searchVector'), query),
+        search_headline=SearchHeadline(
+            StripHTML('content'),
+            query,
+            config=settings.POST_SEARCH_CONFIG,
+            start_sel='<mark>',
+            stop_sel='</mark>',
+            max_fragments=2,
+        ),
+    )
+
+
+def fuzzy_search_posts(queryset, text):
+    """
+    Filter posts whose title or excerpt is similar to the search text.
+
+    Matching posts are annotated with ``search_rank``, the best of the
+    title and excerpt similarities.
+    """
+    return queryset.filter(
+        Q(title__trigram_similar=text) | Q(excerpt__trigram_similar=text)
+    ).annotate(
+        search_rank=Greatest(
+            TrigramSimilarity('title', text),
+            TrigramSimilarity('excerpt', text),
+        ),
+    )
+
+
+SEARCH_MODES = {
+    'fulltext': search_posts,
+    'fuzzy': fuzzy_search_posts,
+}
@@ -6,10 +6,12 @@ from core.models import (
     SEOKeywords,
     PostRate,
     PostInformation,
+    RelatedPostRecommendation,
     User
 )
 from drf_spectacular.utils import extend_schema_field
 from django.db.models import F
+from post.caching import bump_tag_version
 
 
 class PostCategorySerializer(serializers.ModelSerializer):
@@ -38,6 +40,14 @@ class PostCategorySerializer(serializers.ModelSerializer):
 
         return postCategory
 
+    def validate_parentPostCategoryId(self, value):
+        """Reject moving a category under itself or its subcategories."""
+        if (value and self.instance
+                and value.path.startswith(self.instance.path)):
+            raise serializers.ValidationError(
+                "A category cannot be moved under itself or its subcategories.")  # noqa
+        return value
+
     @extend_schema_field(serializers.IntegerField(allow_null=True))
     def get_parentPostCategoryId(self, obj: object):
         if obj.parentPostCategoryId:
@@ -94,6 +104,17 @@ class TagSerializer(serializers.ModelSerializer):
         model = Tag
         fields = ['id', 'name']
         read_only_fields = ['id']
+        # the tags of a post are resolved by name, existing ones reused
+        extra_kwargs = {'name': {'validators': []}}
+
+
+class PopularTagSerializer(serializers.ModelSerializer):
+    """Serializer for tag with its number of published posts"""
+
+    class Meta:
+        model = Tag
+        fields = ['id', 'name', 'publishedPostCount']
+        read_only_fields = fields
 
 
 class SEOKeywordsSerializer(serializers.ModelSerializer):
@@ -188,6 +209,7 @@ class PostSerializer(serializers.ModelSerializer):
     postInformation = PostInformationSerializer(read_only=True)
     currentUserPostRate = serializers.SerializerMethodField()
     createdBy = PostUserSerializer(read_only=True)
+    searchHeadline = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
@@ -197,7 +219,7 @@ class PostSerializer(serializers.ModelSerializer):
                   'metaDescription', 'readTime',
                   'image', 'createdDate', 'postInformation',
                   'currentUserPostRate', 'reviewResponseDate',
-                  'createdBy']
+                  'createdBy', 'searchHeadline']
         read_only_fields = ['id', 'reviewStatus', 'reviewResponseDate',
                             'createdBy', 'createdDate', 'postInformation']
         extra_kwargs = {'image': {'required': False}}
@@ -206,40 +228,57 @@ class PostSerializer(serializers.ModelSerializer):
     def get_currentUserPostRate(self, obj: object):
         user = self.context['request'].user
         if user.is_authenticated and obj:
-            postRate = PostRate.objects.filter(
-                user=user, post=obj
-                ).first()
+            if hasattr(obj, 'currentUserPostRates'):
+                # prefetched by the view for the whole page
+                postRates = obj.currentUserPostRates
+                postRate = postRates[0] if postRates else None
+            else:
+                postRate = PostRate.objects.filter(
+                    user=user, post=obj
+                    ).first()
             if postRate:
                 return PostRateSerializer(postRate).data
         return None
 
-    def _get_or_create_tags(self, tags, post):
-        """Handle getting or creating tags as needed."""
-        for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(
-                **tag,
-                defaults={'createdBy': self.context['request'].user,
-                          'updatedBy': self.context['request'].user}
-            )
-            print('here')
-            post.tags.add(tag_obj)
-
-    def _get_related_post(self, relatedPosts, post):
-        """Handle getting posts as needed."""
-        for relatedPost in relatedPosts:
-            related_post_obj = Post.objects.get(pk=relatedPost.id)
-            post.relatedPosts.add(related_post_obj)
+    @extend_schema_field(serializers.CharField(allow_null=True))
+    def get_searchHeadline(self, obj: object):
+        """Snippet of the content matching the search, if searching."""
+        return getattr(obj, 'search_headline', None)
+
+    def _get_or_create_tags(self, tags):
+        """
+        Return the tags of the names, creating the missing ones together.
+        """
+        names = list(dict.fromkeys(tag['name'] for tag in tags))
+        existing = {tag.name: tag
+                    for tag in Tag.objects.filter(name__in=names)}
+        missing = [name for name in names if name not in existing]
+        if missing:
+            user = self.context['request'].user
+            # a concurrent request may create the same tags
+            Tag.objects.bulk_create([
+                Tag(name=name, createdBy=user, updatedBy=user)
+                for name in missing
+            ], ignore_conflicts=True)
+            # no post_save signal for bulk created tags
+            bump_tag_version()
+            existing.update(
+                (tag.name, tag)
+                for tag in Tag.objects.filter(name__in=missing))
+        return [existing[name] for name in names]
 
     def create(self, validated_data):
         tags = validated_data.pop('tags', [])
-        relatedPosts = validated_data.pop('relatedPosts', [])
+        relatedPostIds = validated_data.pop('relatedPostIds', [])
         # by default the status of the post is draft
         validated_data['postStatus'] = 'draft'
         post = Post.objects.create(
             **validated_data)
 
-        self._get_or_create_tags(tags, post)
-        self._get_related_post(relatedPosts, post)
+        if tags:
+            post.tags.set(self._get_or_create_tags(tags))
+        if relatedPostIds:
+            post.relatedPosts.set(relatedPostIds)
 
         return post
 
@@ -249,17 +288,15 @@ class PostSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "You do not have permission to edit this post.")
         tags = validated_data.pop('tags', None)
-        relatedPosts = validated_data.pop('relatedPosts', None)
+        relatedPostIds = validated_data.pop('relatedPostIds', None)
 
         if tags is not None:
-            # empty list is not None
-            instance.tags.clear()
-            self._get_or_create_tags(tags, instance)
+            # empty list is not None, only the changes are written
+            instance.tags.set(self._get_or_create_tags(tags))
 
-        if relatedPosts is not None:
-            # empty list is not None
-            instance.relatedPosts.clear()
-            self._get_related_post(relatedPosts, instance)
+        if relatedPostIds is not None:
+            # empty list is not None, only the changes are written
+            instance.relatedPosts.set(relatedPostIds)
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -278,30 +315,73 @@ class PostDetailSerializer(PostSerializer):
     """Serializer for postCategory detail view."""
 
     relatedPosts = serializers.SerializerMethodField()
+    relatedPostIds = serializers.ListField(
+        child=serializers.IntegerField(),
+        write_only=True,
+        required=False,
+        help_text="""Ids of the related posts, replacing the current
+        ones. It must be a list (even an empty list).""")
 
     class Meta(PostSerializer.Meta):
         fields = PostSerializer.Meta.fields + [
             'content',
             'commentsEnabled',
             'seoKeywords',
-            'relatedPosts'
+            'relatedPosts',
+            'relatedPostIds'
             ]
         read_only_fields = PostSerializer.Meta.read_only_fields + [
             'createdDate',
             'commentsEnabled', 'seoKeywords',
         ]
 
+    def validate_relatedPostIds(self, value):
+        """Check all the related posts exist with one query."""
+        ids = list(dict.fromkeys(value))
+        if self.instance is not None and self.instance.pk in ids:
+            raise serializers.ValidationError(
+                "A post cannot be related to itself.")
+        found = set(Post.objects.filter(
+            pk__in=ids).values_list('pk', flat=True))
+        missing = [post_id for post_id in ids if post_id not in found]
+        if missing:
+            raise serializers.ValidationError(
+                f"Posts not found: {', '.join(map(str, missing))}.")
+        return ids
+
     def get_relatedPosts(self, obj):
-        related_posts = obj.relatedPosts.filter(
-            reviewStatus='accept',
-            postStatus='publish')
-
-        related_posts = related_posts.annotate(
-                    average_rating=F(
-                        'postInformation__averageRating')
-                    ).order_by(F('average_rating').desc(nulls_last=True))
+        if hasattr(obj, 'publishedRelatedPosts'):
+            # prefetched by the view
+            related_posts = obj.publishedRelatedPosts
+        else:
+            related_posts = obj.relatedPosts.filter(
+                reviewStatus='accept',
+                postStatus='publish'
+            ).select_related('postInformation', 'createdBy')
+
+            related_posts = related_posts.annotate(
+                        average_rating=F(
+                            'postInformation__averageRating')
+                        ).order_by(F('average_rating').desc(nulls_last=True))
+        if not related_posts:
+            # fall back to the computed recommendations
+            related_posts = [
+                recommendation.recommendedPost
+                for recommendation in self._get_recommendations(obj)
+            ]
         return RelatedPostSerializer(related_posts, many=True).data
 
+    def _get_recommendations(self, obj):
+        """Return the recommendations of published and accepted posts."""
+        return RelatedPostRecommendation.objects.filter(
+            post=obj,
+            recommendedPost__reviewStatus='accept',
+            recommendedPost__postStatus='publish'
+        ).select_related(
+            'recommendedPost__postInformation',
+            'recommendedPost__createdBy'
+        ).order_by('rank')
+
 
 class PostImageSerializer(serializers.ModelSerializer):
     """serializer for uploading image to post."""
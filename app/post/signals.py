@@ -1,7 +1,45 @@
-from django.db.models.signals import post_save, pre_save, post_delete
+from django.db.models import QuerySet
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete
+)
 from django.dispatch import receiver
-from django.db.models import Avg
-from core.models import Post, PostInformation, Comment, PostRate
+from core.models import (
+    Comment,
+    Post,
+    PostCategory,
+    PostInformation,
+    PostRate,
+    RelatedPostRecommendation,
+    SEOKeywords,
+    Tag,
+    User
+)
+from post.caching import (
+    bump_category_version,
+    bump_feed_generation,
+    bump_post_versions,
+    bump_tag_version
+)
+from post.comment_counts import add_comment_counts, comment_subtree_counts
+from post.feed_entries import refresh_feed_entries, update_post_counters
+from post.ratings import apply_rating_change, rebuild_rating_aggregates
+from post.search import SEARCH_FIELDS, update_search_vectors
+from post.tag_counts import add_tag_counts, is_published, rebuild_tag_counts
+
+# fields deciding if and where a post is listed in the feed
+FEED_STATUS_FIELDS = ('postStatus', 'reviewStatus', 'postCategoryId_id')
+# many to many fields of the post detail
+DETAIL_RELATION_FIELDS = {
+    Post.tags.through: 'tags',
+    Post.seoKeywords.through: 'seoKeywords',
+    Post.relatedPosts.through: 'relatedPosts',
+}
+# fields of the user nested in the posts as their author
+AUTHOR_FIELDS = ('name', 'image')
 
 
 @receiver(post_save, sender=Post)
@@ -10,52 +48,289 @@ def create_post_information(sender, instance, created, **kwargs):
         PostInformation.objects.create(post=instance)
 
 
+@receiver(post_save, sender=Post)
+def refresh_feed_entry(sender, instance, **kwargs):
+    refresh_feed_entries([instance.pk])
+
+
+@receiver(post_save, sender=PostInformation)
+def update_feed_entry_counters(sender, instance, **kwargs):
+    update_post_counters([instance.post_id])
+
+
+def _feed_status(post):
+    # deferred fields are not loaded, they read as None
+    return tuple(post.__dict__.get(field) for field in FEED_STATUS_FIELDS)
+
+
+@receiver(post_init, sender=Post)
+def remember_post_status(sender, instance, **kwargs):
+    instance._original_status = _feed_status(instance)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_feed_on_status_change(sender, instance, created, **kwargs):
+    status = _feed_status(instance)
+    if created or status != instance._original_status:
+        bump_feed_generation()
+    instance._original_status = status
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_feed_on_delete(sender, instance, **kwargs):
+    bump_feed_generation()
+
+
+def _recommending_post_ids(post):
+    return RelatedPostRecommendation.objects.filter(
+        recommendedPost=post).values_list('post_id', flat=True)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_post_detail(sender, instance, **kwargs):
+    # the post is nested in the details of its related posts and of the
+    # posts it is recommended to
+    bump_post_versions([
+        instance.pk,
+        *instance.relatedPosts.values_list('pk', flat=True),
+        *_recommending_post_ids(instance)])
+
+
+@receiver(pre_delete, sender=Post)
+def invalidate_related_post_details(sender, instance, **kwargs):
+    bump_post_versions([
+        *instance.relatedPosts.values_list('pk', flat=True),
+        *_recommending_post_ids(instance)])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=SEOKeywords)
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=SEOKeywords)
+def invalidate_post_detail_on_relation_change(sender, instance, created=False,
+                                              **kwargs):
+    if created:
+        return
+    # the tag or keyword is nested in the details of its posts
+    field = 'tags' if sender is Tag else 'seoKeywords'
+    bump_post_versions(Post.objects.filter(
+        **{field: instance}).values_list('pk', flat=True))
+
+
+def _author_fields(user):
+    # deferred fields are not loaded, they read as None
+    return tuple(user.__dict__.get(field) for field in AUTHOR_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_author_fields(sender, instance, **kwargs):
+    instance._original_author_fields = _author_fields(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_post_detail_on_author_change(sender, instance, created,
+                                            update_fields=None, **kwargs):
+    fields = _author_fields(instance)
+    changed = fields != instance._original_author_fields
+    instance._original_author_fields = fields
+    if created or not changed or (
+            update_fields is not None
+            and not set(AUTHOR_FIELDS) & set(update_fields)):
+        return
+    # the author is nested in the details of their posts, of the posts
+    # related to them and of the posts they are recommended to
+    posts = Post.objects.filter(createdBy=instance)
+    bump_post_versions({
+        *posts.values_list('pk', flat=True),
+        *Post.relatedPosts.through.objects.filter(
+            to_post__in=posts).values_list('from_post_id', flat=True),
+        *RelatedPostRecommendation.objects.filter(
+            recommendedPost__in=posts).values_list('post_id', flat=True)})
+
+
+@receiver(post_save, sender=PostCategory)
+@receiver(post_delete, sender=PostCategory)
+def invalidate_category_tree(sender, instance, **kwargs):
+    bump_category_version()
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+@receiver(m2m_changed, sender=Post.seoKeywords.through)
+@receiver(m2m_changed, sender=Post.relatedPosts.through)
+def invalidate_post_detail_on_m2m_change(sender, instance, action, reverse,
+                                         pk_set, **kwargs):
+    field = DETAIL_RELATION_FIELDS[sender]
+    if action == 'pre_clear':
+        if reverse:
+            post_ids = set(Post.objects.filter(
+                **{field: instance}).values_list('pk', flat=True))
+        else:
+            post_ids = {instance.pk}
+            if field == 'relatedPosts':
+                post_ids.update(
+                    instance.relatedPosts.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        post_ids = set(pk_set) if reverse else {instance.pk}
+        if field == 'relatedPosts':
+            post_ids.update(pk_set)
+    else:
+        return
+    bump_post_versions(post_ids)
+
+
+@receiver(post_save, sender=Post)
+def update_post_search_vector(sender, instance, update_fields=None,
+                              **kwargs):
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        # none of the searched fields changed
+        return
+    update_search_vectors(Post.objects.filter(pk=instance.pk))
+
+
 @receiver(post_save, sender=Comment)
 def update_comment_counts_on_save(sender, instance, created, **kwargs):
     if created:
-        post_information = instance.post.postInformation
-        post_information.commentCount = Comment.objects.filter(
-            post=instance.post
-        ).count()
-        post_information.save()
-
-
-@receiver(post_delete, sender=Comment)
-def update_comment_counts_on_delete(sender, instance, **kwargs):
-    post_information = instance.post.postInformation
-    post_information.commentCount = Comment.objects.filter(
-        post=instance.post
-    ).count()
-    post_information.save()
-
-
-@receiver(pre_save, sender=PostRate)
-def detect_rate_change(sender, instance, **kwargs):
-    if instance.pk:
-        previous = PostRate.objects.get(pk=instance.pk)
-        if previous.rate != instance.rate:
-            instance.previous_rate = previous.rate
-        else:
-            instance.previous_rate = None
+        add_comment_counts({instance.post_id: 1})
+
+
+@receiver(pre_delete, sender=Comment)
+def update_comment_counts_on_delete(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Post) or (
+            isinstance(origin, QuerySet) and origin.model is Post):
+        # the post information is deleted with the post
+        return
+    if isinstance(origin, Comment):
+        origin_ids = [origin.pk]
+    elif isinstance(origin, QuerySet) and origin.model is Comment:
+        origin_ids = None
     else:
-        instance.previous_rate = None
-
-
-@receiver([post_save, post_delete], sender=PostRate)
-def update_averageRating(sender, instance, **kwargs):
-    post = instance.post.postInformation
-    # Calculate the average rating for the associated post
-    average_rating = PostRate.objects.filter(
-        post=instance.post
-        ).aggregate(Avg('rate'))['rate__avg']
-    post.ratingCount = PostRate.objects.filter(
-        post=instance.post
-        ).count()
-
-    # Update the averageRating field in the related postInformation model
-    if average_rating is not None:
-        post.averageRating = round(average_rating, 2)
+        # deleted by another model, count the comments one by one
+        add_comment_counts({instance.post_id: -1})
+        return
+
+    # every comment of a cascade is sent, count the whole subtree once
+    # for the comment or queryset the deletion started from
+    if getattr(origin, '_comment_counts_updated', False):
+        return
+    if origin_ids is None:
+        origin_ids = list(origin.values_list('pk', flat=True))
+    add_comment_counts({
+        post_id: -count
+        for post_id, count in comment_subtree_counts(origin_ids).items()
+    })
+    origin._comment_counts_updated = True
+
+
+@receiver(post_init, sender=PostRate)
+def remember_rate(sender, instance, **kwargs):
+    instance._original_rate = instance.__dict__.get('rate')
+    instance._original_post_id = instance.__dict__.get('post_id')
+
+
+@receiver(post_save, sender=PostRate)
+def update_rating_on_save(sender, instance, created, update_fields=None,
+                          **kwargs):
+    original_post_id = instance._original_post_id
+    moved = (original_post_id not in (None, instance.post_id)
+             and (update_fields is None or 'post' in update_fields))
+    if created:
+        apply_rating_change(instance.post_id, 1, instance.rate)
+    elif instance._original_rate is None:
+        # the rate was deferred, its previous value is unknown
+        post_ids = [instance.post_id]
+        if moved:
+            post_ids.append(original_post_id)
+        rebuild_rating_aggregates(
+            PostInformation.objects.filter(post_id__in=post_ids))
+    elif moved:
+        # the rate was moved to another post
+        rate = instance._original_rate
+        if update_fields is None or 'rate' in update_fields:
+            rate = instance.rate
+        apply_rating_change(original_post_id, -1, -instance._original_rate)
+        apply_rating_change(instance.post_id, 1, rate)
+    elif update_fields is None or 'rate' in update_fields:
+        delta = instance.rate - instance._original_rate
+        if delta:
+            apply_rating_change(instance.post_id, 0, delta)
+    instance._original_rate = instance.rate
+    instance._original_post_id = instance.post_id
+
+
+@receiver(post_delete, sender=PostRate)
+def update_rating_on_delete(sender, instance, **kwargs):
+    if instance._original_rate is None:
+        rebuild_rating_aggregates(
+            PostInformation.objects.filter(post_id=instance.post_id))
     else:
-        post.averageRating = 0.0
+        # the stored rate, even if the instance was edited before
+        apply_rating_change(instance.post_id, -1, -instance._original_rate)
+
+
+@receiver(post_init, sender=Post)
+def remember_post_published(sender, instance, **kwargs):
+    instance._original_published = is_published(instance)
+
+
+def _stored_published(post):
+    # whether the post is published and accepted in the database
+    if post._original_published is not None:
+        return post._original_published
+    return Post.objects.filter(pk=post.pk, postStatus='publish',
+                               reviewStatus='accept').exists()
+
+
+@receiver(post_save, sender=Post)
+def update_tag_counts_on_status_change(sender, instance, created, **kwargs):
+    published = is_published(instance)
+    if not created and published != instance._original_published:
+        tag_ids = list(instance.tags.values_list('pk', flat=True))
+        if published is None or instance._original_published is None:
+            # a status was deferred, its previous value is unknown
+            rebuild_tag_counts(tag_ids)
+        else:
+            delta = 1 if published else -1
+            add_tag_counts({tag_id: delta for tag_id in tag_ids})
+    instance._original_published = published
+
+
+@receiver(pre_delete, sender=Post)
+def update_tag_counts_on_delete(sender, instance, **kwargs):
+    # the rows of the tags are deleted without m2m_changed signals
+    if _stored_published(instance):
+        add_tag_counts({
+            tag_id: -1
+            for tag_id in instance.tags.values_list('pk', flat=True)})
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def update_tag_counts_on_tags_change(sender, instance, action, reverse,
+                                     pk_set, **kwargs):
+    if action not in ('post_add', 'pre_remove', 'pre_clear'):
+        return
+    delta = 1 if action == 'post_add' else -1
+    # the added ids are the ones actually added, the removed ids are
+    # restricted to the ones actually related
+    if reverse:
+        posts = Post.objects.filter(tags=instance, postStatus='publish',
+                                    reviewStatus='accept')
+        if action == 'post_add':
+            posts = Post.objects.filter(pk__in=pk_set, postStatus='publish',
+                                        reviewStatus='accept')
+        elif action == 'pre_remove':
+            posts = posts.filter(pk__in=pk_set)
+        add_tag_counts({instance.pk: delta * posts.count()})
+    elif _stored_published(instance):
+        tag_ids = pk_set
+        if action != 'post_add':
+            tags = instance.tags.all()
+            if action == 'pre_remove':
+                tags = tags.filter(pk__in=pk_set)
+            tag_ids = tags.values_list('pk', flat=True)
+        add_tag_counts({tag_id: delta for tag_id in tag_ids})
+
 
-    post.save()
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_names(sender, instance, **kwargs):
+    bump_tag_version()
@@ -0,0 +1,68 @@
+"""
+Published post counts of the tags.
+
+``Tag.publishedPostCount`` is kept with atomic increments and decrements
+when tags are added to or removed from a published and accepted post,
+and when a post enters or leaves the published and accepted state or is
+deleted, for all its tags. ``rebuild_tag_counts`` recounts them from the
+posts.
+"""
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import F
+
+from core.models import Tag
+
+REBUILD_TAG_COUNTS_SQL = """
+    UPDATE core_tag AS tag SET "publishedPostCount" = counts.count
+    FROM (
+        SELECT counted.id, COUNT(post.id) AS count
+        FROM core_tag AS counted
+        LEFT JOIN core_post_tags AS post_tags
+            ON post_tags.tag_id = counted.id
+        LEFT JOIN core_post AS post
+            ON post.id = post_tags.post_id
+            AND post."postStatus" = 'publish'
+            AND post."reviewStatus" = 'accept'
+        {where}
+        GROUP BY counted.id
+    ) AS counts
+    WHERE counts.id = tag.id AND tag."publishedPostCount" <> counts.count
+"""
+
+
+def is_published(post):
+    """
+    Return if the post is published and accepted, None when its status
+    fields are deferred.
+    """
+    status = (post.__dict__.get('postStatus'),
+              post.__dict__.get('reviewStatus'))
+    if None in status:
+        return None
+    return status == ('publish', 'accept')
+
+
+def add_tag_counts(counts):
+    """Add the counts, a mapping of tag ids to deltas, to the tags."""
+    tag_ids = defaultdict(list)
+    for tag_id, delta in counts.items():
+        if delta:
+            tag_ids[delta].append(tag_id)
+    # usually all the tags change by the same delta
+    for delta, ids in tag_ids.items():
+        Tag.objects.filter(pk__in=ids).update(
+            publishedPostCount=F('publishedPostCount') + delta)
+
+
+def rebuild_tag_counts(tag_ids=None):
+    """
+    Recount the published posts of the tags, of all the tags when
+    ``tag_ids`` is None. Returns the number of counts corrected.
+    """
+    where = 'WHERE counted.id = ANY(%s)' if tag_ids is not None else ''
+    with connection.cursor() as cursor:
+        cursor.execute(REBUILD_TAG_COUNTS_SQL.format(where=where),
+                       [list(tag_ids)] if tag_ids is not None else [])
+        return cursor.rowcount
@@ -0,0 +1,48 @@
+"""
+Prefix autocomplete of the tag names.
+
+Every process keeps the names of the tags which are not deleted in a
+list sorted by their lower cased name, so the tags starting with a
+prefix are a contiguous slice found by bisection, in O(log n) plus the
+number of tags returned. The list is reloaded when the tag version
+changes, see ``bump_tag_version``.
+"""
+from bisect import bisect_left
+
+from core.models import Tag
+from post.caching import ProcessLocalSnapshot, get_tag_version
+
+
+class TagNameIndex(ProcessLocalSnapshot):
+    """Process local sorted index of the tag names."""
+
+    def __init__(self):
+        super().__init__(self._load_index, 'POST_TAG_INDEX_TIMEOUT',
+                         get_tag_version)
+
+    def _load_index(self):
+        tags = sorted(
+            (name.lower(), tag_id, name)
+            for tag_id, name in Tag.objects.filter(
+                isDeleted=False).values_list('id', 'name'))
+        # the lower cased names and the (id, name) of the tags
+        return ([key for key, _, _ in tags],
+                [(tag_id, name) for _, tag_id, name in tags])
+
+    def complete(self, prefix, limit):
+        """
+        Return the ids and names of up to ``limit`` tags starting with
+        the prefix, ignoring the case, in alphabetical order.
+        """
+        keys, tags = self._get()
+        prefix = prefix.lower()
+        start = bisect_left(keys, prefix)
+        matches = []
+        for position in range(start, min(start + limit, len(keys))):
+            if not keys[position].startswith(prefix):
+                break
+            matches.append(tags[position])
+        return matches
+
+
+tag_index = TagNameIndex()
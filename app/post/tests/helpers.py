@@ -0,0 +1,39 @@
+"""
+Helpers shared by the post tests.
+"""
+from django.test import TestCase, override_settings
+
+from core.models import Post
+from post.view_counter import reset_view_count_sink
+
+
+def create_post(user, postCategory, **params):
+    """Create a published and accepted post and return it."""
+    defaults = {
+        'title': 'Sample post title',
+        'content': '<p>Sample post content.</p>',
+        'excerpt': 'Sample post excerpt.',
+        'readTime': 5,
+        'postStatus': 'publish',
+        'reviewStatus': 'accept',
+    }
+    defaults.update(params)
+
+    return Post.objects.create(createdBy=user,
+                               updatedBy=user,
+                               postCategoryId=postCategory,
+                               **defaults)
+
+
+@override_settings(
+    POST_VIEW_COUNT_SINK='post.view_counter.DatabaseViewCountSink')
+class PostViewsTestCase(TestCase):
+    """
+    Test case requesting post details, their views are written straight
+    to the test database instead of being buffered in the process.
+    """
+
+    def setUp(self):
+        super().setUp()
+        reset_view_count_sink()
+        self.addCleanup(reset_view_count_sink)
@@ -0,0 +1,111 @@
+"""
+Tests for serving the post categories from the snapshot.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import PostCategory
+from post.categories import category_snapshot
+
+
+POSTCATEGORY_URL = reverse('post:postcategory-list')
+
+
+def detail_url(postCategory_id):
+    """Create and return a postCategory detail url."""
+    return reverse('post:postcategory-detail', args=[postCategory_id])
+
+
+class CategorySnapshotTests(TestCase):
+    """Test the category endpoints read the snapshot."""
+
+    def setUp(self):
+        cache.clear()
+        category_snapshot.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            name='Test User', email='test@example.com')
+        self.parent = PostCategory.objects.create(
+            title='Programming', createdBy=self.user, updatedBy=self.user)
+        self.children = [
+            PostCategory.objects.create(
+                title=f'Language {number}',
+                parentPostCategoryId=self.parent,
+                createdBy=self.user,
+                updatedBy=self.user)
+            for number in range(5)
+        ]
+
+    def test_list_parent_titles_single_query(self):
+        """Test the list loads the categories and parents in one query."""
+        with self.assertNumQueries(1):
+            res = self.client.get(POSTCATEGORY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        titles = {category['title']: category['parentPostCategoryTitle']
+                  for category in res.data['results']}
+        self.assertEqual(titles['Language 0'], 'Programming')
+        self.assertIsNone(titles['Programming'])
+
+    def test_warm_endpoints_skip_database(self):
+        """Test a warm snapshot answers the list and the detail."""
+        self.client.get(POSTCATEGORY_URL)
+
+        with self.assertNumQueries(0):
+            list_res = self.client.get(POSTCATEGORY_URL)
+            detail_res = self.client.get(detail_url(self.children[0].id))
+
+        self.assertEqual(len(list_res.data['results']), 6)
+        self.assertEqual(detail_res.status_code, status.HTTP_200_OK)
+        self.assertEqual(detail_res.data['parentPostCategoryTitle'],
+                         'Programming')
+
+    def test_missing_category(self):
+        """Test an unknown category is not found."""
+        res = self.client.get(detail_url(self.parent.id + 100))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_change_reloads_snapshot(self):
+        """Test saving or deleting a category reloads the snapshot."""
+        self.client.get(POSTCATEGORY_URL)
+        self.parent.title = 'Software'
+        self.parent.save()
+        self.children[1].delete()
+
+        res = self.client.get(detail_url(self.children[0].id))
+        list_res = self.client.get(POSTCATEGORY_URL)
+
+        self.assertEqual(res.data['parentPostCategoryTitle'], 'Software')
+        self.assertEqual(len(list_res.data['results']), 5)
+
+    def test_update_through_api(self):
+        """Test an update by the API is served by the next detail."""
+        self.client.force_authenticate(self.user)
+        self.client.get(detail_url(self.parent.id))
+
+        res = self.client.patch(detail_url(self.parent.id),
+                                {'description': 'New description'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(detail_url(self.parent.id))
+        self.assertEqual(res.data['description'], 'New description')
+
+    def test_snapshot_expires(self):
+        """Test a change the version missed is seen once it expires."""
+        self.client.get(POSTCATEGORY_URL)
+        # as if changed through another process with its own cache
+        PostCategory.objects.filter(pk=self.parent.pk).update(
+            title='Software')
+
+        res = self.client.get(detail_url(self.children[0].id))
+        self.assertEqual(res.data['parentPostCategoryTitle'], 'Programming')
+
+        with override_settings(POST_CATEGORY_SNAPSHOT_TIMEOUT=0):
+            res = self.client.get(detail_url(self.children[0].id))
+        self.assertEqual(res.data['parentPostCategoryTitle'], 'Software')
@@ -0,0 +1,153 @@
+"""
+Tests for the tree of the post categories.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import PostCategory
+from post.tests.helpers import create_post
+
+
+POST_URL = reverse('post:post-list')
+CATEGORY_TREE_URL = reverse('post:postcategory-tree')
+
+
+def category_detail_url(postCategory_id):
+    """Create and return a postCategory detail url."""
+    return reverse('post:postcategory-detail', args=[postCategory_id])
+
+
+def create_category(user, title, parent=None):
+    """Create and return a post category."""
+    return PostCategory.objects.create(title=title,
+                                       parentPostCategoryId=parent,
+                                       createdBy=user,
+                                       updatedBy=user)
+
+
+class CategoryPathTests(TestCase):
+    """Test maintaining the materialized paths of the categories."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            name='Test User', email='test@example.com')
+        self.root = create_category(self.user, 'Programming')
+        self.child = create_category(self.user, 'Python', self.root)
+        self.grandchild = create_category(self.user, 'Django', self.child)
+
+    def test_paths_built_on_create(self):
+        """Test a category path lists its ancestors and itself."""
+        self.assertEqual(self.root.path, f'/{self.root.id}/')
+        self.grandchild.refresh_from_db()
+        self.assertEqual(
+            self.grandchild.path,
+            f'/{self.root.id}/{self.child.id}/{self.grandchild.id}/')
+
+    def test_subtree_moved(self):
+        """Test moving a category moves the paths of its subtree."""
+        other_root = create_category(self.user, 'Databases')
+        self.child.parentPostCategoryId = other_root
+        self.child.save()
+
+        self.grandchild.refresh_from_db()
+        self.assertEqual(
+            self.grandchild.path,
+            f'/{other_root.id}/{self.child.id}/{self.grandchild.id}/')
+
+    def test_cycle_rejected(self):
+        """Test a category cannot be moved under its subcategory."""
+        self.root.parentPostCategoryId = self.grandchild
+
+        with self.assertRaises(ValidationError):
+            self.root.save()
+
+    def test_cycle_rejected_by_api(self):
+        """Test the API rejects moving a category under itself."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        res = client.patch(category_detail_url(self.root.id),
+                           {'parentPostCategoryId': self.grandchild.id})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.root.refresh_from_db()
+        self.assertIsNone(self.root.parentPostCategoryId)
+
+
+class CategoryTreeApiTests(TestCase):
+    """Test filtering the feed by subtree and the category tree."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            name='Test User', email='test@example.com')
+        self.root = create_category(self.user, 'Programming')
+        self.child = create_category(self.user, 'Python', self.root)
+        self.grandchild = create_category(self.user, 'Django', self.child)
+        self.other = create_category(self.user, 'Cooking')
+        self.posts = [
+            create_post(self.user, category)
+            for category in (self.root, self.child, self.grandchild)
+        ]
+        create_post(self.user, self.other)
+        create_post(self.user, self.grandchild, postStatus='draft')
+
+    def get_ids(self, **params):
+        res = self.client.get(POST_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [post['id'] for post in res.data['results']]
+
+    def test_filter_includes_subcategories(self):
+        """Test the feed includes the posts of the whole subtree."""
+        ids = self.get_ids(postCategoryId=self.child.id,
+                           includeSubcategories=1)
+
+        self.assertCountEqual(ids, [self.posts[1].id, self.posts[2].id])
+
+    def test_filter_exact_category_by_default(self):
+        """Test the feed keeps only the given category by default."""
+        ids = self.get_ids(postCategoryId=self.child.id)
+
+        self.assertEqual(ids, [self.posts[1].id])
+
+    def test_tree(self):
+        """Test the tree nests the categories with their post counts."""
+        res = self.client.get(CATEGORY_TREE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        cooking, programming = res.data
+        self.assertEqual(cooking['title'], 'Cooking')
+        self.assertEqual(cooking['children'], [])
+        self.assertEqual(programming['postCount'], 1)
+        self.assertEqual(programming['totalPostCount'], 3)
+        python = programming['children'][0]
+        self.assertEqual(python['totalPostCount'], 2)
+        self.assertEqual(python['children'][0]['title'], 'Django')
+        self.assertEqual(python['children'][0]['totalPostCount'], 1)
+
+    def test_tree_cached(self):
+        """Test the tree is served from the cache when warm."""
+        self.client.get(CATEGORY_TREE_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(CATEGORY_TREE_URL)
+
+        self.assertEqual(len(res.data), 2)
+
+    def test_tree_invalidated(self):
+        """Test changes of the categories and posts refresh the tree."""
+        self.client.get(CATEGORY_TREE_URL)
+        create_category(self.user, 'Baking', self.other)
+        create_post(self.user, self.other)
+
+        cooking = self.client.get(CATEGORY_TREE_URL).data[0]
+
+        self.assertEqual(cooking['children'][0]['title'], 'Baking')
+        self.assertEqual(cooking['postCount'], 2)
@@ -0,0 +1,106 @@
+"""
+Tests for the comment counts of posts.
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.models import Comment, Post, PostCategory, PostInformation
+
+
+class CommentCountTests(TestCase):
+    """Test the comment counts kept on post information."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            name='Test User',
+            password='testpass')
+        self.category = PostCategory.objects.create(
+            title='Sample category',
+            createdBy=self.user,
+            updatedBy=self.user)
+        self.post = self.create_post()
+
+    def create_post(self):
+        return Post.objects.create(
+            title='Sample post title',
+            content='<p>Sample content</p>',
+            excerpt='Sample excerpt',
+            readTime=5,
+            postCategoryId=self.category,
+            createdBy=self.user,
+            updatedBy=self.user)
+
+    def comment(self, parentComment=None, post=None):
+        return Comment.objects.create(
+            post=post or self.post,
+            user=self.user,
+            parentComment=parentComment,
+            comment='Sample comment')
+
+    def comment_count(self, post=None):
+        return PostInformation.objects.get(
+            post=post or self.post).commentCount
+
+    def test_create_comment_increments(self):
+        """Test creating a comment updates the count in one statement."""
+        self.comment()
+
+        # the comment, the count and the copy to the feed entry
+        with self.assertNumQueries(3):
+            self.comment()
+
+        self.assertEqual(self.comment_count(), 2)
+
+    def test_delete_thread_decrements_once(self):
+        """Test deleting a comment subtracts all its replies at once."""
+        root = self.comment()
+        reply = self.comment(parentComment=root)
+        self.comment(parentComment=reply)
+        self.comment(parentComment=reply)
+        self.comment()
+
+        root.delete()
+
+        self.assertEqual(self.comment_count(), 1)
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_delete_queryset(self):
+        """Test bulk deleting comments of several posts."""
+        other_post = self.create_post()
+        root = self.comment()
+        self.comment(parentComment=root)
+        self.comment(post=other_post)
+        self.comment(post=other_post)
+
+        Comment.objects.filter(parentComment__isnull=True).delete()
+
+        self.assertEqual(self.comment_count(), 0)
+        self.assertEqual(self.comment_count(other_post), 0)
+
+    def test_delete_post_with_comments(self):
+        """Test deleting a post deletes its comments."""
+        root = self.comment()
+        self.comment(parentComment=root)
+
+        self.post.delete()
+
+        self.assertFalse(Comment.objects.exists())
+
+    def test_check_comment_counts_fix(self):
+        """Test the check command rebuilds inconsistent counts."""
+        self.comment()
+        self.comment()
+        PostInformation.objects.filter(post=self.post).update(
+            commentCount=5)
+
+        out = StringIO()
+        call_command('check_comment_counts', stdout=out)
+        self.assertIn('1 inconsistent comment counts', out.getvalue())
+        self.assertEqual(self.comment_count(), 5)
+
+        call_command('check_comment_counts', '--fix', stdout=out)
+        self.assertEqual(self.comment_count(), 2)
@@ -0,0 +1,159 @@
+"""
+Tests for the feed entries of the posts.
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Comment,
+    FeedEntry,
+    Post,
+    PostCategory,
+    PostInformation,
+    PostRate
+)
+from post.feed_entries import refresh_feed_entries
+from post.tests.helpers import create_post
+from post.view_counter import write_view_counts
+
+
+POST_URL = reverse('post:post-list')
+
+
+def create_user(email):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        name='Test User', email=email, password='testpass')
+
+
+class FeedEntryTests(TestCase):
+    """Test keeping the feed entries up to date."""
+
+    def setUp(self):
+        self.user = create_user('test@example.com')
+        self.postCategory = PostCategory.objects.create(
+            title='Sample category',
+            createdBy=self.user,
+            updatedBy=self.user)
+        self.post = create_post(self.user, self.postCategory)
+
+    def entry(self, post=None):
+        return FeedEntry.objects.get(post=post or self.post)
+
+    def test_entry_created_with_post(self):
+        """Test creating a post creates its feed entry."""
+        entry = self.entry()
+
+        self.assertEqual(entry.postStatus, 'publish')
+        self.assertEqual(entry.reviewStatus, 'accept')
+        self.assertEqual(entry.postCategoryId, self.postCategory)
+        self.assertEqual(entry.createdBy, self.user)
+        self.assertEqual(entry.readTime, 5)
+        self.assertEqual(entry.viewCount, 0)
+
+    def test_post_edit_updates_entry(self):
+        """Test saving a post copies its new columns to the entry."""
+        reviewed = timezone.now()
+        self.post.postStatus = 'archive'
+        self.post.reviewResponseDate = reviewed
+        self.post.readTime = 12
+        self.post.save()
+
+        entry = self.entry()
+        self.assertEqual(entry.postStatus, 'archive')
+        self.assertEqual(entry.reviewResponseDate, reviewed)
+        self.assertEqual(entry.readTime, 12)
+
+    def test_counters_copied(self):
+        """Test every counter update path reaches the entry."""
+        write_view_counts({self.post.id: 3})
+        PostRate.objects.create(
+            user=create_user('rater@example.com'), post=self.post, rate=4)
+        Comment.objects.create(
+            post=self.post, user=self.user, comment='Sample comment')
+        self.post.postInformation.refresh_from_db()
+        self.post.postInformation.increment_social_share_count()
+
+        entry = self.entry()
+        self.assertEqual(entry.viewCount, 3)
+        self.assertEqual(entry.ratingCount, 1)
+        self.assertEqual(entry.averageRating, 4.0)
+        self.assertEqual(entry.commentCount, 1)
+        self.assertEqual(entry.socialShareCount, 1)
+
+    def test_entry_deleted_with_post(self):
+        """Test deleting a post deletes its entry."""
+        self.post.delete()
+
+        self.assertFalse(FeedEntry.objects.exists())
+
+    def test_rebuild_command(self):
+        """Test the command restores missing and stale entries."""
+        other_post = create_post(self.user, self.postCategory)
+        FeedEntry.objects.filter(post=self.post).delete()
+        PostInformation.objects.filter(post=other_post).update(viewCount=7)
+
+        call_command('rebuild_feed_entries', stdout=StringIO())
+
+        self.assertEqual(self.entry().postStatus, 'publish')
+        self.assertEqual(self.entry(other_post).viewCount, 7)
+
+    def test_refresh_upserts(self):
+        """Test refreshing the entries inserts and updates them at once."""
+        other_post = create_post(self.user, self.postCategory)
+        FeedEntry.objects.filter(post=self.post).delete()
+        Post.objects.filter(pk=other_post.pk).update(readTime=9)
+
+        with self.assertNumQueries(1):
+            refreshed = refresh_feed_entries([self.post.pk, other_post.pk])
+
+        self.assertEqual(refreshed, 2)
+        self.assertEqual(self.entry(other_post).readTime, 9)
+
+
+class FeedEntryApiTests(TestCase):
+    """Test the feed reads the entries."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user('test@example.com')
+        self.postCategory = PostCategory.objects.create(
+            title='Sample category',
+            createdBy=self.user,
+            updatedBy=self.user)
+
+    def test_feed_sorted_by_entry_counters(self):
+        """Test the feed sorts by the counters of the entries."""
+        posts = [create_post(self.user, self.postCategory)
+                 for _ in range(3)]
+        write_view_counts({posts[0].id: 1, posts[1].id: 5, posts[2].id: 3})
+
+        res = self.client.get(POST_URL, {'sort': 3})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([post['id'] for post in res.data['results']],
+                         [posts[1].id, posts[2].id, posts[0].id])
+
+    def test_feed_query_filters_entries(self):
+        """Test the status filters and the sort are on the entries."""
+        create_post(self.user, self.postCategory)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(POST_URL, {'sort': 3})
+
+        sql = next(query['sql'] for query in queries.captured_queries
+                   if 'ORDER BY' in query['sql'])
+        where = sql[sql.index(' WHERE '):]
+        self.assertIn('"core_feedentry"."reviewStatus"', where)
+        self.assertIn('"core_feedentry"."viewCount" DESC', where)
+        self.assertNotIn('"core_postinformation"', where)
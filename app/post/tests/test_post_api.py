@@ -2,7 +2,10 @@
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from unittest.mock import patch
 from django.urls import reverse
 
 from rest_framework import status
@@ -14,8 +17,13 @@ from post.serializers import (
 )
 
 from core.models import (
-    Post
+    Post,
+    PostCategory,
+    PostRate,
+    Tag
 )
+from post.tests.helpers import create_post
+from post.view_counter import MemoryViewCountSink
 
 import tempfile
 import os
@@ -35,10 +43,16 @@ def image_upload_url(post_id):
 
 def create_category(user, **params):
     """Create postCategory and return it."""
-    default = {
+    defaults = {
         'title': 'sample Category',
         'description': 'sample desc',
     }
+    defaults.update(params)
+
+    return PostCategory.objects.create(createdBy=user,
+                                       updatedBy=user,
+                                       **defaults)
+
 
 def create_recipe(user, **params):
     """Create Recipe and return it."""
@@ -58,3 +72,86 @@ def create_recipe(user, **params):
 def create_user(**params):
     """Create and return a new user"""
     return get_user_model().objects.create_user(**params)
+
+
+@patch('post.middleware.get_view_count_sink',
+       lambda: MemoryViewCountSink(flush_threshold=10 ** 6,
+                                   flush_interval=10 ** 6))
+class PostQueryCountTests(TestCase):
+    """Test the number of queries of the post list and detail."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            name='Test User',
+            email='test@example.com',
+            password='testpass'
+        )
+        self.client.force_authenticate(self.user)
+        self.postCategory = create_category(user=self.user)
+
+    def _count_queries(self, url, table=''):
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len([
+            query for query in context.captured_queries
+            if table in query['sql']
+        ])
+
+    def _count_list_queries(self, table=''):
+        return self._count_queries(POST_URL, table)
+
+    def _create_rated_posts(self, count):
+        posts = []
+        for _ in range(count):
+            post = create_post(self.user, self.postCategory)
+            PostRate.objects.create(user=self.user, post=post, rate=4)
+            post.tags.add(Tag.objects.create(name=f'tag {post.id}',
+                                             createdBy=self.user,
+                                             updatedBy=self.user))
+            posts.append(post)
+        return posts
+
+    def test_list_queries_independent_of_page_size(self):
+        """Test the post list runs a constant number of queries."""
+        self._create_rated_posts(2)
+        queries_for_two_posts = self._count_list_queries()
+
+        self._create_rated_posts(6)
+        queries_for_eight_posts = self._count_list_queries()
+
+        self.assertEqual(queries_for_two_posts, queries_for_eight_posts)
+
+    def test_detail_queries_independent_of_related_posts(self):
+        """Test related posts and tags do not add queries to the detail."""
+        post = create_post(self.user, self.postCategory)
+        post.relatedPosts.add(*self._create_rated_posts(1))
+        queries_for_one_related_post = self._count_queries(
+            detail_url(post.id))
+
+        post.relatedPosts.add(*self._create_rated_posts(5))
+        post.tags.add(*Tag.objects.all())
+        queries_for_six_related_posts = self._count_queries(
+            detail_url(post.id))
+
+        self.assertEqual(queries_for_one_related_post,
+                         queries_for_six_related_posts)
+
+    def test_post_rate_queries_independent_of_page_size(self):
+        """Test rated posts do not add a query per listed post."""
+        # the prefetch of the page and the aggregate of the ETag
+        self._create_rated_posts(2)
+        self.assertEqual(self._count_list_queries('core_postrate'), 2)
+
+        self._create_rated_posts(6)
+        self.assertEqual(self._count_list_queries('core_postrate'), 2)
+
+    def test_list_returns_current_user_post_rate(self):
+        """Test the current user's rate is returned for each post."""
+        self._create_rated_posts(2)
+
+        res = self.client.get(POST_URL)
+
+        for post in res.data['results']:
+            self.assertEqual(post['currentUserPostRate']['rate'], 4)
@@ -0,0 +1,238 @@
+"""
+Tests for the conditional GET of the post, category and tag endpoints.
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import PostCategory, PostRate, Tag
+from post.tests.helpers import create_post
+from post.view_counter import MemoryViewCountSink
+
+
+POST_URL = reverse('post:post-list')
+POSTCATEGORY_URL = reverse('post:postcategory-list')
+TAG_URL = reverse('post:tag-list')
+
+
+def detail_url(post_id):
+    """Create and return a post detail url."""
+    return reverse('post:post-detail', args=[post_id])
+
+
+def category_detail_url(postCategory_id):
+    """Create and return a postCategory detail url."""
+    return reverse('post:postcategory-detail', args=[postCategory_id])
+
+
+@patch('post.middleware.get_view_count_sink',
+       lambda: MemoryViewCountSink(flush_threshold=10 ** 6,
+                                   flush_interval=10 ** 6))
+class ConditionalGetTests(TestCase):
+    """Test answering conditional GETs with 304 Not Modified."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            name='Test User',
+            email='test@example.com',
+            password='testpass'
+        )
+        self.postCategory = PostCategory.objects.create(
+            title='Sample category',
+            createdBy=self.user,
+            updatedBy=self.user)
+        self.post = create_post(self.user, self.postCategory)
+        Tag.objects.create(
+            name='Django', createdBy=self.user, updatedBy=self.user)
+
+    def assertNotModified(self, url):
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', res)
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b'')
+        return res
+
+    def test_endpoints_not_modified(self):
+        """Test every read endpoint answers a matching ETag with 304."""
+        for url in [detail_url(self.post.id), POST_URL,
+                    category_detail_url(self.postCategory.id),
+                    POSTCATEGORY_URL, TAG_URL]:
+            with self.subTest(url=url):
+                self.assertNotModified(url)
+
+    def test_authenticated_feed_not_modified(self):
+        """Test the feed of an authenticated user answers with 304."""
+        self.client.force_authenticate(self.user)
+
+        self.assertNotModified(POST_URL)
+
+    def test_if_modified_since(self):
+        """Test a request since the last update gets a 304."""
+        res = self.client.get(detail_url(self.post.id))
+        self.assertEqual(res['Last-Modified'],
+                         http_date(self.post.updatedDate.timestamp()))
+
+        res = self.client.get(detail_url(self.post.id),
+                              HTTP_IF_MODIFIED_SINCE=res['Last-Modified'])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_post_edit_changes_etag(self):
+        """Test editing the post makes the client ETag stale."""
+        etag = self.client.get(detail_url(self.post.id))['ETag']
+        self.post.title = 'New title'
+        self.post.updatedDate = timezone.now() + timedelta(seconds=1)
+        self.post.save()
+
+        res = self.client.get(detail_url(self.post.id),
+                              HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['title'], 'New title')
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_post_counter_changes_etag(self):
+        """Test a counter change makes the client ETag stale."""
+        self.client.force_authenticate(self.user)
+        etag = self.client.get(detail_url(self.post.id))['ETag']
+        self.post.postInformation.socialShareCount += 1
+        self.post.postInformation.save()
+
+        res = self.client.get(detail_url(self.post.id),
+                              HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_user(self):
+        """Test the ETag of an anonymous reader is not valid for a user."""
+        etag = self.client.get(detail_url(self.post.id))['ETag']
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(detail_url(self.post.id),
+                              HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('Authorization', res['Vary'])
+
+    def test_new_post_changes_feed_etag(self):
+        """Test publishing a post makes the feed ETag stale."""
+        self.client.force_authenticate(self.user)
+        etag = self.client.get(POST_URL)['ETag']
+        create_post(self.user, self.postCategory, title='Second post')
+
+        res = self.client.get(POST_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_authenticated_feed_not_modified_queries(self):
+        """Test the feed of a user answers a 304 with two aggregates."""
+        self.client.force_authenticate(self.user)
+        etag = self.client.get(POST_URL)['ETag']
+
+        with self.assertNumQueries(2):
+            res = self.client.get(POST_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_counter_changes_feed_etag(self):
+        """Test a counter change of a listed post makes the ETag stale."""
+        self.client.force_authenticate(self.user)
+        etag = self.client.get(POST_URL)['ETag']
+        self.post.postInformation.socialShareCount += 1
+        self.post.postInformation.save()
+
+        res = self.client.get(POST_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_rate_changes_feed_etag(self):
+        """Test rating a listed post makes the feed ETag of the user stale."""
+        self.client.force_authenticate(self.user)
+        etag = self.client.get(POST_URL)['ETag']
+        PostRate.objects.create(user=self.user, post=self.post, rate=4)
+
+        res = self.client.get(POST_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['currentUserPostRate']['rate'],
+                         4)
+
+    @override_settings(POST_FEED_CACHE_TIMEOUT=0)
+    def test_rebuilt_page_changes_anonymous_feed_etag(self):
+        """Test the anonymous ETag follows the rebuilds of the page."""
+        etag = self.client.get(POST_URL)['ETag']
+        self.post.postInformation.socialShareCount += 1
+        self.post.postInformation.save()
+
+        res = self.client.get(POST_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'][0]['postInformation']['socialShareCount'], 1)
+
+    def test_tag_rename_changes_post_etag(self):
+        """Test renaming a tag of the post makes the detail ETag stale."""
+        tag = Tag.objects.get(name='Django')
+        self.post.tags.add(tag)
+        etag = self.client.get(detail_url(self.post.id))['ETag']
+        tag.name = 'django'
+        tag.save()
+
+        res = self.client.get(detail_url(self.post.id),
+                              HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['tags'][0]['name'], 'django')
+
+    def test_author_rename_changes_post_etag(self):
+        """Test renaming the author makes the detail ETag stale."""
+        etag = self.client.get(detail_url(self.post.id))['ETag']
+        self.user.name = 'Renamed User'
+        self.user.save()
+
+        res = self.client.get(detail_url(self.post.id),
+                              HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['createdBy']['name'], 'Renamed User')
+
+    def test_parent_rename_changes_category_etag(self):
+        """Test renaming the parent category makes the ETag stale."""
+        child = PostCategory.objects.create(
+            title='Child category',
+            parentPostCategoryId=self.postCategory,
+            createdBy=self.user,
+            updatedBy=self.user)
+        etag = self.client.get(category_detail_url(child.id))['ETag']
+        self.postCategory.title = 'Renamed category'
+        self.postCategory.updatedDate = timezone.now()
+        self.postCategory.save()
+
+        res = self.client.get(category_detail_url(child.id),
+                              HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['parentPostCategoryTitle'],
+                         'Renamed category')
+
+    def test_missing_post_not_found(self):
+        """Test a missing post is still a 404."""
+        res = self.client.get(detail_url(self.post.id + 1000))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('ETag', res)
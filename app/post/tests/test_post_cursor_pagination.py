@@ -0,0 +1,111 @@
+"""
+Tests for the keyset pagination of the post feed.
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Post, PostCategory, PostInformation
+from post.pagination import POST_SORT_KEYS, PostCursorPagination
+from post.tests.helpers import create_post
+
+
+POST_URL = reverse("post:post-list")
+
+
+@patch.object(PostCursorPagination, 'page_size', 2)
+class PostCursorPaginationTests(TestCase):
+    """Test paginating the post list with cursors."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            name='Test User',
+            email='test@example.com',
+            password='testpass'
+        )
+        self.postCategory = PostCategory.objects.create(
+            title='Sample category',
+            createdBy=self.user,
+            updatedBy=self.user)
+
+        now = timezone.now()
+        self.posts = []
+        # duplicated read times and missing review dates and view counts
+        for index, readTime in enumerate([3, 1, 3, 2, 3]):
+            post = create_post(
+                self.user, self.postCategory,
+                readTime=readTime,
+                reviewResponseDate=(now - timedelta(hours=index)
+                                    if index % 2 else None))
+            self.posts.append(post)
+        PostInformation.objects.filter(post=self.posts[0]).update(
+            viewCount=None)
+        PostInformation.objects.filter(post=self.posts[1]).update(
+            viewCount=7)
+
+    def walk(self, params):
+        """Follow the next links, then the previous links back."""
+        res = self.client.get(POST_URL, {'pagination': 'cursor', **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(res.data['previous'])
+        pages = [[post['id'] for post in res.data['results']]]
+        while res.data['next']:
+            res = self.client.get(res.data['next'])
+            pages.append([post['id'] for post in res.data['results']])
+
+        backward = [pages[-1]]
+        while res.data['previous']:
+            res = self.client.get(res.data['previous'])
+            backward.insert(0, [post['id'] for post in res.data['results']])
+        return pages, backward
+
+    def expected_ids(self, sort):
+        ordering = POST_SORT_KEYS[sort].ordering()
+        return list(Post.objects.order_by(*ordering).values_list(
+            'id', flat=True))
+
+    def test_cursor_pages_match_the_feed_order(self):
+        """Test every sort is paginated without gaps or duplicates."""
+        for sort in range(7):
+            with self.subTest(sort=sort):
+                pages, backward = self.walk({'sort': sort})
+
+                self.assertTrue(all(len(page) <= 2 for page in pages))
+                ids = [post_id for page in pages for post_id in page]
+                self.assertEqual(ids, self.expected_ids(sort))
+                self.assertEqual(backward, pages)
+
+    def test_count_is_optional(self):
+        """Test the count is only returned when asked for."""
+        res = self.client.get(POST_URL, {'pagination': 'cursor'})
+        self.assertNotIn('count', res.data)
+
+        res = self.client.get(POST_URL,
+                              {'pagination': 'cursor', 'includeCount': 1})
+        self.assertEqual(res.data['count'], len(self.posts))
+
+    def test_cursor_of_other_sort_rejected(self):
+        """Test a cursor cannot be reused with another ordering."""
+        res = self.client.get(POST_URL,
+                              {'pagination': 'cursor', 'sort': 1})
+        cursor = res.data['next'].split('cursor=')[1].split('&')[0]
+
+        res = self.client.get(POST_URL, {'pagination': 'cursor',
+                                         'sort': 2, 'cursor': cursor})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_cursor_rejected(self):
+        """Test a malformed cursor returns 404."""
+        res = self.client.get(POST_URL, {'pagination': 'cursor',
+                                         'cursor': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,121 @@
+"""
+Tests for the post detail cache.
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import PostCategory, PostInformation, PostRate, Tag
+from post.tests.helpers import create_post
+from post.view_counter import MemoryViewCountSink
+
+
+CACHE_STATS_URL = reverse("post:cache-stats")
+
+
+def detail_url(post_id):
+    """Create and return a post detail url."""
+    return reverse('post:post-detail', args=[post_id])
+
+
+@patch('post.middleware.get_view_count_sink',
+       lambda: MemoryViewCountSink(flush_threshold=10 ** 6,
+                                   flush_interval=10 ** 6))
+class PostDetailCacheTests(TestCase):
+    """Test caching the post details."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            name='Test User',
+            email='test@example.com',
+            password='testpass'
+        )
+        self.postCategory = PostCategory.objects.create(
+            title='Sample category',
+            createdBy=self.user,
+            updatedBy=self.user)
+        self.post = create_post(self.user, self.postCategory)
+
+    def get_detail(self):
+        res = self.client.get(detail_url(self.post.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_cache_hit_skips_relations(self):
+        """Test a cached detail does not load tags and related posts."""
+        self.post.tags.add(Tag.objects.create(
+            name='Django', createdBy=self.user, updatedBy=self.user))
+        self.get_detail()
+
+        with self.assertNumQueries(1):
+            data = self.get_detail()
+
+        self.assertEqual([tag['name'] for tag in data['tags']], ['Django'])
+
+    def test_edit_invalidates_cache(self):
+        """Test saving the post refreshes its cached detail."""
+        self.get_detail()
+
+        self.post.title = 'New title'
+        self.post.save()
+
+        self.assertEqual(self.get_detail()['title'], 'New title')
+
+    def test_tags_change_invalidates_cache(self):
+        """Test adding a tag refreshes the cached detail."""
+        self.get_detail()
+
+        self.post.tags.add(Tag.objects.create(
+            name='Python', createdBy=self.user, updatedBy=self.user))
+
+        self.assertEqual([tag['name'] for tag in self.get_detail()['tags']],
+                         ['Python'])
+
+    def test_related_post_change_invalidates_cache(self):
+        """Test editing a related post refreshes the cached detail."""
+        related_post = create_post(self.user, self.postCategory)
+        self.post.relatedPosts.add(related_post)
+        self.get_detail()
+
+        related_post.title = 'Renamed related post'
+        related_post.save()
+
+        self.assertEqual(self.get_detail()['relatedPosts'][0]['title'],
+                         'Renamed related post')
+
+    def test_user_fields_not_cached(self):
+        """Test the counters and current user's rate are always fresh."""
+        self.get_detail()
+        PostInformation.objects.filter(post=self.post).update(viewCount=42)
+        PostRate.objects.create(user=self.user, post=self.post, rate=5)
+        self.client.force_authenticate(self.user)
+
+        data = self.get_detail()
+
+        self.assertEqual(data['postInformation']['viewCount'], 42)
+        self.assertEqual(data['currentUserPostRate']['rate'], 5)
+
+    def test_cache_stats_for_admins(self):
+        """Test the hit and miss counts are only shown to admins."""
+        self.get_detail()
+        self.get_detail()
+        admin = get_user_model().objects.create_superuser(
+            email='admin@example.com', password='testpass')
+
+        res = self.client.get(CACHE_STATS_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(admin)
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['postDetail'],
+                         {'hits': 1, 'misses': 1, 'hitRatio': 0.5})
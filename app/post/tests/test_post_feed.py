@@ -0,0 +1,214 @@
+"""
+Tests for the query of the post feed.
+"""
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.test import APIClient
+
+from core.models import Post, PostCategory, Tag
+from post.feed import build_feed
+from post.pagination import POST_SORT_KEYS
+from post.tests.helpers import create_post
+
+
+POST_URL = reverse('post:post-list')
+
+
+def plan_nodes(plan):
+    """Return the node types of an EXPLAIN plan, recursively."""
+    nodes = [plan['Node Type']]
+    for child in plan.get('Plans', []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+class FeedQueryTests(TestCase):
+    """Test the SQL of the feed for the filter combinations."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            name='Test User',
+            email='test@example.com',
+            password='testpass'
+        )
+        self.postCategory = PostCategory.objects.create(
+            title='Sample category',
+            createdBy=self.user,
+            updatedBy=self.user)
+        self.tags = [
+            Tag.objects.create(name=name, createdBy=self.user,
+                               updatedBy=self.user)
+            for name in ('Django', 'Python')
+        ]
+        today = timezone.now().date()
+        self.params = {
+            'tags': ','.join(str(tag.id) for tag in self.tags),
+            'postCategoryId': str(self.postCategory.id),
+            'authorName': 'Test',
+            'search': 'sample',
+            'reviewResponseDate': f'{today - timedelta(days=7)},{today}',
+        }
+
+    def build(self, params, user, sort=0):
+        query = QueryDict(mutable=True)
+        query.update(params)
+        return build_feed(Post.objects.all(), query, user,
+                          POST_SORT_KEYS[sort])
+
+    def explain(self, queryset):
+        plan = json.loads(queryset.explain(format='json'))
+        return plan_nodes(plan[0]['Plan'])
+
+    def test_filter_combinations_single_query(self):
+        """Test every filter combination is one query without DISTINCT."""
+        for user in (AnonymousUser(), self.user):
+            for name, value in [(None, None), *self.params.items()]:
+                params = {name: value} if name else {}
+                with self.subTest(user=user, filter=name):
+                    queryset = self.build(params, user)
+                    sql = str(queryset.query)
+
+                    self.assertNotIn('DISTINCT', sql)
+                    self.assertNotIn('UNION', sql)
+                    nodes = self.explain(queryset)
+                    self.assertNotIn('Unique', nodes)
+                    self.assertNotIn('HashAggregate', nodes)
+
+    def test_all_filters_single_query(self):
+        """Test combining all the filters keeps a single WHERE clause."""
+        queryset = self.build(self.params, self.user)
+        sql = str(queryset.query)
+
+        self.assertNotIn('DISTINCT', sql)
+        self.assertEqual(sql.count('WHERE'), 2)
+        self.assertIn('EXISTS', sql)
+        self.assertNotIn('Unique', self.explain(queryset))
+
+    def test_tag_filter_no_join(self):
+        """Test the tag filter is a subquery, not a join of the tags."""
+        queryset = self.build({'tags': self.params['tags']}, self.user)
+
+        self.assertIn('EXISTS', str(queryset.query))
+        self.assertEqual(queryset.query.alias_refcount.get(
+            'core_post_tags', 0), 0)
+
+    def test_requested_sort_kept(self):
+        """Test the feed of an authenticated user keeps the sort."""
+        for sort, sort_key in POST_SORT_KEYS.items():
+            with self.subTest(sort=sort):
+                queryset = self.build({}, self.user, sort)
+
+                self.assertEqual(list(queryset.query.order_by),
+                                 sort_key.ordering())
+
+    def test_sorts_use_indexes(self):
+        """Test the first page of every sort is read from an index."""
+        sort_indexes = {
+            0: 'feed_review_date_idx',
+            1: 'feed_read_time_idx',
+            2: 'feed_read_time_idx',
+            3: 'feed_viewcount_idx',
+            4: 'feed_socialsharecount_idx',
+            5: 'feed_ratingcount_idx',
+            6: 'feed_averagerating_idx',
+        }
+        with connection.cursor() as cursor:
+            # the test tables are too small for the planner to pick them
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_sort = off')
+        for user in (AnonymousUser(), self.user):
+            for sort, index in sort_indexes.items():
+                with self.subTest(user=user, sort=sort):
+                    queryset = self.build({}, user, sort)[:10]
+
+                    self.assertIn(index, queryset.explain())
+
+    def test_current_user_posts_requires_authentication(self):
+        """Test the posts of the current user need a user."""
+        with self.assertRaises(PermissionDenied):
+            self.build({'currentUserPosts': '1'}, AnonymousUser())
+
+
+class FeedApiTests(TestCase):
+    """Test the posts returned by the feed."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            name='Test User',
+            email='test@example.com',
+            password='testpass'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            name='Other User',
+            email='other@example.com',
+            password='testpass'
+        )
+        self.postCategory = PostCategory.objects.create(
+            title='Sample category',
+            createdBy=self.user,
+            updatedBy=self.user)
+        self.client.force_authenticate(self.user)
+
+    def get_ids(self, **params):
+        res = self.client.get(POST_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [post['id'] for post in res.data['results']]
+
+    def test_feed_visibility(self):
+        """Test the feed has the published posts and the user's drafts."""
+        published = create_post(self.other_user, self.postCategory)
+        draft = create_post(self.user, self.postCategory,
+                            postStatus='draft', reviewStatus='pending')
+        create_post(self.other_user, self.postCategory, postStatus='draft')
+        create_post(self.other_user, self.postCategory,
+                    reviewStatus='reject')
+
+        ids = self.get_ids()
+
+        self.assertCountEqual(ids, [published.id, draft.id])
+
+    def test_feed_sorted_for_user(self):
+        """Test the feed of an authenticated user has the requested sort."""
+        posts = [
+            create_post(self.user, self.postCategory, readTime=read_time)
+            for read_time in (7, 3, 5)
+        ]
+        draft = create_post(self.user, self.postCategory, readTime=1,
+                            postStatus='draft')
+
+        ids = self.get_ids(sort=1)
+
+        self.assertEqual(ids, [draft.id, posts[1].id, posts[2].id,
+                               posts[0].id])
+
+    def test_post_with_several_tags_once(self):
+        """Test a post having several of the tags is returned once."""
+        post = create_post(self.user, self.postCategory)
+        tags = [
+            Tag.objects.create(name=name, createdBy=self.user,
+                               updatedBy=self.user)
+            for name in ('Django', 'Python')
+        ]
+        post.tags.set(tags)
+
+        ids = self.get_ids(tags=','.join(str(tag.id) for tag in tags))
+
+        self.assertEqual(ids, [post.id])
+
+    def test_invalid_tag_ids(self):
+        """Test invalid tag ids are a bad request."""
+        res = self.client.get(POST_URL, {'tags': 'django'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
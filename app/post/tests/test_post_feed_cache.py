@@ -0,0 +1,149 @@
+"""
+Tests for the cached feed pages of anonymous readers.
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Post, PostCategory
+from post.caching import (
+    feed_page_key,
+    get_feed_generation,
+    get_feed_page_cache_stats,
+    note_counter_change
+)
+from post.pagination import CustomPageNumberPagination
+from post.tests.helpers import create_post
+
+
+POST_URL = reverse("post:post-list")
+ORIGIN = 'http://testserver'
+
+
+class PostFeedCacheTests(TestCase):
+    """Test caching the feed pages of anonymous readers."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            name='Test User',
+            email='test@example.com',
+            password='testpass'
+        )
+        self.postCategory = PostCategory.objects.create(
+            title='Sample category',
+            createdBy=self.user,
+            updatedBy=self.user)
+        self.post = create_post(self.user, self.postCategory)
+
+    def feed_ids(self, params=None):
+        res = self.client.get(POST_URL, params or {})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [post['id'] for post in res.data['results']]
+
+    def test_cached_page_skips_database(self):
+        """Test a cached feed page is served without queries."""
+        self.feed_ids()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.feed_ids(), [self.post.id])
+
+    def test_key_normalizes_id_lists(self):
+        """Test the order of the ids of a filter does not matter."""
+        self.assertEqual(
+            feed_page_key({'tags': '2,1', 'page': '1'}, ORIGIN),
+            feed_page_key({'page': '1', 'tags': '1, 2'}, ORIGIN))
+        self.assertNotEqual(
+            feed_page_key({'tags': '1,2'}, ORIGIN),
+            feed_page_key({'tags': '1,2', 'sort': '1'}, ORIGIN))
+
+    def test_key_includes_scheme_and_own_posts(self):
+        """Test the scheme and the own posts filter select other pages."""
+        self.assertNotEqual(feed_page_key({}, ORIGIN),
+                            feed_page_key({}, 'https://testserver'))
+        self.assertNotEqual(feed_page_key({}, ORIGIN),
+                            feed_page_key({'currentUserPosts': '1'}, ORIGIN))
+
+    def test_own_posts_not_served_from_cache(self):
+        """Test asking for the own posts is not answered by a cached page."""
+        self.feed_ids()
+
+        res = self.client.get(POST_URL, {'currentUserPosts': '1'})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    @patch.object(CustomPageNumberPagination, 'page_size', 1)
+    def test_links_hold_only_feed_params(self):
+        """Test the cached links do not carry the params of the builder."""
+        create_post(self.user, self.postCategory)
+        ids = sorted(map(str, [self.postCategory.id,
+                               self.postCategory.id + 100]))
+        next_url = (f'http://testserver{POST_URL}?page=2&postCategoryId='
+                    f'{ids[0]}%2C{ids[1]}')
+
+        res = self.client.get(POST_URL, {
+            'postCategoryId': f'{ids[1]},{ids[0]}', 'utm': 'x'})
+        self.assertEqual(res.data['next'], next_url)
+
+        res = self.client.get(POST_URL,
+                              {'postCategoryId': f'{ids[0]},{ids[1]}'})
+        self.assertEqual(res.data['next'], next_url)
+
+    def test_publish_refreshes_feed(self):
+        """Test a newly published post shows up in the cached feed."""
+        self.feed_ids()
+        draft = create_post(self.user, self.postCategory,
+                            postStatus='draft', reviewStatus='pending')
+        self.feed_ids()
+
+        draft.postStatus = 'publish'
+        draft.reviewStatus = 'accept'
+        draft.save()
+
+        self.assertIn(draft.id, self.feed_ids())
+
+    @override_settings(POST_FEED_CACHE_TIMEOUT=0)
+    def test_stale_page_served_while_rebuilding(self):
+        """Test an expired page is served while it is rebuilt."""
+        self.feed_ids()
+        key = feed_page_key({}, ORIGIN)
+        cache.add(f'{key}:lock', 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.feed_ids(), [self.post.id])
+
+        cache.delete(f'{key}:lock')
+        self.feed_ids()
+
+        stats = get_feed_page_cache_stats()
+        self.assertEqual(stats['staleHits'], 1)
+        self.assertEqual(stats['misses'], 2)
+
+    @override_settings(POST_FEED_COUNTER_CHANGE_THRESHOLD=3)
+    def test_counter_changes_bump_generation(self):
+        """Test the feed is refreshed once enough counters changed."""
+        generation = get_feed_generation()
+
+        note_counter_change(2)
+        self.assertEqual(get_feed_generation(), generation)
+
+        note_counter_change()
+        self.assertNotEqual(get_feed_generation(), generation)
+
+    def test_authenticated_feed_not_cached(self):
+        """Test the feed of a signed in user is not cached."""
+        self.client.force_authenticate(self.user)
+        self.client.get(POST_URL)
+
+        # bypass the signals bumping the feed generation
+        Post.objects.filter(pk=self.post.pk).update(title='Updated title')
+
+        res = self.client.get(POST_URL)
+        self.assertEqual(res.data['results'][0]['title'], 'Updated title')
@@ -0,0 +1,96 @@
+"""
+Tests for the count strategies of the paginated post feed.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Post, PostCategory
+from post.pagination import CachedCountPaginator, query_cache_key
+from post.tests.helpers import create_post
+
+
+POST_URL = reverse("post:post-list")
+
+
+class PostPaginationCountTests(TestCase):
+    """Test counting the pages of the post feed."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            name='Test User',
+            email='test@example.com',
+            password='testpass'
+        )
+        self.postCategory = PostCategory.objects.create(
+            title='Sample category',
+            createdBy=self.user,
+            updatedBy=self.user)
+
+    def test_cached_count_reused(self):
+        """Test the exact count is only computed once per query."""
+        create_post(self.user, self.postCategory)
+        queryset = Post.objects.published_and_accepted().order_by('id')
+
+        self.assertEqual(CachedCountPaginator(queryset, 10).count, 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(CachedCountPaginator(queryset, 10).count, 1)
+
+    def test_cached_count_invalidated_on_publish(self):
+        """Test publishing a post refreshes the cached counts."""
+        draft = create_post(self.user, self.postCategory,
+                            postStatus='draft', reviewStatus='pending')
+        queryset = Post.objects.published_and_accepted().order_by('id')
+        key = query_cache_key(queryset)
+        self.assertEqual(CachedCountPaginator(queryset, 10).count, 0)
+
+        draft.postStatus = 'publish'
+        draft.reviewStatus = 'accept'
+        draft.save()
+
+        self.assertNotEqual(query_cache_key(queryset), key)
+        self.assertEqual(CachedCountPaginator(queryset, 10).count, 1)
+
+    def test_cached_count_kept_on_unrelated_change(self):
+        """Test editing a post keeps the cached counts."""
+        post = create_post(self.user, self.postCategory)
+        queryset = Post.objects.published_and_accepted().order_by('id')
+        key = query_cache_key(queryset)
+
+        post.title = 'New title'
+        post.save()
+
+        self.assertEqual(query_cache_key(queryset), key)
+
+    def test_total_pages_exact_below_threshold(self):
+        """Test small feeds report their exact number of pages."""
+        for _ in range(11):
+            create_post(self.user, self.postCategory)
+
+        res = self.client.get(POST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['total_pages'], 2)
+        self.assertFalse(res.data['total_pages_is_estimate'])
+
+    @override_settings(POST_FEED_COUNT_ESTIMATE_THRESHOLD=0)
+    def test_total_pages_estimated_above_threshold(self):
+        """Test large feeds use the estimate and can still be paged."""
+        for _ in range(11):
+            create_post(self.user, self.postCategory)
+
+        res = self.client.get(POST_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['total_pages_is_estimate'])
+        self.assertGreaterEqual(res.data['total_pages'], 2)
+        self.assertIsNotNone(res.data['next'])
+
+        res = self.client.get(res.data['next'])
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertIsNone(res.data['next'])
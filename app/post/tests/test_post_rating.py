@@ -0,0 +1,113 @@
+"""
+Tests for the rating aggregates of posts.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core.models import Post, PostCategory, PostInformation, PostRate
+from post.ratings import rebuild_rating_aggregates
+
+
+def create_user(email):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email, name='Test User', password='testpass')
+
+
+class PostRatingAggregateTests(TestCase):
+    """Test the rating aggregates kept on post information."""
+
+    def setUp(self):
+        self.user = create_user('test@example.com')
+        category = PostCategory.objects.create(
+            title='Sample category',
+            createdBy=self.user,
+            updatedBy=self.user)
+        self.post = Post.objects.create(
+            title='Sample post title',
+            content='<p>Sample content</p>',
+            excerpt='Sample excerpt',
+            readTime=5,
+            postCategoryId=category,
+            createdBy=self.user,
+            updatedBy=self.user)
+
+    def rate(self, rate, email='other@example.com'):
+        return PostRate.objects.create(
+            user=create_user(email), post=self.post, rate=rate)
+
+    def assertAggregates(self, ratingSum, ratingCount, averageRating):
+        information = PostInformation.objects.get(post=self.post)
+        self.assertEqual(information.ratingSum, ratingSum)
+        self.assertEqual(information.ratingCount, ratingCount)
+        self.assertEqual(information.averageRating, averageRating)
+
+    def test_create_rate_single_update(self):
+        """Test a new rate updates the aggregates in one statement."""
+        user = create_user('other@example.com')
+
+        # the rate, the aggregates and the copy to the feed entry
+        with self.assertNumQueries(3):
+            PostRate.objects.create(user=user, post=self.post, rate=4)
+
+        self.assertAggregates(4, 1, 4.0)
+
+    def test_average_rounded(self):
+        """Test the average keeps two decimals."""
+        self.rate(5, 'a@example.com')
+        self.rate(4, 'b@example.com')
+        self.rate(4, 'c@example.com')
+
+        self.assertAggregates(13, 3, 4.33)
+
+    def test_update_rate_applies_delta(self):
+        """Test changing a rate only changes the sum."""
+        postRate = self.rate(2)
+        postRate = PostRate.objects.get(pk=postRate.pk)
+        postRate.rate = 5
+
+        with self.assertNumQueries(3):
+            postRate.save()
+
+        self.assertAggregates(5, 1, 5.0)
+
+    def test_move_rate_to_other_post(self):
+        """Test moving a rate takes it from the old post to the new one."""
+        other_post = Post.objects.create(
+            title='Other post title',
+            content='<p>Other content</p>',
+            excerpt='Other excerpt',
+            readTime=5,
+            postCategoryId=self.post.postCategoryId,
+            createdBy=self.user,
+            updatedBy=self.user)
+        self.rate(4, 'a@example.com')
+        postRate = PostRate.objects.get(pk=self.rate(2, 'b@example.com').pk)
+        postRate.post = other_post
+        postRate.rate = 5
+
+        postRate.save()
+
+        self.assertAggregates(4, 1, 4.0)
+        information = PostInformation.objects.get(post=other_post)
+        self.assertEqual((information.ratingSum, information.ratingCount,
+                          information.averageRating), (5, 1, 5.0))
+
+    def test_delete_rate(self):
+        """Test deleting the last rate resets the average."""
+        postRate = self.rate(3)
+
+        postRate.delete()
+
+        self.assertAggregates(0, 0, 0.0)
+
+    def test_rebuild_rating_aggregates(self):
+        """Test the aggregates are rebuilt from the rates."""
+        self.rate(1, 'a@example.com')
+        self.rate(4, 'b@example.com')
+        PostInformation.objects.filter(post=self.post).update(
+            ratingSum=0, ratingCount=7, averageRating=0)
+
+        rebuild_rating_aggregates()
+
+        self.assertAggregates(5, 2, 2.5)
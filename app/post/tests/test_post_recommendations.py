@@ -0,0 +1,137 @@
+"""
+Tests for the random high rated post recommendations.
+"""
+from itertools import count
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Post, PostCategory, PostRate
+from post.recommendations import PostIdPool, high_rated_pool
+from post.tests import helpers
+
+
+RANDOM_HIGH_RATED_URL = reverse('post:post-random-high-rated')
+user_numbers = count()
+
+
+def create_user():
+    """Create and return a new user without a password."""
+    return get_user_model().objects.create_user(
+        name='Test User',
+        email=f'user{next(user_numbers)}@example.com')
+
+
+def create_post(user, postCategory, rate=None, **params):
+    """Create a published and accepted post, rated ``rate``."""
+    post = helpers.create_post(user, postCategory, **params)
+    if rate is not None:
+        PostRate.objects.create(user=create_user(), post=post, rate=rate)
+    return post
+
+
+class RandomHighRatedPostsTests(TestCase):
+    """Test sampling the high rated posts."""
+
+    def setUp(self):
+        cache.clear()
+        high_rated_pool.clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.postCategory = PostCategory.objects.create(
+            title='Sample category',
+            createdBy=self.user,
+            updatedBy=self.user)
+        self.high_rated = [
+            create_post(self.user, self.postCategory, rate=rate)
+            for rate in (4, 5, 5)
+        ]
+        create_post(self.user, self.postCategory, rate=3)
+        create_post(self.user, self.postCategory)
+        create_post(self.user, self.postCategory, rate=5,
+                    postStatus='draft')
+
+    def get_ids(self, **params):
+        res = self.client.get(RANDOM_HIGH_RATED_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [post['id'] for post in res.data]
+
+    def test_manager_samples_high_rated(self):
+        """Test the manager returns distinct published high rated posts."""
+        posts = Post.objects.get_random_high_rated_posts(2)
+
+        self.assertEqual(len(posts), 2)
+        self.assertEqual(len(set(posts)), 2)
+        self.assertTrue(set(posts) <= set(self.high_rated))
+
+    def test_manager_count_capped(self):
+        """Test asking more posts than available returns all of them."""
+        posts = Post.objects.get_random_high_rated_posts(10)
+
+        self.assertCountEqual(posts, self.high_rated)
+
+    def test_high_rated_not_aggregated(self):
+        """Test the high rated filter does not group the posts."""
+        sql = str(Post.objects.get_queryset().high_rated().query)
+
+        self.assertNotIn('GROUP BY', sql)
+        self.assertNotIn('AVG', sql)
+
+    def test_endpoint_returns_high_rated(self):
+        """Test the endpoint only returns published high rated posts."""
+        ids = self.get_ids(count=10)
+
+        self.assertCountEqual(ids, [post.id for post in self.high_rated])
+
+    def test_endpoint_count(self):
+        """Test the endpoint returns the requested number of posts."""
+        self.assertEqual(len(self.get_ids(count=2)), 2)
+
+    def test_warm_endpoint_skips_database(self):
+        """Test a warm pool and cache serve without queries."""
+        self.get_ids(count=10)
+
+        with self.assertNumQueries(0):
+            ids = self.get_ids(count=10)
+
+        self.assertEqual(len(ids), 3)
+
+    def test_unpublished_post_skipped(self):
+        """Test a post unpublished after loading the pool is skipped."""
+        self.get_ids(count=10)
+        post = self.high_rated[0]
+        post.postStatus = 'archive'
+        post.save()
+
+        ids = self.get_ids(count=10)
+
+        self.assertNotIn(post.id, ids)
+        self.assertEqual(len(ids), 2)
+
+    @override_settings(POST_RECOMMENDATION_POOL_TIMEOUT=-1)
+    def test_pool_reloaded(self):
+        """Test a stale pool is reloaded with the new high rated posts."""
+        self.get_ids(count=10)
+        post = create_post(self.user, self.postCategory, rate=5)
+
+        self.assertIn(post.id, self.get_ids(count=10))
+
+    def test_invalid_count(self):
+        """Test a count which is not an integer is a bad request."""
+        res = self.client.get(RANDOM_HIGH_RATED_URL, {'count': 'many'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_pool_sample_distinct(self):
+        """Test the pool samples distinct ids, at most all of them."""
+        pool = PostIdPool(lambda: range(1, 1001))
+
+        sample = pool.sample(50)
+
+        self.assertEqual(len(set(sample)), 50)
+        self.assertEqual(len(pool.sample(5000)), 1000)
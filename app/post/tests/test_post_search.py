@@ -0,0 +1,82 @@
+"""
+Tests for the post full-text search.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import PostCategory
+from post.tests.helpers import create_post
+
+
+POST_URL = reverse("post:post-list")
+
+
+class PostSearchAPITests(TestCase):
+    """Test searching posts."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            name='Test User',
+            email='test@example.com',
+            password='testpass'
+        )
+        self.postCategory = PostCategory.objects.create(
+            title='Sample category',
+            createdBy=self.user,
+            updatedBy=self.user)
+
+    def search(self, text):
+        res = self.client.get(POST_URL, {'search': text})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data['results']
+
+    def test_search_matches_content_without_html(self):
+        """Test the content is searched with its HTML tags stripped."""
+        post = create_post(
+            self.user, self.postCategory,
+            content='<p>Indexing with <strong>PostgreSQL</strong></p>')
+        create_post(self.user, self.postCategory)
+
+        results = self.search('postgresql')
+
+        self.assertEqual([result['id'] for result in results], [post.id])
+        self.assertIn('<mark>PostgreSQL</mark>',
+                      results[0]['searchHeadline'])
+        self.assertNotIn('<strong>', results[0]['searchHeadline'])
+
+    def test_search_matches_prefixes(self):
+        """Test words of the search match the beginning of words."""
+        post = create_post(self.user, self.postCategory,
+                           title='Django REST framework')
+
+        results = self.search('djan fram')
+
+        self.assertEqual([result['id'] for result in results], [post.id])
+
+    def test_search_ranks_title_matches_first(self):
+        """Test posts matching in the title are ranked first."""
+        content_match = create_post(
+            self.user, self.postCategory,
+            content='<p>A few words about caching.</p>')
+        title_match = create_post(self.user, self.postCategory,
+                                  title='Caching strategies')
+
+        results = self.search('caching')
+
+        self.assertEqual([result['id'] for result in results],
+                         [title_match.id, content_match.id])
+
+    def test_search_vector_updated_on_save(self):
+        """Test an edited post is found by its new title."""
+        post = create_post(self.user, self.postCategory)
+        post.title = 'Renamed headline'
+        post.save()
+
+        results = self.search('renamed')
+
+        self.assertEqual([result['id'] for result in results], [post.id])
@@ -0,0 +1,122 @@
+"""
+Tests for assigning tags to the posts.
+"""
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Post, PostCategory, Tag
+from post.tests.helpers import PostViewsTestCase
+
+
+POST_URL = reverse('post:post-list')
+
+
+def detail_url(post_id):
+    """Create and return a post detail url."""
+    return reverse('post:post-detail', args=[post_id])
+
+
+def tag_payload(*names):
+    """Return the tags field of a post payload."""
+    return [{'name': name} for name in names]
+
+
+class PostTagsTests(PostViewsTestCase):
+    """Test resolving the tags of a post by name."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            name='Test User', email='test@example.com')
+        self.client.force_authenticate(self.user)
+        self.postCategory = PostCategory.objects.create(
+            title='Sample category', createdBy=self.user, updatedBy=self.user)
+        self.payload = {
+            'title': 'Sample post title',
+            'postCategoryId': self.postCategory.id,
+            'content': '<p>Sample post content.</p>',
+            'excerpt': 'Sample post excerpt.',
+            'readTime': 5,
+        }
+
+    def create_post(self, *names):
+        res = self.client.post(POST_URL, {**self.payload,
+                                          'tags': tag_payload(*names)},
+                               format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return Post.objects.get(pk=res.data['id'])
+
+    def update_tags(self, post, *names):
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.patch(detail_url(post.id),
+                                    {'tags': tag_payload(*names)},
+                                    format='json')
+        # updates answer with a 201
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return context.captured_queries
+
+    def test_create_reuses_existing_tags(self):
+        """Test the existing tags are reused and the new ones created."""
+        existing = Tag.objects.create(name='django', createdBy=self.user,
+                                      updatedBy=self.user)
+
+        post = self.create_post('django', 'python', 'python')
+
+        self.assertCountEqual(post.tags.values_list('name', flat=True),
+                              ['django', 'python'])
+        self.assertIn(existing, post.tags.all())
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def test_tags_created_in_bulk(self):
+        """Test the missing tags are created by a single insert."""
+        post = self.create_post()
+        names = [f'tag {index}' for index in range(20)]
+
+        queries = self.update_tags(post, *names)
+
+        tag_inserts = [query for query in queries
+                       if query['sql'].startswith('INSERT INTO "core_tag"')]
+        self.assertEqual(len(tag_inserts), 1)
+        self.assertEqual(post.tags.count(), 20)
+
+    def test_update_writes_only_changes(self):
+        """Test an update inserts the added tags and deletes the removed."""
+        names = [f'tag {index}' for index in range(20)]
+        post = self.create_post(*names)
+        kept_ids = set(Post.tags.through.objects.filter(
+            post=post).exclude(tag__name='tag 0').values_list('id', flat=True))
+
+        queries = self.update_tags(post, *names[1:], 'tag 20')
+
+        through_writes = [
+            query for query in queries
+            if query['sql'].startswith(('INSERT INTO "core_post_tags"',
+                                        'DELETE FROM "core_post_tags"'))
+        ]
+        self.assertEqual(len(through_writes), 2)
+        self.assertTrue(kept_ids <= set(Post.tags.through.objects.filter(
+            post=post).values_list('id', flat=True)))
+        self.assertCountEqual(post.tags.values_list('name', flat=True),
+                              [*names[1:], 'tag 20'])
+
+    def test_empty_tags_clear(self):
+        """Test an empty list removes the tags of the post."""
+        post = self.create_post('django')
+
+        self.update_tags(post)
+
+        self.assertFalse(post.tags.exists())
+
+    def test_tag_names_unique(self):
+        """Test two tags cannot have the same name."""
+        Tag.objects.create(name='django', createdBy=self.user,
+                           updatedBy=self.user)
+
+        with self.assertRaises(IntegrityError):
+            Tag.objects.create(name='django', createdBy=self.user,
+                               updatedBy=self.user)
@@ -0,0 +1,136 @@
+"""
+Tests for assigning the related posts of a post.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Post, PostCategory
+from post.tests.helpers import PostViewsTestCase, create_post
+
+
+POST_URL = reverse('post:post-list')
+
+
+def detail_url(post_id):
+    """Create and return a post detail url."""
+    return reverse('post:post-detail', args=[post_id])
+
+
+class RelatedPostIdsTests(PostViewsTestCase):
+    """Test writing the related posts by id."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            name='Test User', email='test@example.com')
+        self.client.force_authenticate(self.user)
+        self.postCategory = PostCategory.objects.create(
+            title='Sample category', createdBy=self.user, updatedBy=self.user)
+        self.post = create_post(self.user, self.postCategory)
+        self.others = [create_post(self.user, self.postCategory)
+                       for _ in range(5)]
+
+    def related_ids(self, post=None):
+        return set((post or self.post).relatedPosts.values_list(
+            'pk', flat=True))
+
+    def update_related(self, ids):
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.patch(detail_url(self.post.id),
+                                    {'relatedPostIds': ids},
+                                    format='json')
+        return res, context.captured_queries
+
+    def test_create_with_related_posts(self):
+        """Test creating a post relates it to the given posts."""
+        payload = {
+            'title': 'New post',
+            'postCategoryId': self.postCategory.id,
+            'content': '<p>Content.</p>',
+            'excerpt': 'Excerpt.',
+            'readTime': 3,
+            'relatedPostIds': [self.others[0].id, self.others[1].id],
+        }
+
+        res = self.client.post(POST_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        post = Post.objects.get(pk=res.data['id'])
+        self.assertEqual(self.related_ids(post),
+                         {self.others[0].id, self.others[1].id})
+        self.assertNotIn('relatedPostIds', res.data)
+
+    def test_update_validates_in_one_query(self):
+        """Test the ids are checked together, whatever their number."""
+        ids = [other.id for other in self.others]
+
+        res, queries = self.update_related(ids)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.related_ids(), set(ids))
+        checks = [query for query in queries
+                  if query['sql'].startswith('SELECT "core_post"."id"')
+                  and '"core_post"."id" IN' in query['sql']]
+        self.assertEqual(len(checks), 1)
+
+    def test_missing_ids_reported_together(self):
+        """Test all the missing ids are reported and nothing is written."""
+        missing = [self.others[-1].id + 100, self.others[-1].id + 200]
+
+        res, _ = self.update_related([self.others[0].id, *missing])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        for post_id in missing:
+            self.assertIn(str(post_id), res.data['detail'])
+        self.assertEqual(self.related_ids(), set())
+
+    def test_missing_ids_on_create(self):
+        """Test missing ids are a bad request when creating a post."""
+        payload = {
+            'title': 'New post',
+            'postCategoryId': self.postCategory.id,
+            'content': '<p>Content.</p>',
+            'excerpt': 'Excerpt.',
+            'readTime': 3,
+            'relatedPostIds': [self.others[-1].id + 100],
+        }
+
+        res = self.client.post(POST_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_self_reference_rejected(self):
+        """Test a post cannot be related to itself."""
+        res, _ = self.update_related([self.post.id])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_writes_only_changes(self):
+        """Test only the added and removed related posts are written."""
+        self.post.relatedPosts.set(self.others[:3])
+        kept_ids = set(Post.relatedPosts.through.objects.filter(
+            from_post=self.post,
+            to_post__in=self.others[1:3]).values_list('id', flat=True))
+
+        res, queries = self.update_related(
+            [other.id for other in self.others[1:4]])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.related_ids(),
+                         {other.id for other in self.others[1:4]})
+        self.assertTrue(kept_ids <= set(
+            Post.relatedPosts.through.objects.values_list('id', flat=True)))
+        deletes = [query for query in queries if query['sql'].startswith(
+            'DELETE FROM "core_post_relatedPosts"')]
+        self.assertEqual(len(deletes), 1)
+
+    def test_related_posts_symmetrical(self):
+        """Test the related posts are related back to the post."""
+        self.update_related([self.others[0].id])
+
+        self.assertEqual(self.related_ids(self.others[0]), {self.post.id})
@@ -0,0 +1,196 @@
+"""
+Tests for the computed related post recommendations.
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Post,
+    PostCategory,
+    RelatedPostRecommendation,
+    SEOKeywords,
+    Tag
+)
+from post.related_posts import compute_related_posts
+from post.tests import helpers
+from post.tests.helpers import PostViewsTestCase
+
+
+def detail_url(post_id):
+    """Create and return a post detail url."""
+    return reverse('post:post-detail', args=[post_id])
+
+
+def create_post(user, postCategory, title, excerpt, **params):
+    """Create a published and accepted post and return it."""
+    return helpers.create_post(user, postCategory, title=title,
+                               excerpt=excerpt, **params)
+
+
+def recommended_ids(post):
+    """Return the ids of the posts recommended for the post, by rank."""
+    return list(RelatedPostRecommendation.objects.filter(
+        post=post).order_by('rank').values_list(
+            'recommendedPost_id', flat=True))
+
+
+class RelatedPostsTests(PostViewsTestCase):
+    """Test scoring and storing the related posts."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            name='Test User', email='test@example.com')
+        self.postCategory = PostCategory.objects.create(
+            title='Databases', createdBy=self.user, updatedBy=self.user)
+        self.other_category = PostCategory.objects.create(
+            title='Cooking', createdBy=self.user, updatedBy=self.user)
+        self.tag = Tag.objects.create(
+            name='Django', createdBy=self.user, updatedBy=self.user)
+        self.keyword = SEOKeywords.objects.create(
+            keyword='btree', createdBy=self.user, updatedBy=self.user)
+
+        self.post = create_post(self.user, self.postCategory,
+                                'Postgres indexes', 'Partial indexes')
+        self.same_text = create_post(self.user, self.other_category,
+                                     'Postgres indexes explained',
+                                     'Indexes basics')
+        self.same_tag = create_post(self.user, self.other_category,
+                                    'Baking bread', 'Sourdough starter')
+        self.same_keyword = create_post(self.user, self.other_category,
+                                        'Gardening notes', 'Tomato plants')
+        self.unrelated = create_post(self.user, self.postCategory,
+                                     'Travel diary', 'Mountain trip')
+        self.draft = create_post(self.user, self.postCategory,
+                                 'Postgres indexes', 'Partial indexes',
+                                 postStatus='draft')
+        for post in (self.post, self.same_tag, self.draft):
+            post.tags.add(self.tag)
+        for post in (self.post, self.same_keyword):
+            post.seoKeywords.add(self.keyword)
+
+    def test_shared_features_recommended(self):
+        """Test the posts sharing tags, keywords or words are related."""
+        compute_related_posts()
+
+        self.assertCountEqual(recommended_ids(self.post), [
+            self.same_text.id, self.same_tag.id, self.same_keyword.id])
+
+    def test_self_and_unpublished_excluded(self):
+        """Test a post is neither related to itself nor to drafts."""
+        compute_related_posts()
+
+        self.assertFalse(RelatedPostRecommendation.objects.filter(
+            post=self.draft).exists())
+        for post in Post.objects.all():
+            ids = recommended_ids(post)
+            self.assertNotIn(post.id, ids)
+            self.assertNotIn(self.draft.id, ids)
+
+    def test_top_limits_recommendations(self):
+        """Test only the best ``top`` posts are stored."""
+        compute_related_posts()
+        best = recommended_ids(self.post)[0]
+
+        compute_related_posts(top=1, batch_size=2)
+
+        self.assertEqual(recommended_ids(self.post), [best])
+
+    def test_same_category_preferred(self):
+        """Test the category breaks a tie between equally similar posts."""
+        first = create_post(self.user, self.other_category,
+                            'Docker volumes', 'Compose')
+        second = create_post(self.user, self.postCategory,
+                             'Docker volumes', 'Compose')
+        post = create_post(self.user, self.postCategory,
+                           'Docker volumes', 'Compose')
+
+        compute_related_posts()
+
+        self.assertEqual(recommended_ids(post)[:2], [second.id, first.id])
+
+    def test_only_changes_written(self):
+        """Test a second run leaves the unchanged recommendations alone."""
+        self.assertGreater(compute_related_posts(), 0)
+
+        self.assertEqual(compute_related_posts(), 0)
+
+    def test_unpublished_post_cleared(self):
+        """Test a post which is no longer published loses its rows."""
+        compute_related_posts()
+        self.same_text.postStatus = 'archive'
+        self.same_text.save()
+
+        compute_related_posts()
+
+        self.assertEqual(recommended_ids(self.same_text), [])
+        self.assertNotIn(self.same_text.id, recommended_ids(self.post))
+
+    def test_command(self):
+        """Test the command stores the recommendations."""
+        call_command('compute_related_posts', '--top', '2',
+                     stdout=StringIO())
+
+        self.assertEqual(len(recommended_ids(self.post)), 2)
+
+
+class RelatedPostsApiTests(PostViewsTestCase):
+    """Test serving the related posts in the post detail."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            name='Test User', email='test@example.com')
+        self.postCategory = PostCategory.objects.create(
+            title='Databases', createdBy=self.user, updatedBy=self.user)
+        self.post = create_post(self.user, self.postCategory,
+                                'Postgres indexes', 'Partial indexes')
+        self.related = create_post(self.user, self.postCategory,
+                                   'Postgres indexes explained',
+                                   'Indexes basics')
+        for title in ('Travel diary', 'Baking bread'):
+            create_post(self.user, self.postCategory, title, 'Other topic')
+
+    def get_related_ids(self):
+        res = self.client.get(detail_url(self.post.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [post['id'] for post in res.data['relatedPosts']]
+
+    def test_computed_posts_served(self):
+        """Test the detail falls back to the computed related posts."""
+        compute_related_posts()
+
+        self.assertEqual(self.get_related_ids(), [self.related.id])
+
+    def test_curated_posts_preferred(self):
+        """Test the related posts chosen by the author come first."""
+        curated = create_post(self.user, self.postCategory,
+                              'Curated post', 'Chosen by the author')
+        self.post.relatedPosts.add(curated)
+        compute_related_posts()
+
+        self.assertEqual(self.get_related_ids(), [curated.id])
+
+    def test_job_invalidates_detail(self):
+        """Test computing new recommendations refreshes the cached detail."""
+        self.assertEqual(self.get_related_ids(), [])
+
+        compute_related_posts()
+
+        self.assertEqual(self.get_related_ids(), [self.related.id])
+
+    def test_unpublished_recommendation_hidden(self):
+        """Test a recommended post is hidden once it is unpublished."""
+        compute_related_posts()
+        self.get_related_ids()
+        self.related.postStatus = 'archive'
+        self.related.save()
+
+        self.assertEqual(self.get_related_ids(), [])
@@ -0,0 +1,230 @@
+"""
+Tests for the published post counts of the tags and the tag endpoints.
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Post, PostCategory, Tag
+from post.tags import tag_index
+from post.tests.helpers import create_post
+
+
+POPULAR_TAGS_URL = reverse('post:tag-popular')
+AUTOCOMPLETE_URL = reverse('post:tag-autocomplete')
+
+
+class TagCountsTestCase(TestCase):
+    """Create a user, a category and tags."""
+
+    def setUp(self):
+        cache.clear()
+        tag_index.clear()
+        self.user = get_user_model().objects.create_user(
+            name='Test User', email='test@example.com')
+        self.postCategory = PostCategory.objects.create(
+            title='Sample category', createdBy=self.user, updatedBy=self.user)
+        self.tags = {
+            name: Tag.objects.create(name=name, createdBy=self.user,
+                                     updatedBy=self.user)
+            for name in ('django', 'python', 'docker')
+        }
+
+    def create_post(self, **params):
+        return create_post(self.user, self.postCategory, **params)
+
+    def counts(self):
+        return dict(Tag.objects.values_list('name', 'publishedPostCount'))
+
+
+class TagCountsTests(TagCountsTestCase):
+    """Test keeping the published post counts of the tags."""
+
+    def test_tags_added_and_removed(self):
+        """Test the tags of a published post are counted."""
+        post = self.create_post()
+        post.tags.set([self.tags['django'], self.tags['python']])
+        post.tags.add(self.tags['django'])
+        post.tags.remove(self.tags['python'], self.tags['docker'])
+
+        self.assertEqual(self.counts(),
+                         {'django': 1, 'python': 0, 'docker': 0})
+
+    def test_tags_cleared(self):
+        """Test clearing the tags of a post uncounts them."""
+        post = self.create_post()
+        post.tags.set(self.tags.values())
+        post.tags.clear()
+
+        self.assertEqual(set(self.counts().values()), {0})
+
+    def test_unpublished_post_not_counted(self):
+        """Test the tags of drafts and rejected posts are not counted."""
+        for params in ({'postStatus': 'draft'}, {'reviewStatus': 'reject'}):
+            self.create_post(**params).tags.add(self.tags['django'])
+
+        self.assertEqual(self.counts()['django'], 0)
+
+    def test_status_transitions(self):
+        """Test publishing and archiving a post counts its tags."""
+        post = self.create_post(postStatus='draft', reviewStatus='pending')
+        post.tags.set([self.tags['django'], self.tags['python']])
+
+        post.postStatus = 'publish'
+        post.save()
+        post.change_reviewStatus_to('accept')
+        self.assertEqual(self.counts()['python'], 1)
+
+        post.change_postStatus_to('archive')
+        self.assertEqual(self.counts()['python'], 0)
+
+    def test_post_deleted(self):
+        """Test deleting a published post uncounts its tags."""
+        post = self.create_post()
+        post.tags.add(self.tags['django'])
+
+        Post.objects.get(pk=post.pk).delete()
+
+        self.assertEqual(self.counts()['django'], 0)
+
+    def test_reverse_changes(self):
+        """Test adding posts to a tag counts the published ones."""
+        posts = [self.create_post(), self.create_post(),
+                 self.create_post(postStatus='draft')]
+        tag = self.tags['docker']
+
+        tag.post_set.add(*posts)
+        self.assertEqual(self.counts()['docker'], 2)
+
+        tag.post_set.remove(posts[0], posts[2])
+        self.assertEqual(self.counts()['docker'], 1)
+
+        tag.post_set.clear()
+        self.assertEqual(self.counts()['docker'], 0)
+
+    def test_rebuild_command(self):
+        """Test the command corrects the counts which drifted."""
+        post = self.create_post()
+        post.tags.add(self.tags['django'])
+        Tag.objects.filter(name='django').update(publishedPostCount=7)
+        Tag.objects.filter(name='python').update(publishedPostCount=3)
+
+        call_command('rebuild_tag_counts', stdout=StringIO())
+
+        self.assertEqual(self.counts(),
+                         {'django': 1, 'python': 0, 'docker': 0})
+
+
+class TagEndpointsTests(TagCountsTestCase):
+    """Test the popular tags and the autocomplete."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        for count, name in enumerate(('docker', 'python', 'django'), 1):
+            for _ in range(count):
+                self.create_post().tags.add(self.tags[name])
+
+    def get(self, url, **params):
+        res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_popular_by_count(self):
+        """Test the popular tags are ordered by their post count."""
+        results = self.get(POPULAR_TAGS_URL)['results']
+
+        self.assertEqual(
+            [(tag['name'], tag['publishedPostCount']) for tag in results],
+            [('django', 3), ('python', 2), ('docker', 1)])
+
+    def test_popular_by_name_paginated(self):
+        """Test the popular tags can be ordered by name and paged."""
+        data = self.get(POPULAR_TAGS_URL, ordering='name', pageSize=2)
+
+        self.assertEqual(data['count'], 3)
+        self.assertEqual([tag['name'] for tag in data['results']],
+                         ['django', 'docker'])
+
+    def test_popular_skips_unused_and_deleted(self):
+        """Test tags without published posts or deleted are skipped."""
+        Tag.objects.create(name='unused', createdBy=self.user,
+                           updatedBy=self.user)
+        self.tags['docker'].isDeleted = True
+        self.tags['docker'].save()
+
+        results = self.get(POPULAR_TAGS_URL)['results']
+
+        self.assertEqual([tag['name'] for tag in results],
+                         ['django', 'python'])
+
+    def test_invalid_ordering(self):
+        """Test an unknown ordering is a bad request."""
+        res = self.client.get(POPULAR_TAGS_URL, {'ordering': 'date'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_autocomplete_prefix(self):
+        """Test the autocomplete returns the tags of the prefix."""
+        Tag.objects.create(name='Djangonaut', createdBy=self.user,
+                           updatedBy=self.user)
+
+        names = [tag['name'] for tag in self.get(AUTOCOMPLETE_URL,
+                                                 prefix='DJ')]
+
+        self.assertEqual(names, ['django', 'Djangonaut'])
+        self.assertEqual(len(self.get(AUTOCOMPLETE_URL, prefix='d',
+                                      limit=1)), 1)
+        self.assertEqual(self.get(AUTOCOMPLETE_URL, prefix='ruby'), [])
+
+    def test_autocomplete_warm_skips_database(self):
+        """Test a warm index answers without queries."""
+        self.get(AUTOCOMPLETE_URL, prefix='py')
+
+        with self.assertNumQueries(0):
+            names = [tag['name'] for tag in self.get(AUTOCOMPLETE_URL,
+                                                     prefix='py')]
+
+        self.assertEqual(names, ['python'])
+
+    def test_autocomplete_sees_new_tags(self):
+        """Test tags created with a post reload the index."""
+        self.get(AUTOCOMPLETE_URL, prefix='py')
+        self.client.force_authenticate(self.user)
+        res = self.client.post(reverse('post:post-list'), {
+            'title': 'New post',
+            'postCategoryId': self.postCategory.id,
+            'content': '<p>Content.</p>',
+            'excerpt': 'Excerpt.',
+            'readTime': 3,
+            'tags': [{'name': 'pytest'}],
+        }, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        names = [tag['name'] for tag in self.get(AUTOCOMPLETE_URL,
+                                                 prefix='py')]
+
+        self.assertEqual(names, ['pytest', 'python'])
+
+    def test_autocomplete_index_expires(self):
+        """Test a tag the version missed is found once the index expires."""
+        self.get(AUTOCOMPLETE_URL, prefix='py')
+        # as if created through another process with its own cache
+        Tag.objects.bulk_create([Tag(name='pytest', createdBy=self.user,
+                                     updatedBy=self.user)])
+
+        names = [tag['name'] for tag in self.get(AUTOCOMPLETE_URL,
+                                                 prefix='py')]
+        self.assertEqual(names, ['python'])
+
+        with override_settings(POST_TAG_INDEX_TIMEOUT=0):
+            names = [tag['name'] for tag in self.get(AUTOCOMPLETE_URL,
+                                                     prefix='py')]
+        self.assertEqual(names, ['pytest', 'python'])
@@ -0,0 +1,185 @@
+"""
+Tests for buffered post view counts.
+"""
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.models import Post, PostCategory, PostInformation
+from post.view_counter import (
+    BaseViewCountSink,
+    CacheViewCountSink,
+    DatabaseViewCountSink,
+    MemoryViewCountSink,
+    get_view_count_sink,
+    reset_view_count_sink
+)
+
+
+def create_post(user, **params):
+    """Create and return a post."""
+    category = PostCategory.objects.create(
+        title=f'Category {PostCategory.objects.count()}',
+        createdBy=user,
+        updatedBy=user)
+    defaults = {
+        'title': 'Sample post title',
+        'content': '<p>Sample content</p>',
+        'excerpt': 'Sample excerpt',
+        'readTime': 5,
+        'postCategoryId': category,
+    }
+    defaults.update(params)
+    return Post.objects.create(createdBy=user, updatedBy=user, **defaults)
+
+
+class BaseViewCountSinkTests(TestCase):
+    """Test the interface of the view count sinks."""
+
+    def test_incomplete_sink_not_instantiable(self):
+        """Test a sink missing a method fails when it is created."""
+        class AddOnlySink(BaseViewCountSink):
+            def add(self, post_id, count=1):
+                pass
+
+        with self.assertRaises(TypeError):
+            AddOnlySink()
+
+    @override_settings(
+        POST_VIEW_COUNT_SINK='post.view_counter.DatabaseViewCountSink')
+    def test_reset_sink(self):
+        """Test the sink is created again from the settings once reset."""
+        reset_view_count_sink()
+        self.addCleanup(reset_view_count_sink)
+
+        self.assertIsInstance(get_view_count_sink(), DatabaseViewCountSink)
+
+
+class MemoryViewCountSinkTests(TestCase):
+    """Test the in-memory view count sink."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            name='Test User',
+            password='testpass')
+        self.post = create_post(self.user)
+
+    def view_count(self, post):
+        return PostInformation.objects.get(post=post).viewCount
+
+    def test_views_buffered_until_threshold(self):
+        """Test views are not written before the threshold is reached."""
+        sink = MemoryViewCountSink(flush_threshold=3, flush_interval=3600)
+
+        with self.assertNumQueries(0):
+            sink.add(self.post.id)
+            sink.add(self.post.id)
+        self.assertEqual(self.view_count(self.post), 0)
+
+        sink.add(self.post.id)
+        self.assertEqual(self.view_count(self.post), 3)
+
+    def test_flush_batches_posts(self):
+        """Test posts with the same increment share one update."""
+        other_post = create_post(self.user)
+        sink = MemoryViewCountSink(flush_threshold=100, flush_interval=3600)
+        for post in [self.post, other_post, self.post, other_post]:
+            sink.add(post.id)
+
+        # one update and the copy of the counters to the feed entries
+        with self.assertNumQueries(2):
+            flushed = sink.flush()
+
+        self.assertEqual(flushed, 4)
+        self.assertEqual(self.view_count(self.post), 2)
+        self.assertEqual(self.view_count(other_post), 2)
+
+    def test_idle_sink_flushed_on_interval(self):
+        """Test the views are flushed on the interval without new views."""
+        sink = MemoryViewCountSink(flush_threshold=100, flush_interval=0.05)
+        flushed = threading.Event()
+
+        with mock.patch.object(sink, 'flush', side_effect=flushed.set):
+            sink.add(self.post.id)
+
+            self.assertTrue(flushed.wait(5))
+            sink.stop()
+
+    def test_flush_without_pending_views(self):
+        """Test flushing an empty sink does not touch the database."""
+        sink = MemoryViewCountSink(flush_threshold=100, flush_interval=3600)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(sink.flush(), 0)
+
+
+class CacheViewCountSinkTests(TestCase):
+    """Test the view count sink shared through the cache."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            name='Test User',
+            password='testpass')
+        self.post = create_post(self.user)
+        self.sink = CacheViewCountSink(flush_threshold=100,
+                                       flush_interval=3600)
+        self.key = self.sink._key(self.post.id)
+
+    def view_count(self, post):
+        return PostInformation.objects.get(post=post).viewCount
+
+    def test_concurrent_flushes_write_views_once(self):
+        """Test views claimed by another flush are not written again."""
+        for _ in range(3):
+            self.sink.add(self.post.id)
+        other = CacheViewCountSink(flush_threshold=100, flush_interval=3600)
+        # both flushes read the same pending views, the other claims them
+        get_many = cache.get_many
+
+        values = get_many([self.key])
+
+        with mock.patch('post.view_counter.cache.get_many',
+                        return_value=values):
+            other.flush([self.post.id])
+            flushed = self.sink.flush()
+
+        self.assertEqual(flushed, 0)
+        self.assertEqual(self.view_count(self.post), 3)
+        self.assertEqual(cache.get(self.key), 0)
+
+    def test_failed_write_keeps_views(self):
+        """Test the claimed views go back to the cache when writing fails."""
+        for _ in range(2):
+            self.sink.add(self.post.id)
+
+        with mock.patch('post.view_counter.write_view_counts',
+                        side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.sink.flush([self.post.id])
+
+        self.assertEqual(cache.get(self.key), 2)
+        self.assertEqual(self.sink.flush([self.post.id]), 2)
+        self.assertEqual(self.view_count(self.post), 2)
+
+    def test_flush_all_in_chunks(self):
+        """Test every buffered post is flushed, a chunk at a time."""
+        posts = [self.post, create_post(self.user), create_post(self.user)]
+        for post in posts:
+            self.sink.add(post.id)
+        self.sink.flush_chunk_size = 2
+
+        with mock.patch.object(self.sink, 'flush',
+                               wraps=self.sink.flush) as flush:
+            flushed = self.sink.flush_all()
+
+        self.assertEqual(flushed, 3)
+        self.assertEqual([len(call.args[0]) for call in flush.call_args_list],
+                         [2, 1])
+        for post in posts:
+            self.assertEqual(self.view_count(post), 1)
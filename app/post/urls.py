@@ -24,6 +24,8 @@ app_name = 'post'
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('cache-stats/', views.PostCacheStatsView.as_view(),
+         name='cache-stats'),
     path('api/upload-file/', custom_upload_function, name='custom_upload_file')
     # path("upload/", custom_upload_function, name="custom_upload_file"),
     # path("upload/", FileUploadViewSet.as_view(), name="custom_upload_file"),
@@ -0,0 +1,268 @@
+"""
+Buffered, write-behind sinks for post view counts.
+
+Instead of updating ``PostInformation`` on every post detail request, views
+are accumulated in a sink and written to the database in batches of
+``viewCount = viewCount + n`` updates.
+"""
+import atexit
+import logging
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import Counter, defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import F
+from django.utils.module_loading import import_string
+
+from core.models import PostInformation
+from post.caching import note_counter_change
+from post.feed_entries import update_post_counters
+
+logger = logging.getLogger(__name__)
+
+
+def write_view_counts(counts):
+    """
+    Apply pending view counts to the database.
+
+    ``counts`` maps post ids to the number of views to add. Posts sharing
+    the same increment are updated together, so a flush costs one UPDATE
+    per distinct increment value instead of one per post.
+    """
+    posts_by_increment = defaultdict(list)
+    for post_id, increment in counts.items():
+        if increment > 0:
+            posts_by_increment[increment].append(post_id)
+
+    for increment, post_ids in posts_by_increment.items():
+        PostInformation.objects.filter(post_id__in=post_ids).update(
+            viewCount=F('viewCount') + increment)
+    if posts_by_increment:
+        update_post_counters([
+            post_id for post_ids in posts_by_increment.values()
+            for post_id in post_ids])
+    note_counter_change(sum(counts.values()))
+
+
+class BaseViewCountSink(ABC):
+    """Base class for view count sinks."""
+
+    @abstractmethod
+    def add(self, post_id, count=1):
+        """Record ``count`` views of the post."""
+
+    @abstractmethod
+    def flush(self):
+        """Write all pending views to the database."""
+
+
+class DatabaseViewCountSink(BaseViewCountSink):
+    """Unbuffered sink writing every view straight to the database."""
+
+    def add(self, post_id, count=1):
+        write_view_counts({post_id: count})
+
+    def flush(self):
+        return 0
+
+
+class MemoryViewCountSink(BaseViewCountSink):
+    """
+    Accumulate views in process memory.
+
+    Pending views are flushed once ``flush_threshold`` views are buffered
+    or ``flush_interval`` seconds passed since the last flush, and when the
+    worker exits gracefully. A daemon thread, started with the first view,
+    flushes on the interval when no more views come in.
+    """
+
+    def __init__(self, flush_threshold=None, flush_interval=None):
+        self.flush_threshold = (
+            flush_threshold or settings.POST_VIEW_COUNT_FLUSH_THRESHOLD)
+        self.flush_interval = (
+            flush_interval or settings.POST_VIEW_COUNT_FLUSH_INTERVAL)
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._pending_total = 0
+        self._last_flush = time.monotonic()
+        self._timer = None
+        self._stopped = threading.Event()
+
+    def add(self, post_id, count=1):
+        with self._lock:
+            self._pending[post_id] += count
+            self._pending_total += count
+            should_flush = self._should_flush()
+            if self._timer is None:
+                self._timer = threading.Thread(
+                    target=self._flush_on_interval, daemon=True,
+                    name='view-count-flush')
+                self._timer.start()
+        if should_flush:
+            self.flush()
+
+    def _flush_on_interval(self):
+        while not self._stopped.wait(self.flush_interval):
+            if not self._pending_total:
+                continue
+            try:
+                self.flush()
+            except Exception:
+                # the views were kept, the next interval retries them
+                logger.exception('Flushing the buffered views failed.')
+            finally:
+                # the connections of this thread are not closed by requests
+                connections.close_all()
+
+    def stop(self):
+        """Stop flushing on the interval."""
+        self._stopped.set()
+
+    def _should_flush(self):
+        return (
+            self._pending_total >= self.flush_threshold
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def _take_pending(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = Counter()
+            self._pending_total = 0
+            self._last_flush = time.monotonic()
+        return pending
+
+    def _restore_pending(self, pending):
+        with self._lock:
+            self._pending.update(pending)
+            self._pending_total += sum(pending.values())
+
+    def flush(self):
+        """Write the buffered views and return how many were written."""
+        pending = self._take_pending()
+        if not pending:
+            return 0
+        try:
+            write_view_counts(pending)
+        except Exception:
+            # keep the views for the next flush instead of losing them
+            self._restore_pending(pending)
+            raise
+        return sum(pending.values())
+
+
+class CacheViewCountSink(MemoryViewCountSink):
+    """
+    Accumulate views in the shared Django cache.
+
+    Every worker using the same cache backend shares the pending counts,
+    so the ``flush_view_counts`` management command can write the views
+    buffered by all of them.
+    """
+    key_prefix = 'post:views'
+    flush_chunk_size = 1000
+
+    def _key(self, post_id):
+        return f'{self.key_prefix}:{post_id}'
+
+    def add(self, post_id, count=1):
+        self._add_to_cache(self._key(post_id), count)
+        super().add(post_id, count)
+
+    def flush(self, post_ids=None):
+        """
+        Write the views buffered in the cache.
+
+        Only posts viewed through this worker are flushed unless
+        ``post_ids`` is given. The pending views are claimed from the cache
+        before they are written, so concurrent flushes never write the same
+        views twice.
+        """
+        if post_ids is None:
+            post_ids = list(self._take_pending())
+        keys = {self._key(post_id): post_id for post_id in post_ids}
+        if not keys:
+            return 0
+
+        counts = {}
+        for key, value in cache.get_many(keys).items():
+            claimed = self._claim(key, value) if value else 0
+            if claimed:
+                counts[keys[key]] = claimed
+        try:
+            write_view_counts(counts)
+        except Exception:
+            # give the claimed views back for the next flush
+            for post_id, claimed in counts.items():
+                self._add_to_cache(self._key(post_id), claimed)
+            raise
+        return sum(counts.values())
+
+    def _add_to_cache(self, key, count):
+        cache.add(key, 0, timeout=None)
+        cache.incr(key, count)
+
+    def _claim(self, key, value):
+        """
+        Atomically take up to ``value`` pending views from the key and
+        return how many were taken.
+        """
+        try:
+            # decrement rather than delete, views added meanwhile survive
+            left = cache.decr(key, value)
+        except ValueError:
+            # the key expired or was evicted since it was read
+            return 0
+        if left >= 0:
+            return value
+        # another flush claimed some of the views meanwhile, give those back
+        claimed = max(value + left, 0)
+        cache.incr(key, value - claimed)
+        return claimed
+
+    def flush_all(self):
+        """Write the views buffered by every worker."""
+        post_ids = PostInformation.objects.values_list(
+            'post_id', flat=True).iterator(chunk_size=self.flush_chunk_size)
+        flushed = 0
+        while chunk := list(islice(post_ids, self.flush_chunk_size)):
+            flushed += self.flush(chunk)
+        return flushed
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def get_view_count_sink():
+    """Return the sink configured by ``POST_VIEW_COUNT_SINK``."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = import_string(settings.POST_VIEW_COUNT_SINK)()
+    return _sink
+
+
+def reset_view_count_sink():
+    """
+    Drop the configured sink without flushing it, the next views create
+    it again from the settings.
+    """
+    global _sink
+    with _sink_lock:
+        sink, _sink = _sink, None
+    if isinstance(sink, MemoryViewCountSink):
+        sink.stop()
+
+
+@atexit.register
+def _flush_view_count_sink():
+    # do not lose buffered views on graceful worker shutdown
+    if _sink is not None:
+        _sink.flush()
@@ -8,7 +8,7 @@ from rest_framework import (
 )
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.views import APIView
 from core.models import PostCategory, Post, Tag, PostRate
 from drf_spectacular.utils import (
     extend_schema,
@@ -17,7 +17,7 @@ from drf_spectacular.utils import (
     OpenApiTypes
 )
 from django.utils import timezone
-import math
+import copy
 import os
 from post.utils import CustomStorage
 from post.serializers import FileUploadSerializer
@@ -31,17 +31,67 @@ from rest_framework.parsers import (
     # FormParser,
     MultiPartParser
 )
-from django.db.models import F
-from django.contrib.postgres.search import TrigramSimilarity
-from django.db.models import Q
-
+from django.db.models import Count, F, IntegerField, Max, Sum
+from django.db.models.functions import Cast
+from django.db.models import Prefetch
+from post.caching import (
+    feed_page_key,
+    get_cached_category_tree,
+    get_cached_feed_page,
+    get_cached_post_summaries,
+    get_cached_post_detail,
+    get_feed_generation,
+    get_feed_page_cache_stats,
+    get_post_detail_cache_stats,
+    get_post_version,
+    normalize_feed_params,
+    note_counter_change
+)
+from post.categories import build_category_tree, category_snapshot
+from post.conditional import (
+    ConditionalGetMixin,
+    ConditionalListMixin,
+    ConditionalRetrieveMixin
+)
+from post.feed import build_feed
+from post.recommendations import high_rated_pool
+from post.search import SEARCH_MODES
+from post.tags import tag_index
+from post.pagination import (
+    CREATED_DATE_SORT_KEY,
+    POST_SORT_KEYS,
+    SEARCH_RANK_SORT_KEY,
+    CustomPageNumberPagination,
+    PostCursorPagination,
+    TagPageNumberPagination
+)
 
-class PostCategoryViewSet(mixins.RetrieveModelMixin,
+# posts returned by the random high rated posts at most
+MAX_RANDOM_COUNT = 20
+# orderings of the popular tags, the default one follows the popularity
+# index of the tags
+POPULAR_TAG_ORDERINGS = {
+    'count': ('-publishedPostCount', 'name'),
+    'name': ('name',),
+}
+# tags returned by the autocomplete, by default and at most
+DEFAULT_AUTOCOMPLETE_LIMIT = 10
+MAX_AUTOCOMPLETE_LIMIT = 50
+
+
+class PostCategoryViewSet(ConditionalListMixin,
+                          ConditionalRetrieveMixin,
+                          mixins.RetrieveModelMixin,
                           mixins.UpdateModelMixin,
                           mixins.CreateModelMixin,
                           mixins.ListModelMixin,
                           viewsets.GenericViewSet):
-    """View for manage recipe APIs."""
+    """
+    View for manage recipe APIs.
+
+    The list and the details are read from the process local snapshot
+    of the categories, without querying the database.
+    """
     serializer_class = serializers.PostCategorySerializer
     authentication_classes = [TokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
@@ -56,7 +106,40 @@ class PostCategoryViewSet(mixins.RetrieveModelMixin,
     def get_queryset(self):
         """Retrieve postCategories."""
         queryset = self.queryset
-        return queryset.order_by('title').distinct()
+        return queryset.select_related(
+            'parentPostCategoryId').order_by('title')
+
+    def get_object(self):
+        if self.action != 'retrieve':
+            return super().get_object()
+        postCategory = category_snapshot.get(self.kwargs['pk'])
+        if postCategory is None:
+            raise Http404
+        self.check_object_permissions(self.request, postCategory)
+        return postCategory
+
+    def filter_queryset(self, queryset):
+        if self.action == 'list':
+            # the categories of the snapshot, ordered by title
+            return category_snapshot.all()
+        return super().filter_queryset(queryset)
+
+    def get_list_validators(self):
+        categories = category_snapshot.all()
+        last_modified = max(
+            (category.updatedDate for category in categories), default=None)
+        # the snapshot version changes with any reload of the categories
+        return (category_snapshot.version(),), last_modified
+
+    def get_object_validators(self):
+        postCategory = category_snapshot.get(self.kwargs['pk'])
+        if postCategory is None:
+            return None, None
+        parent = postCategory.parentPostCategoryId
+        values = (postCategory.updatedDate,
+                  parent.updatedDate if parent else None)
+        # the detail includes the title of the parent
+        return values, max(date for date in values if date)
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -81,6 +164,19 @@ class PostCategoryViewSet(mixins.RetrieveModelMixin,
             updatedDate=timezone.now()
         )
 
+    @extend_schema(
+        description="""
+        The whole category hierarchy, every category with its nested
+        children, its number of published posts (postCount) and the
+        number of published posts of its subtree (totalPostCount).
+        """,
+        responses=OpenApiTypes.OBJECT,
+    )
+    @action(detail=False, methods=['get'])
+    def tree(self, request):
+        """Return the cached nested categories."""
+        return Response(get_cached_category_tree(build_category_tree))
+
     @action(methods=['POST'], detail=True, url_path='upload-image')
     def upload_image(self, request, pk=None):
         """Upload an image to postCategory."""
@@ -88,27 +184,12 @@ class PostCategoryViewSet(mixins.RetrieveModelMixin,
         serializer = self.get_serializer(postCategory, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            serializer.save(updatedDate=timezone.now())
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class CustomPageNumberPagination(PageNumberPagination):
-    def get_paginated_response(self, data):
-        # Calculate total number of pages
-        total_pages = math.ceil(self.page.paginator.count / self.page_size)
-        return Response({
-            'total_pages': total_pages,
-            'next': self.get_next_link(),
-            'previous': self.get_previous_link(),
-            'current_page_number': int(self.get_page_number(
-                self.request,
-                self.page.paginator)),
-            'results': data
-        })
-
-
 @extend_schema_view(
     list=extend_schema(
         parameters=[
@@ -120,13 +201,19 @@ class CustomPageNumberPagination(PageNumberPagination):
             OpenApiParameter(
                 'authorName',
                 OpenApiTypes.STR,
-                description='Name of author',
+                description='Name of author, matched by word similarity',
             ),
             OpenApiParameter(
                 'postCategoryId',
                 OpenApiTypes.INT,
                 description='ID of post category',
             ),
+            OpenApiParameter(
+                'includeSubcategories',
+                OpenApiTypes.INT, enum=[0, 1],
+                description="""If 1, also returns the posts of the
+                subcategories of postCategoryId, at any depth""",
+            ),
             OpenApiParameter(
                 'reviewResponseDate',
                 OpenApiTypes.STR,
@@ -140,7 +227,18 @@ class CustomPageNumberPagination(PageNumberPagination):
             OpenApiParameter(
                 'search',
                 OpenApiTypes.STR,
-                description='search over title and excerpt.',
+                description="""Full-text search over title, excerpt
+                and content. Words are matched as prefixes and results are
+                ordered by relevance unless a sort is given.""",
+            ),
+            OpenApiParameter(
+                'searchMode',
+                OpenApiTypes.STR,
+                enum=list(SEARCH_MODES),
+                description="""
+                fulltext (default): full-text search with prefix matching,
+                fuzzy: trigram similarity of title and excerpt.
+                """,
             ),
             OpenApiParameter(
                 'sort',
@@ -157,10 +255,44 @@ class CustomPageNumberPagination(PageNumberPagination):
                 6: Sort by average rating (descending),
                 """,
             ),
+            OpenApiParameter(
+                'pagination',
+                OpenApiTypes.STR,
+                enum=['page', 'cursor'],
+                description="""
+                page (default): numbered pages with the total page count,
+                cursor: keyset pagination following the next and previous
+                links, faster on deep pages.
+                """,
+            ),
+            OpenApiParameter(
+                'cursor',
+                OpenApiTypes.STR,
+                description='Position returned in the cursor pagination links',
+            ),
+            OpenApiParameter(
+                'includeCount',
+                OpenApiTypes.INT, enum=[0, 1],
+                description='If 1, the cursor pagination returns the count',
+            ),
         ]
-    )
+    ),
+    random_high_rated=extend_schema(
+        description="""
+        Random published posts with an average rating of 4 or more, in
+        random order. currentUserPostRate is not included.
+        """,
+        parameters=[
+            OpenApiParameter(
+                'count',
+                OpenApiTypes.INT,
+                description=f'Number of posts, at most {MAX_RANDOM_COUNT}',
+            ),
+        ]
+    ),
 )
-class PostViewSet(mixins.RetrieveModelMixin,
+class PostViewSet(ConditionalGetMixin,
+                  mixins.RetrieveModelMixin,
                   mixins.UpdateModelMixin,
                   mixins.CreateModelMixin,
                   mixins.ListModelMixin,
@@ -169,8 +301,10 @@ class PostViewSet(mixins.RetrieveModelMixin,
     serializer_class = serializers.PostDetailSerializer
     authentication_classes = [TokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
-    queryset = Post.objects.all().select_related('postInformation')
+    queryset = Post.objects.all().select_related(
+        'postInformation').defer('searchVector')
     pagination_class = CustomPageNumberPagination
+    count_strategy = 'estimated'
     # parser_classes = (JSONParser, FormParser)
 
     def get_permissions(self):
@@ -179,6 +313,29 @@ class PostViewSet(mixins.RetrieveModelMixin,
             return [permissions.AllowAny()]
         return super().get_permissions()
 
+    @property
+    def paginator(self):
+        """Use the keyset pagination when ?pagination=cursor is given."""
+        if (not hasattr(self, '_paginator')
+                and self.action == 'list'
+                and self.request.query_params.get('pagination') == 'cursor'):
+            self._paginator = PostCursorPagination()
+        return super().paginator
+
+    def get_sort_key(self):
+        """Return the ordering of the feed used by the cursor pagination."""
+        sort = self.request.query_params.get('sort')
+        if sort:
+            try:
+                return POST_SORT_KEYS[int(sort)]
+            except (KeyError, ValueError):
+                raise ValidationError({'sort': 'Invalid sort.'})
+        if self.request.query_params.get('search'):
+            return SEARCH_RANK_SORT_KEY
+        if self.request.query_params.get('currentUserPosts') == '1':
+            return CREATED_DATE_SORT_KEY
+        return POST_SORT_KEYS[0]
+
     def get_allowed_methods(self):
         methods = super().get_allowed_methods()
         # Exclude DELETE method from the list of allowed methods
@@ -186,120 +343,197 @@ class PostViewSet(mixins.RetrieveModelMixin,
             methods.remove('DELETE')
         return methods
 
-    def _params_to_ints(self, qs):
-        """Convert list of strings to integers."""
-        return [int(str_id) for str_id in qs.split(',')]
-
-    def _params_to_strings(self, qs):
-        """Convert list of strings to integers."""
-        return qs.split(',')
-
     def get_queryset(self):
-        """Retrieve recipe for authenticated user."""
+        """Retrieve posts for the current action."""
+        queryset = self._get_filtered_queryset()
+        if self.action == 'list':
+            queryset = self._get_list_queryset(queryset)
+        elif self.action == 'retrieve':
+            # the rest of the detail is cached, see retrieve()
+            queryset = self._prefetch_current_user_post_rate(
+                queryset.select_related('postInformation'))
+        return queryset
 
+    def _get_list_queryset(self, queryset):
+        """
+        Load the relations nested by PostSerializer, so a page of posts
+        is serialized in a constant number of queries.
+        """
+        queryset = queryset.select_related(
+            'postInformation',
+            'feedEntry',
+            'createdBy',
+            'postCategoryId'
+        ).prefetch_related('tags')
+        return self._prefetch_current_user_post_rate(queryset)
+
+    def _get_retrieve_queryset(self, queryset):
+        """
+        Load the relations nested by PostDetailSerializer, including the
+        published related posts with their authors and information.
+        """
+        related_posts = Post.objects.published_and_accepted(
+        ).select_related(
+            'postInformation',
+            'createdBy'
+        ).order_by(
+            F('postInformation__averageRating').desc(nulls_last=True))
+        return queryset.select_related(
+            'postInformation',
+            'createdBy',
+            'postCategoryId'
+        ).prefetch_related(
+            'tags',
+            'seoKeywords',
+            Prefetch(
+                'relatedPosts',
+                queryset=related_posts,
+                to_attr='publishedRelatedPosts'))
+
+    def _prefetch_current_user_post_rate(self, queryset):
+        """
+        Load the current user's rates of the whole page in one query
+        instead of one query per serialized post.
+        """
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset
+        return queryset.prefetch_related(
+            Prefetch(
+                'postrate_set',
+                queryset=PostRate.objects.filter(user=user),
+                to_attr='currentUserPostRates'))
+
+    def _get_filtered_queryset(self):
+        """Retrieve the posts of the feed visible to the current user."""
         if self.action == 'upload_image':
             return self.queryset.filter(createdBy=self.request.user)
-
-        user = self.request.user
-        tags = self.request.query_params.get('tags')
-        postCategoryId = self.request.query_params.get('postCategoryId')
-        authorName = self.request.query_params.get('authorName')
-        reviewResponseDate = self.request.query_params.get(
-            'reviewResponseDate')
-        sort = self.request.query_params.get('sort')
-        currentUserPosts = bool(
-            int(self.request.query_params.get('currentUserPosts', 0)))
-        queryset = self.queryset
-        search = self.request.query_params.get('search')
-
-        # Applying the filters and sorts
-        if search:
-            # Annotate with trigram similarity for title and content
-            queryset = queryset.annotate(
-                title_similarity=TrigramSimilarity('title', search),
-                excerpt_similarity=TrigramSimilarity('excerpt', search)
-            ).filter(
-                Q(title_similarity__gt=0.1) | Q(excerpt_similarity__gt=0.1)
-            ).order_by(
-                '-title_similarity',
-                '-excerpt_similarity'
-                )
-            # queryset = queryset.filter(
-            #     # Q(title__trigram_word_similar=search),
-            #     content__trigram_word_similar=search)
-        if tags:
-            tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
-        if postCategoryId:
-            postCategoryIds = self._params_to_ints(postCategoryId)
-            queryset = queryset.filter(postCategoryId__in=postCategoryIds)
-        if authorName:
-            queryset = queryset.filter(createdBy__name__icontains=authorName)
-        if reviewResponseDate:
-            reviewResponseDate_range = self._params_to_strings(
-                reviewResponseDate)
-            queryset = queryset.filter(
-                reviewResponseDate__range=reviewResponseDate_range)
-        if currentUserPosts:
-            if user.is_authenticated:
-                queryset = queryset.filter(createdBy=user,
-                                           postStatus__in=['publish', 'draft'])
-                return queryset.order_by('-createdDate').distinct()
-            else:
-                raise PermissionDenied('User is not authenticated')
-
-        queryset = queryset.distinct().order_by(
-            F('reviewResponseDate').desc(nulls_last=True))
-
-        if sort:
-            sort = int(sort)
-            if sort == 1:
-                queryset = queryset.order_by('readTime')
-            elif sort == 2:
-                queryset = queryset.order_by('-readTime')
-            elif sort == 3:
-                queryset = queryset.annotate(
-                    view_count=F('postInformation__viewCount')
-                    ).order_by('-view_count')
-            elif sort == 4:
-                queryset = queryset.annotate(
-                    socialShare_count=F('postInformation__socialShareCount')
-                    ).order_by('-socialShare_count')
-            elif sort == 5:
-                queryset = queryset.annotate(
-                    rating_count=F('postInformation__ratingCount')
-                    ).order_by('-rating_count')
-            elif sort == 6:
-                queryset = queryset.annotate(
-                    average_rating=F(
-                        'postInformation__averageRating')
-                    ).order_by(F('average_rating').desc(nulls_last=True))
-
-        queryset = queryset.filter(
-            reviewStatus='accept',
-            postStatus='publish')
-
-        # all the posts created by current user will be returned
-        # no matter they are published or not or accepted
-        if user.is_authenticated:
-            queryset_current_user = self.queryset.filter(
-                createdBy=user,
-                postStatus__in=['draft']).distinct()
-
-            combined_queryset = (
-                queryset_current_user | queryset
-                ).distinct().order_by('-createdDate')
-            return combined_queryset.distinct()
-        return queryset
+        return build_feed(self.queryset, self.request.query_params,
+                          self.request.user, self.get_sort_key())
 
     def get_serializer_class(self):
-        if self.action == 'list':
+        if self.action in ('list', 'random_high_rated'):
             return serializers.PostSerializer
         elif self.action == 'upload_image':
             return serializers.PostImageSerializer
 
         return self.serializer_class
 
+    def list(self, request, *args, **kwargs):
+        """
+        Return a page of the feed, from the cache for anonymous readers.
+        """
+        if request.user.is_authenticated:
+            # the feed includes the drafts and rates of the user
+            return self.conditional_response(
+                request, self.get_list_validators,
+                lambda: super(PostViewSet, self).list(
+                    request, *args, **kwargs))
+
+        origin = f'{request.scheme}://{request.get_host()}'
+        data, built = get_cached_feed_page(
+            request.query_params, origin,
+            lambda: self._build_feed_page(request, *args, **kwargs))
+        # a cached page only changes when it is rebuilt
+        return self.conditional_response(
+            request,
+            lambda: ((feed_page_key(request.query_params, origin),
+                      built), None),
+            lambda: Response(data))
+
+    def get_list_validators(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        # the counters of the posts are not part of their updatedDate
+        summary = queryset.order_by().aggregate(
+            lastModified=Max('updatedDate'),
+            count=Count('pk'),
+            viewCount=Sum('feedEntry__viewCount'),
+            socialShareCount=Sum('feedEntry__socialShareCount'),
+            ratingCount=Sum('feedEntry__ratingCount'),
+            averageRating=Sum(Cast(F('feedEntry__averageRating') * 100,
+                                   IntegerField())),
+            commentCount=Sum('feedEntry__commentCount'))
+        # rates have no updated date, a new, changed or moved rate of the
+        # user changes the count or the weighted sum
+        rates = PostRate.objects.filter(user=self.request.user).aggregate(
+            count=Count('pk'), weighted=Sum(F('post_id') * F('rate')))
+        # no Last-Modified, the counters and rates change without a date
+        return ((*summary.values(), *rates.values(),
+                 get_feed_generation()), None)
+
+    def _build_feed_page(self, request, *args, **kwargs):
+        """
+        Return the data of a feed page shared by the anonymous readers.
+
+        The page is built from a copy of the request holding only the
+        normalized feed params, so its next and previous links do not
+        carry the other params of the request which built it first.
+        """
+        params = normalize_feed_params(request.query_params)
+        django_request = copy.copy(request._request)
+        django_request.GET = params
+        django_request.META = {**django_request.META,
+                               'QUERY_STRING': params.urlencode()}
+        feed_request = copy.copy(request)
+        feed_request._request = django_request
+        self.request = feed_request
+        try:
+            return super().list(feed_request, *args, **kwargs).data
+        finally:
+            self.request = request
+
+    def get_object_validators(self):
+        # the post is loaded anyway to add its counters to the detail
+        try:
+            post = self.get_object()
+        except Http404:
+            return None, None
+        self._validated_post = post
+        information = post.postInformation
+        # the version covers the tags, SEO keywords and related posts
+        return (
+            post.updatedDate,
+            information.viewCount,
+            information.socialShareCount,
+            information.ratingSum,
+            information.ratingCount,
+            information.commentCount,
+            get_post_version(post.pk),
+        ), post.updatedDate
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Return the post detail, the user independent part from the cache.
+
+        The counters and the current user's rate change too often to be
+        cached, they are added to the cached data on every request.
+        """
+        return self.conditional_response(
+            request, self.get_object_validators,
+            lambda: self._retrieve(request, *args, **kwargs))
+
+    def _retrieve(self, request, *args, **kwargs):
+        post = getattr(self, '_validated_post', None) or self.get_object()
+        data = get_cached_post_detail(
+            post.pk, lambda: self._serialize_shared_detail(post.pk))
+        serializer = self.get_serializer(post)
+        return Response({
+            **data,
+            'postInformation': serializers.PostInformationSerializer(
+                post.postInformation).data,
+            'currentUserPostRate': serializer.get_currentUserPostRate(post),
+        })
+
+    def _serialize_shared_detail(self, pk):
+        """Serialize the parts of the post detail shared by all users."""
+        post = self._get_retrieve_queryset(self.queryset).get(pk=pk)
+        # not shared, skip loading it
+        post.currentUserPostRates = []
+        data = self.get_serializer(post).data
+        for field in ('postInformation', 'currentUserPostRate'):
+            data.pop(field)
+        return data
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         try:
@@ -309,9 +543,12 @@ class PostViewSet(mixins.RetrieveModelMixin,
                             status=status.HTTP_201_CREATED,
                             )
         except ValidationError as e:
-            return Response(
-                {'detail': str(dict(e.detail)['non_field_errors'][0])},
-                status=status.HTTP_400_BAD_REQUEST)
+            errors = dict(e.detail)
+            # the field errors are reported like in update
+            detail = (errors['non_field_errors'][0]
+                      if 'non_field_errors' in errors else errors)
+            return Response({'detail': str(detail)},
+                            status=status.HTTP_400_BAD_REQUEST)
 
     def perform_create(self, serializer):
         """Create a new post"""
@@ -323,7 +560,6 @@ class PostViewSet(mixins.RetrieveModelMixin,
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
-        print(request.data)
         serializer = self.get_serializer(instance,
                                          data=request.data,
                                          partial=partial)
@@ -363,17 +599,56 @@ class PostViewSet(mixins.RetrieveModelMixin,
         serializer = self.get_serializer(post, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            serializer.save(updatedDate=timezone.now())
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['get'], url_path='random-high-rated')
+    def random_high_rated(self, request):
+        """
+        Random high rated posts, sampled from the pool of their ids and
+        served from the cached post list data.
+        """
+        try:
+            count = int(request.query_params.get('count', 5))
+        except ValueError:
+            raise ValidationError({'count': 'Must be an integer.'})
+        post_ids = high_rated_pool.sample(max(0, min(count, MAX_RANDOM_COUNT)))
+        summaries = get_cached_post_summaries(
+            post_ids, self._serialize_summaries)
+        # the pool may still hold posts unpublished since its last load
+        return Response([
+            summaries[post_id] for post_id in post_ids
+            if post_id in summaries
+        ])
+
+    def _serialize_summaries(self, post_ids):
+        """Serialize the list data of the published posts, by id."""
+        posts = Post.objects.published_and_accepted().filter(
+            pk__in=post_ids
+        ).select_related(
+            'postInformation',
+            'createdBy',
+            'postCategoryId'
+        ).prefetch_related('tags').defer('searchVector')
+        summaries = {}
+        for post in posts:
+            # not shared, skip loading it
+            post.currentUserPostRates = []
+            data = self.get_serializer(post).data
+            for field in ('currentUserPostRate', 'searchHeadline'):
+                data.pop(field)
+            summaries[post.pk] = data
+        return summaries
+
     @action(detail=True, methods=['get'])
     def share_post(self, request, pk=None):
         try:
             instance = self.get_object()
             post_info = PostInformation.objects.get(post=instance)
             post_info.increment_social_share_count()
+            note_counter_change()
             return Response(
                 {'message': 'Social share count incremented successfully'},
                 status=status.HTTP_200_OK)
@@ -398,7 +673,8 @@ class PostViewSet(mixins.RetrieveModelMixin,
         ]
     )
 )
-class BasePostAttrViewSet(mixins.ListModelMixin,
+class BasePostAttrViewSet(ConditionalListMixin,
+                          mixins.ListModelMixin,
                           viewsets.GenericViewSet):
     """Base viewset for post attributes."""
     authentication_classes = [TokenAuthentication]
@@ -416,11 +692,54 @@ class BasePostAttrViewSet(mixins.ListModelMixin,
         return queryset.order_by('-name').distinct()
 
 
+@extend_schema_view(
+    popular=extend_schema(
+        description="""
+        Tags having published posts, with their number of published
+        posts, the most used first unless ordered by name.
+        """,
+        parameters=[
+            OpenApiParameter(
+                'ordering',
+                OpenApiTypes.STR,
+                enum=list(POPULAR_TAG_ORDERINGS),
+                description='Order by post count (default) or by name',
+            ),
+            OpenApiParameter(
+                'pageSize',
+                OpenApiTypes.INT,
+                description=f"""Number of tags per page, at most
+                {TagPageNumberPagination.max_page_size}""",
+            ),
+        ]
+    ),
+    autocomplete=extend_schema(
+        description="""
+        Tags whose name starts with the prefix, ignoring the case, in
+        alphabetical order.
+        """,
+        parameters=[
+            OpenApiParameter(
+                'prefix',
+                OpenApiTypes.STR,
+                required=True,
+                description='Start of the tag names',
+            ),
+            OpenApiParameter(
+                'limit',
+                OpenApiTypes.INT,
+                description=f"""Number of tags, at most
+                {MAX_AUTOCOMPLETE_LIMIT}""",
+            ),
+        ]
+    ),
+)
 class TagViewSet(BasePostAttrViewSet):
     """Manage tags in the database"""
     # order of inputs is important
     serializer_class = serializers.TagSerializer
     queryset = Tag.objects.all()
+    pagination_class = TagPageNumberPagination
 
     def get_permissions(self):
         """Allow unauthenticated access to GET requests."""
@@ -428,6 +747,47 @@ class TagViewSet(BasePostAttrViewSet):
             return [permissions.AllowAny()]
         return super().get_permissions()
 
+    def get_serializer_class(self):
+        if self.action == 'popular':
+            return serializers.PopularTagSerializer
+
+        return self.serializer_class
+
+    @action(detail=False, methods=['get'])
+    def popular(self, request):
+        """
+        Return a page of the tags by their precomputed number of
+        published posts.
+        """
+        ordering = request.query_params.get('ordering', 'count')
+        if ordering not in POPULAR_TAG_ORDERINGS:
+            raise ValidationError({'ordering': 'Invalid ordering.'})
+        queryset = Tag.objects.filter(
+            isDeleted=False,
+            publishedPostCount__gt=0
+        ).order_by(*POPULAR_TAG_ORDERINGS[ordering])
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Return the tags starting with the prefix, from the tag index."""
+        prefix = request.query_params.get('prefix', '').strip()
+        try:
+            limit = int(request.query_params.get(
+                'limit', DEFAULT_AUTOCOMPLETE_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': 'Invalid number.'})
+        if not prefix:
+            return Response([])
+        tags = tag_index.complete(
+            prefix, max(1, min(limit, MAX_AUTOCOMPLETE_LIMIT)))
+        return Response([
+            {'id': tag_id, 'name': name} for tag_id, name in tags
+        ])
+
 
 @extend_schema_view(
     list=extend_schema(
@@ -507,3 +867,16 @@ class PostRateViewSet(mixins.DestroyModelMixin,
     def perform_create(self, serializer):
         """Create a new CommentReaction"""
         serializer.save(user=self.request.user)
+
+
+class PostCacheStatsView(APIView):
+    """Hit and miss counts of the post caches, for admins."""
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        return Response({
+            'postDetail': get_post_detail_cache_stats(),
+            'postFeed': get_feed_page_cache_stats(),
+        })